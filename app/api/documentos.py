@@ -0,0 +1,70 @@
+"""Normalización y validación de números de documento por tipo.
+
+Se aplica al construir las solicitudes, antes de cualquier lectura de caché o
+llamada al SIS: el número queda en su forma canónica (sin espacios ni
+separadores, en mayúsculas y con los ceros a la izquierda que correspondan) y
+los que no pueden ser válidos se rechazan sin consultar a nadie.
+"""
+
+import re
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ReglaDocumento:
+    """Formato de los números de un tipo de documento."""
+
+    nombre: str
+    patron: re.Pattern[str]
+    # Largo al que se completan con ceros a la izquierda los números
+    # puramente numéricos; 0 = sin relleno
+    relleno: int = 0
+
+
+DNI = ReglaDocumento("DNI", re.compile(r"\d{7,8}"), relleno=8)
+CARNET_EXTRANJERIA = ReglaDocumento(
+    "carné de extranjería", re.compile(r"[0-9A-Z]{1,12}"), relleno=9
+)
+PASAPORTE = ReglaDocumento("pasaporte", re.compile(r"[0-9A-Z]{5,12}"))
+GENERICO = ReglaDocumento("documento", re.compile(r"[0-9A-Z]{1,20}"))
+
+# Códigos de strTipoDocumento del SIS; "D" es el alias de DNI que usan
+# algunos integradores. Los tipos no listados usan la regla genérica
+REGLAS: dict[str, ReglaDocumento] = {
+    "1": DNI,
+    "D": DNI,
+    "2": CARNET_EXTRANJERIA,
+    "3": PASAPORTE,
+}
+
+_SEPARADORES = re.compile(r"[\s.\-]")
+
+
+def limpiar_documento(numero: str) -> str:
+    """Quita espacios y separadores y pasa a mayúsculas."""
+    return _SEPARADORES.sub("", numero).upper()
+
+
+def normalizar_tipo(tipo_documento: str) -> str:
+    """Forma canónica del tipo de documento."""
+    return tipo_documento.strip().upper()
+
+
+def normalizar_documento(tipo_documento: str, numero: str) -> str:
+    """Devuelve el número canónico para el tipo de documento.
+
+    Raises:
+        ValueError: El número no corresponde al formato del tipo
+
+    """
+    regla = REGLAS.get(normalizar_tipo(tipo_documento), GENERICO)
+    canonico = limpiar_documento(numero)
+    if not regla.patron.fullmatch(canonico):
+        message = f"Número de {regla.nombre} inválido: {numero!r}"
+        raise ValueError(message)
+    if regla.relleno and canonico.isdigit():
+        if not canonico.strip("0"):
+            message = f"Número de {regla.nombre} inválido: {numero!r}"
+            raise ValueError(message)
+        canonico = canonico.zfill(regla.relleno)
+    return canonico
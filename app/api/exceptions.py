@@ -24,6 +24,11 @@ class CustomExceptionCode(BaseExceptionCode):
         "Respuesta del servicio invalida.",
         "Porfavor intente mas tarde.",
     )
+    AFILIADO_NO_ENCONTRADO = (
+        "API-404",
+        "El SIS no encontró datos del documento.",
+        "Verifique el número y el tipo de documento.",
+    )
     INVALID_CREDENTIALS = (
         "API-401",
         "Credenciales inválidas",
@@ -34,3 +39,48 @@ class CustomExceptionCode(BaseExceptionCode):
         "Permission denied.",
         "Access to this resource is forbidden.",
     )
+    TOO_MANY_REQUESTS = (
+        "LOAD-429",
+        "Demasiadas solicitudes.",
+        "Se superó el límite de solicitudes del cliente.",
+    )
+    SERVICE_OVERLOADED = (
+        "LOAD-503",
+        "Servicio sobrecargado.",
+        "Porfavor intente mas tarde.",
+    )
+    JOB_NOT_FOUND = (
+        "JOB-404",
+        "Job de consultas no encontrado.",
+        "Verifique el identificador del job.",
+    )
+    SUSCRIPCION_NOT_FOUND = (
+        "SUS-404",
+        "Suscripción no encontrada.",
+        "Verifique el identificador de la suscripción.",
+    )
+    DEADLINE_EXCEEDED = (
+        "TIME-504",
+        "Plazo de la solicitud agotado.",
+        "El SIS no respondió dentro del tiempo indicado por el cliente.",
+    )
+    INVALID_DOCUMENT = (
+        "DOC-422",
+        "Número de documento inválido.",
+        "El número no corresponde al formato del tipo de documento.",
+    )
+    BUSQUEDA_INVALIDA = (
+        "BUS-422",
+        "Búsqueda inválida.",
+        "Revise el texto de búsqueda y el cursor de paginación.",
+    )
+    REPORTE_INVALIDO = (
+        "REP-422",
+        "Periodo de reporte inválido.",
+        "El periodo debe tener hasta 366 días y 'desde' no ser posterior a 'hasta'.",
+    )
+    FORMATO_NO_DISPONIBLE = (
+        "EXP-501",
+        "Formato de exportación no disponible.",
+        "El formato parquet requiere instalar pyarrow en el servidor.",
+    )
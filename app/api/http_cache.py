@@ -0,0 +1,66 @@
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+from zoneinfo import ZoneInfo
+
+from app.models.afiliado import AfiliadoBase
+
+# La caché de afiliados vale hasta el fin del día en Lima
+TZ = ZoneInfo("America/Lima")
+
+
+def inicio_del_dia() -> datetime:
+    """Inicio del día en curso (hora de Lima, sin zona como en la base de datos)."""
+    return datetime.combine(datetime.now(TZ).date(), datetime.min.time())
+
+
+def segundos_hasta_vencer() -> int:
+    """Segundos que faltan para que venza la caché del día."""
+    ahora = datetime.now(TZ)
+    manana = datetime.combine(ahora.date() + timedelta(days=1), datetime.min.time())
+    return max(0, int((manana.replace(tzinfo=TZ) - ahora).total_seconds()))
+
+
+def etag(content_hash: str) -> str:
+    """ETag débil derivado del hash de contenido del afiliado.
+
+    Es débil porque el cuerpo también lleva ``id``, ``CreatedAt`` y
+    ``VerifiedAt``, que pueden cambiar sin que cambie el hash: dos respuestas
+    con el mismo ETag son equivalentes, no idénticas byte a byte.
+    """
+    return f'W/"{content_hash}"'
+
+
+def coincide_etag(if_none_match: str | None, valor: str) -> bool:
+    """Evalúa ``If-None-Match`` contra el ETag actual (comparación débil)."""
+    if not if_none_match:
+        return False
+    candidatos = {
+        candidato.strip().removeprefix("W/") for candidato in if_none_match.split(",")
+    }
+    return "*" in candidatos or valor.removeprefix("W/") in candidatos
+
+
+def cabeceras_cache(content_hash: str | None, verificado: datetime | None) -> dict:
+    """Cabeceras de validación y frescura para la respuesta de un afiliado.
+
+    La respuesta tiene datos personales: ``private`` impide que la guarden
+    las cachés compartidas (proxies, CDN); solo la cachea el cliente.
+    """
+    cabeceras = {
+        "Cache-Control": (
+            f"private, max-age={segundos_hasta_vencer()}, must-revalidate"
+        )
+    }
+    if content_hash:
+        cabeceras["ETag"] = etag(content_hash)
+    if verificado:
+        # Las fechas se guardan en hora local del servidor
+        cabeceras["Last-Modified"] = format_datetime(
+            verificado.astimezone(UTC), usegmt=True
+        )
+    return cabeceras
+
+
+def cabeceras_afiliado(afiliado: AfiliadoBase) -> dict:
+    """Cabeceras de caché HTTP para un afiliado ya cargado."""
+    return cabeceras_cache(afiliado.ContentHash, afiliado.VerifiedAt)
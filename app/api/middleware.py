@@ -0,0 +1,280 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+
+from api_exception import BaseExceptionCode, ExceptionStatus, ResponseModel
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.exceptions import CustomExceptionCode
+from app.deadline import plazo
+from app.services.rate_limiter import TokenBucket
+from tools.logger import Logger
+
+# Configurar logging
+logger = Logger(__name__)
+
+
+@dataclass
+class MetricasCarga:
+    """Contadores del control de carga de entrada."""
+
+    aceptadas: int = 0
+    rechazadas_cliente: int = 0
+    rechazadas_global: int = 0
+    descartadas_cola: int = 0
+    en_curso: int = 0
+    max_en_curso: int = 0
+    espera_cola_ms_total: float = 0.0
+
+    def to_dict(self) -> dict:
+        """Representación serializable de las métricas."""
+        data = asdict(self)
+        data["espera_cola_ms_promedio"] = (
+            round(self.espera_cola_ms_total / self.aceptadas, 3)
+            if self.aceptadas
+            else 0.0
+        )
+        return data
+
+
+class LoadSheddingMiddleware:
+    """Middleware ASGI de límite de solicitudes y descarte por sobrecarga.
+
+    En orden aplica:
+    1. Límite por cliente (token bucket por IP) -> 429.
+    2. Límite global de solicitudes por segundo -> 503.
+    3. Máximo de solicitudes en curso; si una solicitud espera un cupo más de
+       ``max_queue_time`` segundos se descarta -> 503.
+
+    Las respuestas de rechazo incluyen ``Retry-After`` y el mismo contrato
+    JSON que ``ResponseModel``. Las rutas de ``stream_prefixes`` (conexiones
+    largas como SSE) pasan por los límites 1 y 2 pero no ocupan un cupo.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        app: ASGIApp,
+        *,
+        metricas: MetricasCarga,
+        client_rate: float = 20,
+        client_burst: int = 40,
+        global_rate: float = 200,
+        global_burst: int = 400,
+        max_in_flight: int = 50,
+        max_queue_time: float = 2.0,
+        trust_forwarded: bool = False,
+        exempt_paths: frozenset[str] = frozenset(),
+        stream_prefixes: tuple[str, ...] = (),
+        max_clients: int = 10_000,
+    ) -> None:
+        """Inicializa el middleware."""
+        self.app = app
+        self.metricas = metricas
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.max_queue_time = max_queue_time
+        self.trust_forwarded = trust_forwarded
+        self.exempt_paths = exempt_paths
+        self.stream_prefixes = stream_prefixes
+        self.max_clients = max_clients
+        self._clientes: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._cupos = asyncio.Semaphore(max_in_flight)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Aplica los límites antes de delegar en la aplicación."""
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        espera = self._bucket_cliente(scope).try_acquire()
+        if espera > 0:
+            self.metricas.rechazadas_cliente += 1
+            await self._rechazar(
+                CustomExceptionCode.TOO_MANY_REQUESTS,
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                espera,
+            )(scope, receive, send)
+            return
+
+        espera = self.global_bucket.try_acquire()
+        if espera > 0:
+            self.metricas.rechazadas_global += 1
+            await self._rechazar(
+                CustomExceptionCode.SERVICE_OVERLOADED,
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                espera,
+            )(scope, receive, send)
+            return
+
+        if scope["path"].startswith(self.stream_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._cupos.acquire(), timeout=self.max_queue_time)
+        except TimeoutError:
+            self.metricas.descartadas_cola += 1
+            await self._rechazar(
+                CustomExceptionCode.SERVICE_OVERLOADED,
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                self.max_queue_time,
+            )(scope, receive, send)
+            return
+
+        self.metricas.aceptadas += 1
+        self.metricas.espera_cola_ms_total += (time.perf_counter() - inicio) * 1_000
+        self.metricas.en_curso += 1
+        self.metricas.max_en_curso = max(
+            self.metricas.max_en_curso, self.metricas.en_curso
+        )
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.metricas.en_curso -= 1
+            self._cupos.release()
+
+    def _bucket_cliente(self, scope: Scope) -> TokenBucket:
+        """Obtiene el bucket del cliente, acotando la cantidad de clientes."""
+        cliente = self._identificar_cliente(scope)
+        bucket = self._clientes.get(cliente)
+        if bucket is None:
+            bucket = TokenBucket(self.client_rate, self.client_burst)
+            self._clientes[cliente] = bucket
+            if len(self._clientes) > self.max_clients:
+                self._clientes.popitem(last=False)
+        else:
+            self._clientes.move_to_end(cliente)
+        return bucket
+
+    def _identificar_cliente(self, scope: Scope) -> str:
+        """Identifica al cliente por IP (o ``X-Forwarded-For`` si es confiable)."""
+        if self.trust_forwarded:
+            for nombre, valor in scope["headers"]:
+                if nombre == b"x-forwarded-for":
+                    return valor.decode("latin-1").split(",")[0].strip()
+        cliente = scope.get("client")
+        return cliente[0] if cliente else "desconocido"
+
+    @staticmethod
+    def _rechazar(
+        error_code: BaseExceptionCode, status_code: int, espera: float
+    ) -> JSONResponse:
+        """Construye la respuesta de rechazo con ``Retry-After``."""
+        return JSONResponse(
+            status_code=status_code,
+            content=ResponseModel(
+                status=ExceptionStatus.FAIL,
+                message=error_code.message,
+                error_code=error_code.error_code,
+                description=error_code.description,
+            ).model_dump(mode="json"),
+            headers={"Retry-After": str(max(1, math.ceil(espera)))},
+        )
+
+
+class DeadlineMiddleware:
+    """Middleware ASGI que fija el plazo de cada solicitud.
+
+    El plazo se toma de la cabecera ``X-Request-Timeout`` (segundos, acotado a
+    ``maximo``) o de ``por_defecto`` y queda disponible con
+    ``app.deadline.restante()``. Si el cliente se desconecta antes de recibir
+    la respuesta, se cancela el trabajo en curso.
+    """
+
+    CABECERA = b"x-request-timeout"
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        por_defecto: float | None = None,
+        maximo: float | None = None,
+        exempt_paths: frozenset[str] = frozenset(),
+        stream_prefixes: tuple[str, ...] = (),
+    ) -> None:
+        """Inicializa el middleware."""
+        self.app = app
+        self.por_defecto = por_defecto or None
+        self.maximo = maximo
+        self.exempt_paths = exempt_paths
+        self.stream_prefixes = stream_prefixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Ejecuta la aplicación con plazo y atenta a la desconexión."""
+        if (
+            scope["type"] != "http"
+            or scope["path"] in self.exempt_paths
+            or scope["path"].startswith(self.stream_prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        with plazo(self._segundos(scope)):
+            await self._ejecutar(scope, receive, send)
+
+    def _segundos(self, scope: Scope) -> float | None:
+        """Plazo pedido por el cliente, o el por defecto si no es válido."""
+        segundos = self.por_defecto
+        for nombre, valor in scope["headers"]:
+            if nombre == self.CABECERA:
+                try:
+                    pedido = float(valor)
+                except ValueError:
+                    break
+                if math.isfinite(pedido) and pedido > 0:
+                    segundos = pedido
+                break
+        if segundos is not None and self.maximo is not None:
+            segundos = min(segundos, self.maximo)
+        return segundos
+
+    async def _ejecutar(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Corre la aplicación y la cancela si el cliente se desconecta.
+
+        Una tarea aparte es la única que lee ``receive``: reenvía los mensajes
+        a la aplicación y, al recibir ``http.disconnect`` sin que la respuesta
+        haya terminado, cancela la tarea de la aplicación.
+        """
+        mensajes: asyncio.Queue[Message] = asyncio.Queue()
+        respondida = False
+
+        async def recibir() -> Message:
+            return await mensajes.get()
+
+        async def enviar(message: Message) -> None:
+            nonlocal respondida
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                respondida = True
+
+        aplicacion = asyncio.create_task(self.app(scope, recibir, enviar))
+
+        async def escuchar() -> None:
+            while True:
+                message = await receive()
+                await mensajes.put(message)
+                if message["type"] == "http.disconnect":
+                    if not respondida and not aplicacion.done():
+                        logger.info(
+                            "Cliente desconectado; se cancela %s", scope["path"]
+                        )
+                        aplicacion.cancel()
+                    return
+
+        oyente = asyncio.create_task(escuchar())
+        try:
+            await aplicacion
+        except asyncio.CancelledError:
+            # Solo se absorbe la cancelación provocada por la desconexión
+            if not aplicacion.cancelled() or asyncio.current_task().cancelling():  # type: ignore
+                raise
+        finally:
+            oyente.cancel()
@@ -0,0 +1,49 @@
+"""Cursores opacos para la paginación por clave (*keyset*).
+
+El cursor codifica los valores de orden de la última fila entregada; la página
+siguiente continúa con ``WHERE (orden...) > (cursor...)`` sin ``OFFSET``, así
+que su costo no crece con el número de página.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any
+
+
+def codificar_cursor(*valores: Any) -> str:  # noqa: ANN401
+    """Codifica los valores de orden como un cursor URL-safe."""
+    contenido = json.dumps(valores, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(contenido).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, *tipos: type) -> list[Any]:
+    """Recupera los valores de orden de un cursor.
+
+    Args:
+        cursor: Cursor recibido del cliente
+        tipos: Tipo esperado de cada valor, en orden
+
+    Raises:
+        ValueError: El cursor no es válido o sus valores no son de los tipos
+            esperados
+
+    """
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        message = "Cursor inválido"
+        raise ValueError(message) from e
+    if (
+        not isinstance(valores, list)
+        or len(valores) != len(tipos)
+        # bool es subclase de int, pero no es un valor de orden válido
+        or not all(
+            isinstance(valor, tipo) and not isinstance(valor, bool)
+            for valor, tipo in zip(valores, tipos, strict=True)
+        )
+    ):
+        message = "Cursor inválido"
+        raise ValueError(message)
+    return valores
@@ -1,6 +1,16 @@
-from pydantic import BaseModel
+from typing import Self
+
+from pydantic import BaseModel, HttpUrl, field_validator, model_validator
 from sqlmodel import Field
 
+from app.api.documentos import (
+    normalizar_documento,
+    normalizar_tipo,
+)
+from app.api.webhooks import validar_url
+from app.models.suscripcion import CanalSuscripcion
+from tools.config import get_settings
+
 
 class CredencialesRequest(BaseModel):
     """Request para autenticación de usuario."""
@@ -21,3 +31,83 @@ class ConsultaAfiliadoRequest(BaseModel):
     nro_contrato: str | None = Field(None, description="Número de contrato")
     correlativo: str | None = Field(None, description="Correlativo")
     usuario: str = Field(..., description="Usuario que realiza la consulta")
+
+    @field_validator("dni")
+    @classmethod
+    def validar_dni(cls, dni: str) -> str:
+        """Normalizar el DNI del responsable."""
+        return normalizar_documento("1", dni)
+
+    @model_validator(mode="after")
+    def normalizar(self) -> Self:
+        """Llevar el documento del afiliado a su forma canónica.
+
+        Se aplica antes de la caché y del SIS, de modo que variantes con
+        espacios o sin ceros a la izquierda comparten la misma clave.
+        """
+        self.tipo_documento = normalizar_tipo(self.tipo_documento)
+        self.nro_documento = normalizar_documento(
+            self.tipo_documento, self.nro_documento
+        )
+        return self
+
+
+class ConsultaJobRequest(BaseModel):
+    """Request para encolar consultas de afiliado asíncronas."""
+
+    consultas: list[ConsultaAfiliadoRequest] = Field(
+        ..., min_length=1, description="Consultas a procesar en segundo plano"
+    )
+
+    @field_validator("consultas")
+    @classmethod
+    def validar_cantidad(
+        cls, consultas: list[ConsultaAfiliadoRequest]
+    ) -> list[ConsultaAfiliadoRequest]:
+        """Limitar la cantidad de consultas por job a ``JOBS_MAX_ITEMS``."""
+        maximo = get_settings().jobs_max_items
+        if len(consultas) > maximo:
+            message = f"Se permiten como máximo {maximo} consultas por job"
+            raise ValueError(message)
+        return consultas
+
+
+class SuscripcionRequest(BaseModel):
+    """Request para suscribirse a los cambios de un afiliado."""
+
+    numero_documento: str = Field(..., description="Número de documento")
+    tipo_documento: str = Field("1", description="Tipo de documento")
+    canal: CanalSuscripcion = Field(
+        CanalSuscripcion.WEBHOOK, description="Entrega por webhook o SSE"
+    )
+    webhook_url: HttpUrl | None = Field(
+        None, description="URL https que recibe los eventos (canal webhook)"
+    )
+    secreto: str | None = Field(
+        None,
+        min_length=16,
+        description="Clave para firmar los webhooks con HMAC-SHA256",
+    )
+
+    @field_validator("webhook_url")
+    @classmethod
+    def validar_webhook_url(cls, webhook_url: HttpUrl | None) -> HttpUrl | None:
+        """Exigir https y rechazar destinos internos (SSRF)."""
+        return None if webhook_url is None else validar_url(webhook_url)
+
+    @model_validator(mode="after")
+    def normalizar(self) -> Self:
+        """Llevar el documento a la forma canónica con la que se guarda el afiliado."""
+        self.tipo_documento = normalizar_tipo(self.tipo_documento)
+        self.numero_documento = normalizar_documento(
+            self.tipo_documento, self.numero_documento
+        )
+        return self
+
+    @model_validator(mode="after")
+    def validar_canal(self) -> Self:
+        """Exigir la URL solo para el canal webhook."""
+        if (self.canal == CanalSuscripcion.WEBHOOK) != (self.webhook_url is not None):
+            message = "webhook_url es obligatorio solo para el canal webhook"
+            raise ValueError(message)
+        return self
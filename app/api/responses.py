@@ -0,0 +1,35 @@
+from functools import lru_cache
+from typing import Any
+
+from api_exception import ResponseModel
+from fastapi import Response, status
+
+
+@lru_cache
+def _modelo(tipo: Any) -> type[ResponseModel]:  # noqa: ANN401
+    """``ResponseModel[tipo]`` con su esquema construido una sola vez por tipo."""
+    return ResponseModel[tipo]
+
+
+def respuesta_json(
+    tipo: Any,  # noqa: ANN401
+    data: Any,  # noqa: ANN401
+    message: str,
+    headers: dict[str, str] | None = None,
+    status_code: int = status.HTTP_200_OK,
+) -> Response:
+    """Serializa un ``ResponseModel`` exitoso directamente a JSON.
+
+    Los datos ya vienen de nuestros propios modelos, así que se arma la
+    respuesta con ``model_construct`` (sin volver a validar) y pydantic-core
+    la escribe a bytes. Devolver un ``Response`` evita que FastAPI repita la
+    validación contra ``response_model`` y el paso por ``jsonable_encoder``;
+    el contrato JSON es el mismo.
+    """
+    modelo = _modelo(tipo).model_construct(data=data, message=message)
+    return Response(
+        content=modelo.model_dump_json(),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
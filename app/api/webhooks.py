@@ -0,0 +1,84 @@
+"""Validación de los destinos de webhook de las suscripciones.
+
+Un webhook hace que el servidor envíe ``POST`` a una URL elegida por el
+cliente, así que sin restricciones serviría para alcanzar servicios internos
+(SSRF). Solo se aceptan URLs ``https`` cuyo host resuelve a direcciones
+públicas, salvo los hosts de ``WEBHOOK_ALLOWED_HOSTS``, que se aceptan aunque
+resuelvan a direcciones privadas (receptores internos).
+
+La URL se valida al crear la suscripción y el host se vuelve a resolver en
+cada entrega, ya que el DNS puede cambiar después.
+"""
+
+import ipaddress
+import socket
+
+from pydantic import HttpUrl
+
+from tools.config import get_settings
+
+IPAddress = ipaddress.IPv4Address | ipaddress.IPv6Address
+
+
+def es_direccion_publica(direccion: IPAddress) -> bool:
+    """Indica si la dirección es pública: no privada, loopback ni link-local."""
+    if isinstance(direccion, ipaddress.IPv6Address) and direccion.ipv4_mapped:
+        direccion = direccion.ipv4_mapped
+    return direccion.is_global and not direccion.is_multicast
+
+
+def host_permitido(host: str) -> bool:
+    """Indica si el host figura en ``WEBHOOK_ALLOWED_HOSTS``."""
+    return host.lower() in get_settings().webhook_allowed_hosts
+
+
+def validar_url(url: HttpUrl) -> HttpUrl:
+    """Valida la URL sin resolverla: ``https`` y sin hosts internos literales.
+
+    Raises:
+        ValueError: La URL no es ``https`` o apunta a una dirección interna
+
+    """
+    if url.scheme != "https":
+        message = "webhook_url debe usar https"
+        raise ValueError(message)
+    host = (url.host or "").strip("[]").lower()
+    if host_permitido(host):
+        return url
+    if host == "localhost" or host.endswith(".localhost"):
+        message = "webhook_url no puede apuntar a una dirección interna"
+        raise ValueError(message)
+    try:
+        direccion = ipaddress.ip_address(host)
+    except ValueError:
+        return url
+    if not es_direccion_publica(direccion):
+        message = "webhook_url no puede apuntar a una dirección interna"
+        raise ValueError(message)
+    return url
+
+
+def resolver(host: str, puerto: int) -> list[IPAddress]:
+    """Resuelve el host y rechaza los que tienen alguna dirección interna.
+
+    Se exige que todas las direcciones sean públicas: si alguna no lo es, el
+    cliente HTTP podría conectarse justo a esa.
+
+    Raises:
+        ValueError: El host no resuelve o resuelve a una dirección interna
+
+    """
+    try:
+        registros = socket.getaddrinfo(host, puerto, type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        message = f"No se pudo resolver {host}: {e}"
+        raise ValueError(message) from e
+    direcciones = list(
+        dict.fromkeys(
+            ipaddress.ip_address(str(r[4][0]).split("%")[0]) for r in registros
+        )
+    )
+    if not host_permitido(host) and not all(map(es_direccion_publica, direcciones)):
+        message = f"{host} resuelve a una dirección interna"
+        raise ValueError(message)
+    return direcciones
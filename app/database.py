@@ -1,13 +1,18 @@
-import os
+import threading
+import time
 import urllib.parse
-from collections.abc import Generator
+from collections.abc import Generator, Iterable
 from contextlib import contextmanager
 from functools import lru_cache
+from typing import Any
 
-from sqlalchemy.engine import Engine
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.exc import OperationalError, SQLAlchemyError
 from sqlmodel import Session, create_engine, select, text
 
+from app.deadline import restante
+from tools.config import Settings, get_settings
 from tools.logger import Logger
 
 # Configurar logging
@@ -22,42 +27,155 @@ class DatabaseError(Exception):
         super().__init__(f" error de configuracion de base de datos: {message}")
 
 
+# Clave de ``Session.info`` con los documentos escritos en la transacción
+ESCRITURAS = "escrituras"
+
+
+def marcar_escritura(session: Session, clave: str | None) -> None:
+    """Registra que la transacción escribió datos de ``clave``.
+
+    Tras el commit, las lecturas de esa clave se envían al primario durante la
+    ventana de *read-your-writes* para no leer una réplica atrasada.
+    """
+    if clave:
+        session.info.setdefault(ESCRITURAS, set()).add(clave)
+
+
+class VentanaEscrituras:
+    """Claves escritas recientemente en el primario, con vencimiento.
+
+    Vive en la memoria del proceso: con varios workers, solo el que escribió
+    envía al primario las lecturas de la clave.
+    """
+
+    def __init__(self, segundos: float, max_claves: int = 10_000) -> None:
+        """Inicializa la ventana."""
+        self.segundos = segundos
+        self.max_claves = max_claves
+        self._vencimientos: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, claves: Iterable[str]) -> None:
+        """Abre la ventana para las claves recién confirmadas."""
+        vence = time.monotonic() + self.segundos
+        with self._lock:
+            for clave in claves:
+                self._vencimientos[clave] = vence
+            if len(self._vencimientos) > self.max_claves:
+                ahora = time.monotonic()
+                self._vencimientos = {
+                    clave: limite
+                    for clave, limite in self._vencimientos.items()
+                    if limite > ahora
+                }
+
+    def reciente(self, clave: str) -> bool:
+        """Indica si la clave se escribió dentro de la ventana."""
+        limite = self._vencimientos.get(clave)
+        return limite is not None and limite > time.monotonic()
+
+
+class RoutingSession(Session):
+    """Sesión que envía a la réplica las lecturas marcadas como tales.
+
+    Las consultas ejecutadas con ``bind_arguments={"replica": clave}`` usan el
+    motor de la réplica salvo que la clave se haya escrito en esta transacción
+    o dentro de la ventana de *read-your-writes*. Todo lo demás (escrituras,
+    flush, lecturas sin marca) va al primario.
+    """
+
+    def __init__(self, config: "DatabaseConfig", **kwargs: Any) -> None:  # noqa: ANN401
+        """Crea la sesión sobre el motor primario."""
+        super().__init__(config.engine, **kwargs)
+        self.config = config
+
+    def get_bind(
+        self,
+        mapper: Any = None,  # noqa: ANN401
+        *,
+        clause: Any = None,  # noqa: ANN401
+        replica: str | None = None,
+        **kw: Any,  # noqa: ANN401
+    ) -> Engine:
+        """Elige el motor para la operación."""
+        replica_engine = self.config.replica_engine
+        if (
+            replica is not None
+            and replica_engine is not None
+            and not self._flushing
+            and replica not in self.info.get(ESCRITURAS, ())
+            and not self.config.escrituras.reciente(replica)
+        ):
+            return replica_engine
+        return super().get_bind(mapper, clause=clause, **kw)
+
+    def commit(self) -> None:
+        """Confirma y abre la ventana de *read-your-writes* de lo escrito."""
+        escrituras = self.info.pop(ESCRITURAS, set())
+        super().commit()
+        self.config.escrituras.registrar(escrituras)
+
+    def rollback(self) -> None:
+        """Revierte y descarta las escrituras pendientes."""
+        self.info.pop(ESCRITURAS, None)
+        super().rollback()
+
+
+@event.listens_for(RoutingSession, "after_begin")
+def aplicar_plazo(session: Session, transaction: Any, connection: Connection) -> None:  # noqa: ANN401, ARG001
+    """Acota las sentencias de la transacción al plazo de la solicitud.
+
+    Solo agrega ``SET LOCAL statement_timeout`` cuando el plazo restante es
+    menor que el ``statement_timeout`` de la conexión; en el caso habitual no
+    hay ida y vuelta adicional.
+    """
+    disponible = restante()
+    if disponible is None or connection.dialect.name != "postgresql":
+        return
+    limite_ms = max(1, int(disponible * 1_000))
+    actual_ms = session.config.statement_timeout_ms  # type: ignore
+    if actual_ms and limite_ms >= actual_ms:
+        return
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {limite_ms}")
+
+
 class DatabaseConfig:
     """Configuración avanzada de conexión a la base de datos PostgreSQL."""
 
     def __init__(
         self,
+        settings: Settings | None = None,
     ) -> None:
         """Inicializar la configuración de conexión a PostgreSQL.
 
+        Los valores salen de ``tools.config.Settings`` (variables ``DB_*`` y
+        perfil ``APP_ENV``), validados y con tipo.
+
         Args:
-            host: Servidor de base de datos
-            port: Puerto de conexión
-            database: Nombre de la base de datos
-            username: Usuario de base de datos
-            password: Contraseña de base de datos
-            echo: Si mostrar las consultas SQL en logs
-            pool_size: Tamaño del pool de conexiones
-            max_overflow: Conexiones adicionales máximas
-            pool_timeout: Tiempo de espera para obtener conexión
-            pool_recycle: Tiempo para reciclar conexiones (segundos)
-            pool_pre_ping: Verificar conexiones antes de usarlas
+            settings: Configuración a usar; por defecto la del proceso
 
         """
+        settings = settings or get_settings()
+
         # Configuración de conexión
-        self.host = os.getenv("DB_HOST", os.getenv("DB_SERVER", "localhost"))
-        self.port = os.getenv("DB_PORT", "5432")
-        self.database = os.getenv("DB_NAME", "sis_database")
-        self.username = os.getenv("DB_USER", "postgres")
-        self.password = os.getenv("DB_PASSWORD", "")
+        self.host = settings.db_host
+        self.port = str(settings.db_port)
+        self.database = settings.db_name
+        self.username = settings.db_user
+        self.password = settings.db_password.get_secret_value()
 
         # Configuración del motor
-        self.echo = os.getenv("DB_ECHO", "false").lower() == "true"
-        self.pool_size = 10
-        self.max_overflow = 20
-        self.pool_timeout = 30
-        self.pool_recycle = 3600
-        self.pool_pre_ping = True
+        self.echo = settings.db_echo
+        self.pool_size = settings.db_pool_size
+        self.max_overflow = settings.db_max_overflow
+        self.pool_timeout = settings.db_pool_timeout
+        self.pool_recycle = settings.db_pool_recycle
+        self.pool_liveness = settings.db_pool_liveness
+        self.pool_pre_ping = self.pool_liveness == "pre_ping"
+        self.connect_timeout = settings.db_connect_timeout
+        self.application_name = settings.db_application_name
+        self.statement_timeout_ms = settings.db_statement_timeout_ms
+        self.idle_in_transaction_timeout_ms = settings.db_idle_in_transaction_timeout_ms
 
         # Validar configuración
         self._validate_config()
@@ -65,8 +183,26 @@ class DatabaseConfig:
         # Construir la URL de conexión
         self.database_url = self._build_connection_string()
 
-        # Motor de base de datos (se inicializa lazy)
+        # Réplica de lectura opcional: hereda del primario lo que no se indique
+        self.replica_host = settings.db_replica_host
+        self.replica_url = (
+            self._construir_url(
+                self.replica_host,
+                str(settings.db_replica_port or self.port),
+                settings.db_replica_name or self.database,
+                settings.db_replica_user or self.username,
+                settings.db_replica_password.get_secret_value()
+                if settings.db_replica_password is not None
+                else self.password,
+            )
+            if self.replica_host
+            else None
+        )
+        self.escrituras = VentanaEscrituras(settings.db_replica_ryw_seconds)
+
+        # Motores de base de datos (se inicializan lazy)
         self._engine: Engine | None = None
+        self._replica_engine: Engine | None = None
 
     def _validate_config(self) -> None:
         """Validar la configuración de base de datos."""
@@ -85,19 +221,26 @@ class DatabaseConfig:
 
     def _build_connection_string(self) -> str:
         """Construir la cadena de conexión para PostgreSQL."""
-        # Codificar credenciales para manejar caracteres especiales
-        encoded_username = urllib.parse.quote_plus(self.username)
-        encoded_password = (
-            urllib.parse.quote_plus(self.password) if self.password else ""
+        return self._construir_url(
+            self.host, self.port, self.database, self.username, self.password
         )
 
+    @staticmethod
+    def _construir_url(
+        host: str, port: str, database: str, username: str, password: str
+    ) -> str:
+        """Construir una URL de conexión a PostgreSQL."""
+        # Codificar credenciales para manejar caracteres especiales
+        encoded_username = urllib.parse.quote_plus(username)
+        encoded_password = urllib.parse.quote_plus(password) if password else ""
+
         # Construir la URL base
         if encoded_password:
             auth_part = f"{encoded_username}:{encoded_password}"
         else:
             auth_part = encoded_username
 
-        return f"postgresql://{auth_part}@{self.host}:{self.port}/{self.database}"
+        return f"postgresql://{auth_part}@{host}:{port}/{database}"
 
     @property
     def engine(self) -> Engine:
@@ -106,11 +249,24 @@ class DatabaseConfig:
             self._engine = self._create_engine()
         return self._engine
 
-    def _create_engine(self) -> Engine:
+    @property
+    def replica_engine(self) -> Engine | None:
+        """Motor de la réplica de lectura, con su propio pool; None si no hay."""
+        if self.replica_url is None:
+            return None
+        if self._replica_engine is None:
+            self._replica_engine = self._create_engine(
+                self.replica_url, self.replica_host
+            )
+        return self._replica_engine
+
+    def _create_engine(
+        self, database_url: str | None = None, host: str | None = None
+    ) -> Engine:
         """Crear el motor de base de datos con configuración optimizada."""
         try:
             engine = create_engine(
-                self.database_url,
+                database_url or self.database_url,
                 echo=self.echo,
                 pool_pre_ping=self.pool_pre_ping,
                 pool_recycle=self.pool_recycle,
@@ -118,15 +274,12 @@ class DatabaseConfig:
                 max_overflow=self.max_overflow,
                 pool_timeout=self.pool_timeout,
                 # Configuraciones adicionales para PostgreSQL
-                connect_args={
-                    "connect_timeout": 30,
-                    "application_name": "SIS_Application",
-                },
+                connect_args=self._connect_args(),
             )
 
             logger.info(
                 "Motor de base de datos creado exitosamente para %s:%s/%s",
-                self.host,
+                host or self.host,
                 self.port,
                 self.database,
             )
@@ -138,10 +291,42 @@ class DatabaseConfig:
         else:
             return engine
 
+    def _connect_args(self) -> dict[str, Any]:
+        """Parámetros de conexión de libpq: timeouts y estrategia de *liveness*."""
+        connect_args: dict[str, Any] = {
+            "connect_timeout": self.connect_timeout,
+            "application_name": self.application_name,
+        }
+
+        # Límites del lado del servidor para consultas y transacciones ociosas
+        opciones = []
+        if self.statement_timeout_ms:
+            opciones.append(f"-c statement_timeout={self.statement_timeout_ms}")
+        if self.idle_in_transaction_timeout_ms:
+            opciones.append(
+                "-c idle_in_transaction_session_timeout="
+                f"{self.idle_in_transaction_timeout_ms}"
+            )
+        if opciones:
+            connect_args["options"] = " ".join(opciones)
+
+        # Sin pre-ping, el sistema operativo detecta conexiones muertas con
+        # TCP keepalive y el pool las recicla, sin un SELECT por checkout
+        if self.pool_liveness == "keepalive":
+            connect_args.update(
+                keepalives=1,
+                keepalives_idle=30,
+                keepalives_interval=10,
+                keepalives_count=3,
+            )
+        return connect_args
+
     def get_session(self) -> Session:
         """Obtener una sesión de base de datos."""
         try:
-            return Session(self.engine)
+            # Sin expirar al confirmar: los objetos siguen siendo legibles
+            # después del commit sin un SELECT adicional
+            return RoutingSession(self, expire_on_commit=False)
         except Exception as e:
             logger.exception("Error creando sesión")
             message = "No se pudo crear la sesión"
@@ -192,6 +377,25 @@ class DatabaseConfig:
             logger.exception("Error inesperado en prueba de conexión")
             return False
 
+    def ping(self) -> bool:
+        """Verificar la conexión con una consulta mínima y sin logs informativos.
+
+        Pensado para chequeos periódicos: no abre una sesión ORM ni hace commit,
+        solo toma una conexión del pool y ejecuta ``SELECT 1``.
+
+        Returns:
+            bool: True si la base de datos respondió, False en caso contrario
+
+        """
+        try:
+            with self.engine.connect() as connection:
+                connection.exec_driver_sql("SELECT 1")
+        except Exception:
+            logger.debug("Ping a la base de datos fallido", exc_info=True)
+            return False
+        else:
+            return True
+
     def health_check(self) -> dict:
         """Realizar un chequeo de salud de la base de datos.
 
@@ -221,8 +425,21 @@ class DatabaseConfig:
                 "port": self.port,
             }
 
+    def reiniciar_tras_fork(self) -> None:
+        """Descarta en un proceso hijo las conexiones heredadas del padre.
+
+        ``dispose(close=False)`` no cierra los sockets (siguen siendo del
+        padre); el hijo abre conexiones propias en el siguiente checkout.
+        """
+        for engine in (self._engine, self._replica_engine):
+            if engine is not None:
+                engine.dispose(close=False)
+
     def close(self) -> None:
-        """Cerrar el motor de base de datos."""
+        """Cerrar los motores de base de datos."""
+        if self._replica_engine:
+            self._replica_engine.dispose()
+            self._replica_engine = None
         if self._engine:
             self._engine.dispose()
             self._engine = None
@@ -252,8 +469,15 @@ def get_database_config() -> DatabaseConfig:
     return DatabaseConfig()
 
 
-# Instancia global (retrocompatibilidad)
-db_config = get_database_config()
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    """Resuelve ``db_config`` (retrocompatibilidad) recién al usarse.
+
+    Así importar este módulo no lee la configuración ni crea el motor.
+    """
+    if name == "db_config":
+        return get_database_config()
+    message = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(message)
 
 
 def get_session() -> Generator[Session]:
@@ -263,7 +487,7 @@ def get_session() -> Generator[Session]:
         Session: Sesión de SQLModel
 
     """
-    with db_config.get_session_context() as session:
+    with get_database_config().get_session_context() as session:
         yield session
 
 
@@ -274,7 +498,7 @@ def get_engine() -> Engine:
         Engine: Motor de SQLAlchemy
 
     """
-    return db_config.engine
+    return get_database_config().engine
 
 
 # Funciones de utilidad adicionales
@@ -301,7 +525,7 @@ async def init_database() -> bool:
 async def close_database() -> None:
     """Cerrar conexiones de base de datos al finalizar la aplicación."""
     try:
-        db_config.close()
+        get_database_config().close()
         logger.info("Conexiones de base de datos cerradas")
     except Exception:
         logger.exception("Error cerrando base de datos")
@@ -0,0 +1,64 @@
+"""Plazo (*deadline*) de la solicitud en curso.
+
+El middleware fija el instante límite de cada solicitud en una ``ContextVar``;
+el servicio SOAP y la base de datos lo consultan con ``restante()`` para
+acotar sus esperas. Fuera de una solicitud (jobs, workers) no hay plazo y
+``restante()`` devuelve None.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+
+class PlazoInsuficienteError(Exception):
+    """El tiempo restante no alcanza para completar la operación."""
+
+
+def restante() -> float | None:
+    """Segundos que quedan del plazo (negativo si venció), o None sin plazo."""
+    limite = _deadline.get()
+    return None if limite is None else limite - time.monotonic()
+
+
+@contextmanager
+def plazo(segundos: float | None) -> Iterator[None]:
+    """Fija el plazo del contexto actual durante el bloque.
+
+    Si ya hay un plazo más corto (por ejemplo, el de la solicitud) se
+    conserva ese.
+    """
+    limite = None if segundos is None else time.monotonic() + segundos
+    actual = _deadline.get()
+    if actual is not None and (limite is None or actual < limite):
+        limite = actual
+    token = _deadline.set(limite)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+class LatenciaEWMA:
+    """Latencia típica de una operación, como media móvil exponencial."""
+
+    def __init__(self, alpha: float = 0.2) -> None:
+        """Inicializa la media sin muestras."""
+        self.alpha = alpha
+        self.segundos = 0.0
+        self.muestras = 0
+
+    def registrar(self, segundos: float) -> None:
+        """Incorpora una medición."""
+        if self.muestras == 0:
+            self.segundos = segundos
+        else:
+            self.segundos += self.alpha * (segundos - self.segundos)
+        self.muestras += 1
+
+    def alcanza(self, disponible: float | None) -> bool:
+        """Indica si ``disponible`` segundos cubren la latencia típica."""
+        return disponible is None or disponible >= self.segundos
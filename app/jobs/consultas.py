@@ -0,0 +1,188 @@
+"""Workers de las consultas asíncronas (``POST /consultas/jobs``).
+
+Cada worker reclama lotes de la tabla ``consulta_job_item`` con
+``FOR UPDATE SKIP LOCKED`` y los resuelve con ``AfiliadoService``, igual que
+una consulta síncrona. Varios workers (coroutines de la API o procesos
+aparte) pueden trabajar sobre la misma cola sin repetir consultas.
+
+Examples:
+    >>> python -m app.jobs.consultas
+    >>> python -m app.jobs.consultas --workers 4 --una-vez
+
+"""
+
+import asyncio
+
+from fastapi import status
+from pydantic import Field
+from pydantic_settings import BaseSettings, CliApp, SettingsConfigDict
+from result import Err, Ok
+
+from app.api.requests import ConsultaAfiliadoRequest
+from app.database import get_database_config
+from app.models.consulta_job import ConsultaJobItem, EstadoItem
+from app.repositories.consulta_job_repository import ConsultaJobRepository
+from app.services.afiliado_service import AfiliadoService
+from tools.config import Settings, get_settings
+from tools.logger import Logger
+
+# Configurar logging
+logger = Logger(__name__)
+
+
+class ConsultasWorkerArgs(BaseSettings):
+    """Argumentos de los workers de consultas asíncronas."""
+
+    model_config = SettingsConfigDict(
+        env_prefix="CONSULTAS_WORKER_",
+        cli_prog_name="python -m app.jobs.consultas",
+        cli_kebab_case=True,
+        cli_implicit_flags=True,
+    )
+
+    workers: int = Field(1, ge=1, description="Workers concurrentes")
+    una_vez: bool = Field(
+        default=False, description="Vaciar la cola y terminar en lugar de esperar"
+    )
+
+
+def espera_reintento(intentos: int, base: float) -> float:
+    """Espera exponencial antes de reintentar una consulta (tope de 10 minutos)."""
+    return min(600.0, base * 2 ** max(0, intentos - 1))
+
+
+async def _procesar_item(
+    repository: ConsultaJobRepository, item: ConsultaJobItem, settings: Settings
+) -> None:
+    """Resuelve una consulta y registra el resultado en la cola."""
+    consulta = ConsultaAfiliadoRequest.model_validate(item.consulta)
+    session = get_database_config().get_session()
+    try:
+        # La sesión del SIS la administra el pool de credenciales
+        resultado = await AfiliadoService(session).consultar_afiliado(None, consulta)
+    finally:
+        session.close()
+
+    match resultado:
+        case Ok(afiliado):
+            registrado = repository.finalizar(
+                item,
+                EstadoItem.OK,
+                resultado=afiliado.model_dump(mode="json"),
+                status_code=status.HTTP_200_OK,
+            )
+        case Err((error_code, status_code, message)):
+            # Los errores transitorios del SIS se reintentan más tarde
+            if (
+                status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR
+                and item.intentos < settings.jobs_max_attempts
+            ):
+                registrado = repository.reintentar(
+                    item,
+                    espera_reintento(item.intentos, settings.jobs_retry_backoff),
+                    message,
+                )
+            else:
+                registrado = repository.finalizar(
+                    item,
+                    EstadoItem.ERROR,
+                    status_code=status_code,
+                    error_code=error_code.error_code,
+                    error_description=message,
+                )
+    if not registrado:
+        logger.warning(
+            "La consulta %s la reclamó otro worker; se descarta el resultado", item.id
+        )
+
+
+async def procesar_lote(settings: Settings) -> int:
+    """Reclama y procesa un lote de consultas; devuelve cuántas tomó."""
+    session = get_database_config().get_session()
+    try:
+        repository = ConsultaJobRepository(session)
+        descartadas = repository.descartar_agotadas(settings.jobs_max_attempts)
+        if descartadas:
+            logger.warning("%d consultas sin intentos restantes", descartadas)
+        items = repository.reclamar(
+            settings.jobs_batch_size,
+            settings.jobs_lease_seconds,
+            settings.jobs_max_attempts,
+        )
+        # Se confirma el reclamo para liberar los bloqueos de las filas
+        session.commit()
+        for item in items:
+            try:
+                # El lote se procesa en serie: cada consulta renueva su lease
+                # al empezar, y si venció mientras esperaba, otro worker ya
+                # la reclamó
+                renovada = repository.renovar(item, settings.jobs_lease_seconds)
+                session.commit()
+                if not renovada:
+                    logger.warning("La consulta %s la reclamó otro worker", item.id)
+                    continue
+                await _procesar_item(repository, item, settings)
+                session.commit()
+            except Exception:
+                session.rollback()
+                # La consulta vuelve a la cola cuando vence el lease
+                logger.exception("Error procesando la consulta %s", item.id)
+        return len(items)
+    finally:
+        session.close()
+
+
+async def trabajar(nombre: str, *, una_vez: bool = False) -> None:
+    """Procesa la cola hasta ser cancelado (o hasta vaciarla con ``una_vez``)."""
+    settings = get_settings()
+    logger.info("Worker de consultas %s iniciado", nombre)
+    while True:
+        try:
+            procesadas = await procesar_lote(settings)
+        except Exception:
+            logger.exception("Error reclamando consultas en el worker %s", nombre)
+            procesadas = 0
+        if procesadas:
+            continue
+        if una_vez:
+            return
+        await asyncio.sleep(settings.jobs_poll_interval)
+
+
+def iniciar_workers(cantidad: int) -> list[asyncio.Task]:
+    """Inicia ``cantidad`` workers como tareas del event loop actual."""
+    return [
+        asyncio.create_task(trabajar(f"api-{numero}"), name=f"consultas-{numero}")
+        for numero in range(cantidad)
+    ]
+
+
+async def detener_workers(tareas: list[asyncio.Task]) -> None:
+    """Cancela los workers y espera a que terminen.
+
+    Una consulta interrumpida queda ``en_proceso`` y la retoma otro worker
+    al vencer su lease.
+    """
+    for tarea in tareas:
+        tarea.cancel()
+    await asyncio.gather(*tareas, return_exceptions=True)
+
+
+async def ejecutar(args: ConsultasWorkerArgs) -> None:
+    """Ejecuta los workers en este proceso."""
+    await asyncio.gather(
+        *(
+            trabajar(f"cli-{numero}", una_vez=args.una_vez)
+            for numero in range(args.workers)
+        )
+    )
+
+
+def main() -> None:
+    """Punto de entrada de la línea de comandos."""
+    args = CliApp.run(ConsultasWorkerArgs)
+    asyncio.run(ejecutar(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Exportación de ``consulta`` y ``afiliado`` para entregas a MINSA o al SIS.
+
+Escribe por bloques desde un cursor del lado del servidor (o con ``COPY`` en
+el caso de CSV), así que la memoria no crece con el tamaño de la tabla.
+
+Examples:
+    >>> python -m app.jobs.exportar --tabla consulta --desde 2025-01-01
+    >>> python -m app.jobs.exportar --tabla consulta --salida consultas.csv
+    >>> python -m app.jobs.exportar --tabla afiliado --formato ndjson | gzip > a.gz
+
+"""
+
+import os
+import sys
+import time
+from datetime import date
+from pathlib import Path
+from typing import BinaryIO, Self
+
+from pydantic import Field, model_validator
+from pydantic_settings import BaseSettings, CliApp, SettingsConfigDict
+
+from app.services.exportacion import (
+    FormatoExportacion,
+    TablaExportable,
+    exportar,
+    formato_disponible,
+)
+from tools.config import get_settings
+from tools.logger import Logger
+
+# Configurar logging
+logger = Logger(__name__)
+
+
+class ExportarArgs(BaseSettings):
+    """Argumentos de la exportación."""
+
+    model_config = SettingsConfigDict(
+        env_prefix="EXPORTAR_",
+        cli_prog_name="python -m app.jobs.exportar",
+        cli_kebab_case=True,
+    )
+
+    tabla: TablaExportable = Field(..., description="Tabla a exportar")
+    formato: FormatoExportacion = Field(
+        FormatoExportacion.CSV, description="csv, ndjson o parquet (requiere pyarrow)"
+    )
+    desde: date | None = Field(
+        None,
+        description="Primer día incluido (created_at en consulta, VerifiedAt "
+        "en afiliado)",
+    )
+    hasta: date | None = Field(None, description="Último día incluido")
+    salida: Path | None = Field(
+        None, description="Archivo de salida; sin él se escribe en stdout"
+    )
+
+    @model_validator(mode="after")
+    def validar(self) -> Self:
+        """Validar el periodo y la disponibilidad del formato."""
+        if self.desde and self.hasta and self.desde > self.hasta:
+            message = "--desde no puede ser posterior a --hasta"
+            raise ValueError(message)
+        if not formato_disponible(self.formato):
+            message = "El formato parquet requiere instalar pyarrow"
+            raise ValueError(message)
+        return self
+
+
+def _stdout_para_datos() -> BinaryIO:
+    """Reserva stdout para los datos y envía a stderr todo lo demás.
+
+    Los logs (y el eco de SQL) escriben en stdout; se duplica el descriptor
+    original para los datos y el 1 pasa a apuntar a stderr.
+    """
+    sys.stdout.flush()
+    datos = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    return datos
+
+
+def main() -> None:
+    """Punto de entrada de la línea de comandos."""
+    args = CliApp.run(ExportarArgs)
+    lote = get_settings().exportacion_batch_size
+    inicio = time.perf_counter()
+    salida = args.salida.open("wb") if args.salida else _stdout_para_datos()
+    with salida as destino:
+        filas = exportar(
+            destino, args.tabla, args.formato, args.desde, args.hasta, lote=lote
+        )
+    logger.info(
+        "Exportación de %s finalizada: %d filas en %.1f s",
+        args.tabla,
+        filas,
+        time.perf_counter() - inicio,
+    )
+
+
+if __name__ == "__main__":
+    main()
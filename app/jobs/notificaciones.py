@@ -0,0 +1,271 @@
+"""Despachador de webhooks de las suscripciones a cambios de afiliados.
+
+Reclama lotes de la tabla ``notificacion`` con ``FOR UPDATE SKIP LOCKED``,
+agrupa los eventos de cada suscripción en un solo ``POST`` y reintenta con
+espera exponencial las entregas fallidas. Puede ejecutarse dentro de la API
+(``WEBHOOK_WORKERS``) o en procesos aparte.
+
+Examples:
+    >>> python -m app.jobs.notificaciones
+    >>> python -m app.jobs.notificaciones --workers 2 --una-vez
+
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+import httpx
+from pydantic import Field, HttpUrl, ValidationError
+from pydantic_settings import BaseSettings, CliApp, SettingsConfigDict
+
+from app.api.webhooks import resolver, validar_url
+from app.database import get_database_config
+from app.jobs.consultas import espera_reintento
+from app.models.suscripcion import Notificacion, Suscripcion
+from app.repositories.suscripcion_repository import SuscripcionRepository
+from tools.config import Settings, get_settings
+from tools.logger import Logger
+
+# Configurar logging
+logger = Logger(__name__)
+
+CABECERA_FIRMA = "X-SIS-Firma"
+
+
+class NotificacionesArgs(BaseSettings):
+    """Argumentos del despachador de webhooks."""
+
+    model_config = SettingsConfigDict(
+        env_prefix="NOTIFICACIONES_",
+        cli_prog_name="python -m app.jobs.notificaciones",
+        cli_kebab_case=True,
+        cli_implicit_flags=True,
+    )
+
+    workers: int = Field(1, ge=1, description="Despachadores concurrentes")
+    una_vez: bool = Field(
+        default=False, description="Vaciar la cola y terminar en lugar de esperar"
+    )
+
+
+def firmar(secreto: str, cuerpo: bytes) -> str:
+    """Firma HMAC-SHA256 del cuerpo, en el formato ``sha256=<hex>``."""
+    digest = hmac.new(secreto.encode(), cuerpo, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def armar_envio(
+    suscripcion: Suscripcion, notificaciones: list[Notificacion]
+) -> tuple[bytes, dict[str, str]]:
+    """Cuerpo y cabeceras del ``POST`` con los eventos de una suscripción."""
+    cuerpo = json.dumps(
+        {
+            "suscripcion_id": str(suscripcion.id),
+            "eventos": [{"id": n.id, **n.evento} for n in notificaciones],
+        },
+        separators=(",", ":"),
+    ).encode()
+    cabeceras = {"Content-Type": "application/json"}
+    if suscripcion.secreto:
+        cabeceras[CABECERA_FIRMA] = firmar(suscripcion.secreto, cuerpo)
+    return cuerpo, cabeceras
+
+
+async def _entregar(
+    cliente: httpx.AsyncClient,
+    suscripcion: Suscripcion,
+    notificaciones: list[Notificacion],
+) -> str | None:
+    """Envía los eventos de una suscripción; devuelve el error, si lo hubo.
+
+    El host se resuelve y valida en cada entrega y la conexión va a la
+    dirección validada, con el host original en ``Host`` y en el SNI del TLS:
+    un cambio posterior del DNS no puede desviarla a una dirección interna.
+    Las redirecciones no se siguen.
+    """
+    cuerpo, cabeceras = armar_envio(suscripcion, notificaciones)
+    try:
+        url = httpx.URL(str(validar_url(HttpUrl(suscripcion.webhook_url or ""))))
+        direcciones = await asyncio.to_thread(resolver, url.host, url.port or 443)
+    except (ValueError, ValidationError) as e:
+        return f"Destino rechazado: {e}"
+    try:
+        respuesta = await cliente.post(
+            url.copy_with(host=str(direcciones[0])),
+            content=cuerpo,
+            headers={**cabeceras, "Host": url.netloc.decode()},
+            extensions={"sni_hostname": url.host},
+        )
+    except httpx.HTTPError as e:
+        return f"{type(e).__name__}: {e}"
+    if respuesta.is_success:
+        return None
+    return f"HTTP {respuesta.status_code}"
+
+
+def _registrar_resultado(
+    repository: SuscripcionRepository,
+    notificaciones: list[Notificacion],
+    error: str | None,
+    settings: Settings,
+) -> None:
+    """Marca las entregas exitosas o programa sus reintentos."""
+    if error is None:
+        repository.marcar_enviadas([n.id for n in notificaciones])  # type: ignore
+        return
+    agotadas = [
+        n for n in notificaciones if n.intentos >= settings.webhook_max_attempts
+    ]
+    if agotadas:
+        repository.descartar([n.id for n in agotadas], error)  # type: ignore
+    for notificacion in notificaciones:
+        if notificacion not in agotadas:
+            repository.reintentar(
+                [notificacion.id],  # type: ignore
+                espera_reintento(notificacion.intentos, settings.webhook_retry_backoff),
+                error,
+            )
+
+
+async def procesar_lote(cliente: httpx.AsyncClient, settings: Settings) -> int:
+    """Reclama y entrega un lote de webhooks; devuelve cuántos tomó."""
+    session = get_database_config().get_session()
+    try:
+        repository = SuscripcionRepository(session)
+        notificaciones = repository.reclamar(
+            settings.webhook_batch_size, settings.webhook_lease_seconds
+        )
+        if not notificaciones:
+            session.commit()
+            return 0
+
+        por_suscripcion: dict[uuid.UUID, list[Notificacion]] = defaultdict(list)
+        for notificacion in notificaciones:
+            por_suscripcion[notificacion.suscripcion_id].append(notificacion)
+        suscripciones = repository.suscripciones(set(por_suscripcion))
+        # Se confirma el reclamo antes de salir a la red para no retener los
+        # bloqueos de las filas durante los envíos
+        session.commit()
+
+        destinos = [
+            (suscripciones[suscripcion_id], grupo)
+            for suscripcion_id, grupo in por_suscripcion.items()
+            if suscripcion_id in suscripciones
+        ]
+        errores = await asyncio.gather(
+            *(_entregar(cliente, s, grupo) for s, grupo in destinos)
+        )
+        for (suscripcion, grupo), error in zip(destinos, errores, strict=True):
+            if error is not None:
+                logger.warning(
+                    "Webhook de la suscripción %s falló: %s", suscripcion.id, error
+                )
+            _registrar_resultado(repository, grupo, error, settings)
+        session.commit()
+        return len(notificaciones)
+    finally:
+        session.close()
+
+
+async def trabajar(nombre: str, *, una_vez: bool = False) -> None:
+    """Entrega webhooks hasta ser cancelado (o hasta vaciar la cola)."""
+    settings = get_settings()
+    logger.info("Despachador de webhooks %s iniciado", nombre)
+    async with httpx.AsyncClient(timeout=settings.webhook_timeout) as cliente:
+        while True:
+            try:
+                procesadas = await procesar_lote(cliente, settings)
+            except Exception:
+                logger.exception("Error despachando webhooks en %s", nombre)
+                procesadas = 0
+            if procesadas:
+                continue
+            if una_vez:
+                return
+            await asyncio.sleep(settings.webhook_poll_interval)
+
+
+def iniciar_despachadores(cantidad: int) -> list[asyncio.Task]:
+    """Inicia ``cantidad`` despachadores como tareas del event loop actual."""
+    return [
+        asyncio.create_task(trabajar(f"api-{numero}"), name=f"webhooks-{numero}")
+        for numero in range(cantidad)
+    ]
+
+
+def evento_sse(notificacion: Notificacion) -> str:
+    """Formatea una notificación como evento *Server-Sent Events*."""
+    datos: dict[str, Any] = {"id": notificacion.id, **notificacion.evento}
+    return (
+        f"id: {notificacion.id}\n"
+        "event: afiliado\n"
+        f"data: {json.dumps(datos, separators=(',', ':'))}\n\n"
+    )
+
+
+async def stream_sse(
+    suscripcion_id: uuid.UUID,
+    desde_id: int | None,
+    desconectado: Callable[[], Awaitable[bool]],
+) -> AsyncIterator[str]:
+    """Emitir los eventos de una suscripción SSE hasta que el cliente se vaya.
+
+    Revisa la cola cada ``SSE_POLL_INTERVAL`` segundos y, sin eventos, envía
+    un comentario cada ``SSE_KEEPALIVE`` segundos para mantener abierta la
+    conexión en los proxies. ``desde_id`` (``Last-Event-ID``) solo aplica a
+    la primera lectura: al reconectar se reenvía lo posterior a ese evento.
+
+    Los eventos se marcan como enviados recién después de entregarlos al
+    cliente: si se desconecta antes, quedan pendientes para la próxima
+    conexión (un evento puede repetirse; su ``id`` permite descartarlo).
+    """
+    settings = get_settings()
+    db_config = get_database_config()
+    ultimo_envio = time.monotonic()
+    while not await desconectado():
+        with db_config.get_session_context() as session:
+            notificaciones = SuscripcionRepository(session).pendientes_sse(
+                suscripcion_id, desde_id, settings.webhook_batch_size
+            )
+        desde_id = None
+        for notificacion in notificaciones:
+            # El generador se reanuda cuando el evento anterior ya se envió
+            yield evento_sse(notificacion)
+        if notificaciones:
+            with db_config.get_session_context() as session:
+                SuscripcionRepository(session).marcar_enviadas(
+                    [n.id for n in notificaciones]  # type: ignore
+                )
+            ultimo_envio = time.monotonic()
+            continue
+        if time.monotonic() - ultimo_envio >= settings.sse_keepalive:
+            ultimo_envio = time.monotonic()
+            yield ": keepalive\n\n"
+        await asyncio.sleep(settings.sse_poll_interval)
+
+
+async def ejecutar(args: NotificacionesArgs) -> None:
+    """Ejecuta los despachadores en este proceso."""
+    await asyncio.gather(
+        *(
+            trabajar(f"cli-{numero}", una_vez=args.una_vez)
+            for numero in range(args.workers)
+        )
+    )
+
+
+def main() -> None:
+    """Punto de entrada de la línea de comandos."""
+    args = CliApp.run(NotificacionesArgs)
+    asyncio.run(ejecutar(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""Precarga de afiliados para las citas del día.
+
+Examples:
+    >>> python -m app.jobs.prefetch --archivo citas.csv --dni 46118717
+    >>> python -m app.jobs.prefetch --dni 46118717 --query "SELECT ..."
+
+"""
+
+import asyncio
+import csv
+import json
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Self
+
+from fastapi import status
+from pydantic import Field, ValidationError, model_validator
+from pydantic_settings import BaseSettings, CliApp, SettingsConfigDict
+from result import Err, Ok
+from sqlmodel import text
+
+from app.api.requests import ConsultaAfiliadoRequest
+from app.database import get_database_config
+from app.repositories.consulta_repository import ConsultaRepository
+from app.services.afiliado_service import AfiliadoService
+from tools.logger import Logger
+
+# Configurar logging
+logger = Logger(__name__)
+
+
+class PrefetchArgs(BaseSettings):
+    """Argumentos del job de precarga."""
+
+    model_config = SettingsConfigDict(
+        env_prefix="PREFETCH_",
+        cli_prog_name="python -m app.jobs.prefetch",
+    )
+
+    archivo: Path | None = Field(None, description="Archivo CSV o NDJSON")
+    query: str | None = Field(
+        None,
+        description="SQL sobre la tabla local de citas; debe devolver "
+        "nro_documento y opcionalmente tipo_documento",
+    )
+    dni: str = Field(..., description="DNI del responsable enviado al SIS")
+    usuario: str = Field("prefetch", description="Usuario registrado en consulta")
+    opcion: int = Field(1, description="Opción de consulta por defecto")
+    tipo_documento: str = Field("1", description="Tipo de documento por defecto")
+    tasa: float = Field(2.0, gt=0, description="Consultas por segundo al SIS")
+    checkpoint: Path | None = Field(
+        None, description="Archivo de avance para reanudar la ejecución"
+    )
+
+    @model_validator(mode="after")
+    def validar_origen(self) -> Self:
+        """Exigir exactamente un origen de documentos."""
+        if (self.archivo is None) == (self.query is None):
+            message = "Indique --archivo o --query (solo uno)"
+            raise ValueError(message)
+        return self
+
+
+@dataclass
+class Resumen:
+    """Contadores de una ejecución de precarga."""
+
+    actualizados: int = 0
+    en_cache: int = 0
+    omitidos: int = 0
+    errores: int = 0
+
+
+class Checkpoint:
+    """Registro de documentos ya procesados para reanudar la ejecución."""
+
+    def __init__(self, path: Path | None) -> None:
+        """Carga el avance previo, si existe."""
+        self.path = path
+        self.procesados: set[str] = set()
+        if path is not None and path.exists():
+            self.procesados = set(path.read_text(encoding="utf-8").split())
+
+    def __contains__(self, clave: str) -> bool:
+        """Indica si el documento ya fue procesado."""
+        return clave in self.procesados
+
+    def marcar(self, clave: str) -> None:
+        """Registra un documento como procesado."""
+        self.procesados.add(clave)
+        if self.path is not None:
+            with self.path.open("a", encoding="utf-8") as file:
+                file.write(f"{clave}\n")
+
+
+def _crear_consulta(
+    fila: dict[str, Any], args: PrefetchArgs
+) -> ConsultaAfiliadoRequest | None:
+    """Construye la consulta a partir de una fila del origen.
+
+    Las filas con un documento inválido para su tipo se descartan con un
+    aviso, sin consultar al SIS.
+    """
+    try:
+        return ConsultaAfiliadoRequest(
+            opcion=int(fila.get("opcion") or args.opcion),
+            dni=args.dni,
+            tipo_documento=str(fila.get("tipo_documento") or args.tipo_documento),
+            nro_documento=str(fila["nro_documento"]),
+            usuario=args.usuario,
+        )
+    except ValidationError as e:
+        logger.warning(
+            "Documento descartado %r: %s",
+            fila.get("nro_documento"),
+            "; ".join(error["msg"] for error in e.errors()),
+        )
+        return None
+
+
+def leer_documentos(args: PrefetchArgs) -> Iterator[ConsultaAfiliadoRequest]:
+    """Lee los documentos a precargar desde el archivo o la consulta SQL."""
+    if args.archivo is not None:
+        with args.archivo.open(encoding="utf-8") as file:
+            if args.archivo.suffix.lower() == ".csv":
+                filas: Iterator[dict[str, Any]] = csv.DictReader(file)
+            else:
+                filas = (json.loads(linea) for linea in file if linea.strip())
+            for fila in filas:
+                if (consulta := _crear_consulta(fila, args)) is not None:
+                    yield consulta
+        return
+
+    with get_database_config().get_session_context() as session:
+        filas_sql = session.exec(text(args.query or "")).mappings().all()  # type: ignore
+    for fila in filas_sql:
+        if (consulta := _crear_consulta(dict(fila), args)) is not None:
+            yield consulta
+
+
+async def ejecutar(args: PrefetchArgs) -> Resumen:
+    """Refresca los afiliados que aún no fueron consultados hoy."""
+    db_config = get_database_config()
+    checkpoint = Checkpoint(args.checkpoint)
+    resumen = Resumen()
+    intervalo = 1 / args.tasa
+    siguiente = time.monotonic()
+
+    for consulta in leer_documentos(args):
+        clave = f"{consulta.tipo_documento}:{consulta.nro_documento}"
+        if clave in checkpoint:
+            resumen.omitidos += 1
+            continue
+
+        session = db_config.get_session()
+        try:
+            if ConsultaRepository(session).verificar_consulta_hoy(
+                consulta.nro_documento
+            ):
+                resumen.en_cache += 1
+                checkpoint.marcar(clave)
+                continue
+
+            # Limitar la tasa de consultas al SIS
+            await asyncio.sleep(max(0.0, siguiente - time.monotonic()))
+            siguiente = time.monotonic() + intervalo
+
+            # La sesión del SIS la administra el pool de credenciales
+            match await AfiliadoService(session).consultar_afiliado(None, consulta):
+                case Ok(_):
+                    resumen.actualizados += 1
+                    checkpoint.marcar(clave)
+                case Err((error_code, status_code, message)):
+                    resumen.errores += 1
+                    logger.warning(
+                        "Error precargando %s: %s %s",
+                        clave,
+                        error_code.error_code,
+                        message,
+                    )
+                    # Los errores transitorios se reintentan en la próxima
+                    # ejecución
+                    if status_code < status.HTTP_500_INTERNAL_SERVER_ERROR:
+                        checkpoint.marcar(clave)
+        finally:
+            session.close()
+
+    return resumen
+
+
+def main() -> None:
+    """Punto de entrada de la línea de comandos."""
+    args = CliApp.run(PrefetchArgs)
+    resumen = asyncio.run(ejecutar(args))
+    logger.info(
+        "Precarga finalizada: %s actualizados, %s en caché, %s omitidos, %s errores",
+        resumen.actualizados,
+        resumen.en_cache,
+        resumen.omitidos,
+        resumen.errores,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Actualización periódica de los resúmenes de ``consulta`` para ``/reportes``.
+
+Puede ejecutarse dentro de la API (cada ``REPORTES_INTERVAL`` segundos) o en
+un proceso aparte, por ejemplo desde ``cron``. Varios procesos pueden
+actualizar a la vez: el avance se bloquea y ninguna consulta se cuenta dos
+veces.
+
+Examples:
+    >>> python -m app.jobs.reportes --una-vez
+    >>> python -m app.jobs.reportes
+
+"""
+
+import asyncio
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, CliApp, SettingsConfigDict
+
+from app.services.reportes import actualizar_resumenes
+from tools.config import get_settings
+from tools.logger import Logger
+
+# Configurar logging
+logger = Logger(__name__)
+
+
+class ReportesArgs(BaseSettings):
+    """Argumentos del actualizador de resúmenes."""
+
+    model_config = SettingsConfigDict(
+        env_prefix="REPORTES_JOB_",
+        cli_prog_name="python -m app.jobs.reportes",
+        cli_kebab_case=True,
+        cli_implicit_flags=True,
+    )
+
+    una_vez: bool = Field(
+        default=False, description="Ponerse al día y terminar en lugar de esperar"
+    )
+
+
+async def trabajar(*, una_vez: bool = False) -> None:
+    """Actualiza los resúmenes cada ``REPORTES_INTERVAL`` segundos."""
+    intervalo = get_settings().reportes_interval
+    while True:
+        try:
+            await asyncio.to_thread(actualizar_resumenes)
+        except Exception:
+            logger.exception("Error actualizando los resúmenes de consultas")
+        if una_vez or not intervalo:
+            return
+        await asyncio.sleep(intervalo)
+
+
+def iniciar_actualizador(intervalo: float) -> list[asyncio.Task]:
+    """Inicia la actualización periódica en el event loop actual (0 = no)."""
+    if not intervalo:
+        return []
+    return [asyncio.create_task(trabajar(), name="reportes")]
+
+
+def main() -> None:
+    """Punto de entrada de la línea de comandos."""
+    args = CliApp.run(ReportesArgs)
+    asyncio.run(trabajar(una_vez=args.una_vez))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
-import os
+import asyncio
+import uuid
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
 from typing import Annotated
 
 from api_exception import (
@@ -9,37 +11,115 @@ from api_exception import (
     ResponseModel,
     register_exception_handlers,
 )
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, Header, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
 from result import Err, Ok
 
+from tools.config import get_settings
 from tools.logger import Logger
 
-from .api.requests import ConsultaAfiliadoRequest, CredencialesRequest
-from .database import db_config
-from .models.afiliado import Afiliado
+from .api.documentos import normalizar_documento
+from .api.exceptions import CustomExceptionCode
+from .api.http_cache import (
+    cabeceras_afiliado,
+    cabeceras_cache,
+    coincide_etag,
+    etag,
+    inicio_del_dia,
+)
+from .api.middleware import (
+    DeadlineMiddleware,
+    LoadSheddingMiddleware,
+    MetricasCarga,
+)
+from .api.requests import (
+    ConsultaAfiliadoRequest,
+    ConsultaJobRequest,
+    CredencialesRequest,
+    SuscripcionRequest,
+)
+from .api.responses import respuesta_json
+from .database import get_database_config
+from .jobs.consultas import detener_workers, iniciar_workers
+from .jobs.notificaciones import iniciar_despachadores, stream_sse
+from .jobs.reportes import iniciar_actualizador
+from .models.afiliado import AfiliadoPublico, BusquedaAfiliados
+from .models.afiliado_historial import AfiliadoHistorial
+from .models.consulta_job import ConsultaJobEstado
+from .models.reporte import ReporteUso
+from .models.suscripcion import CanalSuscripcion, SuscripcionPublica
+from .repositories.consulta_job_repository import ConsultaJobRepository
+from .repositories.suscripcion_repository import SuscripcionRepository
 from .services.afiliado_service import AfiliadoService
-from .services.sis_service import SISService
+from .services.catalogos import precargar_catalogos
+from .services.exportacion import (
+    TIPOS_CONTENIDO,
+    CuposExportacion,
+    FormatoExportacion,
+    RespuestaExportacion,
+    TablaExportable,
+    exportar,
+    formato_disponible,
+    nombre_archivo,
+    stream_exportacion,
+)
+from .services.health_service import get_health_monitor
+from .services.reportes import armar_reporte
+from .services.sis_credenciales import get_pool_credenciales
+from .services.sis_service import SISService, get_latencias_sis, get_soap_client
 
 # Configurar logging
 logger = Logger(__name__)
 
 
+def precargar_cliente_soap() -> None:
+    """Descarga el WSDL del SIS para que la primera consulta no lo espere."""
+    try:
+        get_soap_client()
+    except Exception:
+        logger.warning("No se pudo precargar el WSDL del SIS; se reintentará")
+
+
 # Contexto de vida de la aplicación
 @asynccontextmanager
-async def lifespan(app: FastAPI) -> AsyncGenerator[None]:  # noqa: ARG001
-    """Contexto de vida de la aplicación."""
+async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
+    """Contexto de vida de la aplicación.
+
+    El arranque no hace I/O bloqueante: el monitor de salud verifica
+    PostgreSQL y el SIS en segundo plano (``/readyz`` responde 503 hasta el
+    primer chequeo) y el WSDL y los catálogos se precargan en hilos.
+    """
     # Startup
     logger.info("🚀 Iniciando aplicación SIS-MS...")
 
-    # Probar conexión a la base de datos PostgreSQL
-    if db_config.test_connection():
-        logger.info("✅ Conexión a PostgreSQL establecida")
-    else:
-        logger.info("❌ Error al conectar con PostgreSQL")
+    # Monitor de salud en segundo plano para los probes
+    health_monitor = get_health_monitor()
+    await health_monitor.start()
+
+    # Se guarda la referencia para que la tarea no sea recolectada
+    if get_settings().soap_sis:
+        app.state.precarga_wsdl = asyncio.create_task(
+            asyncio.to_thread(precargar_cliente_soap), name="precarga-wsdl"
+        )
+
+    # Catálogos de descripciones en memoria, también sin bloquear el arranque
+    app.state.precarga_catalogos = asyncio.create_task(
+        asyncio.to_thread(precargar_catalogos), name="precarga-catalogos"
+    )
+
+    # Workers de las consultas asíncronas y de los webhooks dentro del
+    # proceso de la API
+    workers = iniciar_workers(get_settings().jobs_workers)
+    workers += iniciar_despachadores(get_settings().webhook_workers)
+    # Resúmenes de consultas para /reportes
+    workers += iniciar_actualizador(get_settings().reportes_interval)
 
     yield
-    db_config.close()
+    await detener_workers(workers)
+    await health_monitor.stop()
+    get_database_config().close()
 
     # Shutdown
     logger.info("🛑 Cerrando aplicación SIS-MS...")
@@ -66,9 +146,37 @@ def get_sis_service() -> SISService:
 # Dependency injection para el servicio
 def get_afiliado_service() -> AfiliadoService:
     """Dependencia para obtener el servicio de Afiliado."""
-    return AfiliadoService(db_session=db_config.get_session())
+    return AfiliadoService(db_session=get_database_config().get_session())
 
 
+# Control de carga de entrada: límites por cliente y global, cupos en curso
+settings = get_settings()
+metricas_carga = MetricasCarga()
+rutas_sin_limite = frozenset({"/livez", "/readyz", "/health", "/metrics"})
+app.add_middleware(
+    LoadSheddingMiddleware,
+    metricas=metricas_carga,
+    client_rate=settings.inbound_client_rate,
+    client_burst=settings.inbound_client_burst,
+    global_rate=settings.inbound_global_rate,
+    global_burst=settings.inbound_global_burst,
+    max_in_flight=settings.inbound_max_in_flight,
+    max_queue_time=settings.inbound_max_queue_time,
+    trust_forwarded=settings.inbound_trust_forwarded,
+    exempt_paths=rutas_sin_limite,
+    stream_prefixes=("/eventos/", "/exportaciones/"),
+)
+
+# Plazo por solicitud; va por fuera del control de carga para que la espera
+# de un cupo también se descuente del plazo
+app.add_middleware(
+    DeadlineMiddleware,
+    por_defecto=settings.request_timeout,
+    maximo=settings.request_timeout_max,
+    exempt_paths=rutas_sin_limite,
+    stream_prefixes=("/eventos/", "/exportaciones/"),
+)
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -97,8 +205,12 @@ async def read_root() -> dict:
 
 @app.get("/health", tags=["Health"])
 async def health_check() -> dict:
-    """Endpoint para verificar el estado de la aplicación."""
-    db_status = db_config.test_connection()
+    """Endpoint para verificar el estado de la aplicación.
+
+    Usa la última instantánea del monitor de salud en lugar de consultar la
+    base de datos en cada llamada.
+    """
+    db_status = get_health_monitor().estado.database.ok
 
     return {
         "status": "healthy" if db_status else "unhealthy",
@@ -107,6 +219,41 @@ async def health_check() -> dict:
     }
 
 
+@app.get("/livez", tags=["Health"])
+async def livez() -> dict:
+    """Liveness probe: confirma que el proceso responde, sin hacer I/O."""
+    return {"status": "alive"}
+
+
+@app.get("/readyz", tags=["Health"])
+async def readyz() -> JSONResponse:
+    """Readiness probe: devuelve el estado cacheado por el monitor de salud."""
+    health_monitor = get_health_monitor()
+    ready = health_monitor.is_ready
+    return JSONResponse(
+        status_code=status.HTTP_200_OK
+        if ready
+        else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if ready else "not_ready",
+            **health_monitor.estado.to_dict(),
+        },
+    )
+
+
+@app.get("/metrics", tags=["Health"])
+async def metrics() -> dict:
+    """Métricas del control de carga, del pool de credenciales y del SIS."""
+    return {
+        "carga": metricas_carga.to_dict(),
+        "sis": get_pool_credenciales().estado(),
+        "sis_latencia_ms": {
+            operacion: round(latencia.segundos * 1_000, 3)
+            for operacion, latencia in get_latencias_sis().items()
+        },
+    }
+
+
 # Endpoints
 @app.post(
     "/login",
@@ -136,42 +283,372 @@ async def login(
 @app.post(
     "/consultar_afiliado",
     tags=["SIS"],
+    response_model=ResponseModel[AfiliadoPublico],
     responses=APIResponse.default(),  # type: ignore
 )
 async def consultar_afiliado(
     consulta: ConsultaAfiliadoRequest,
-    sis_service: Annotated[SISService, Depends(get_sis_service)],
     afiliado_service: Annotated[AfiliadoService, Depends(get_afiliado_service)],
-) -> ResponseModel[Afiliado]:
+) -> Response:
     """Consultar afiliado FuaE."""
-    token = None
-    match await sis_service.get_session(
-        CredencialesRequest(
-            usuario=os.getenv("SOAP_USER", "sis_user"),
-            clave=os.getenv("SOAP_PASSWORD", "sis_password"),
+    afiliado = await _consultar_afiliado(consulta, afiliado_service)
+    return respuesta_json(AfiliadoPublico, afiliado, "Consulta realizada correctamente")
+
+
+@app.get(
+    "/afiliados/{tipo_documento}/{nro_documento}",
+    tags=["SIS"],
+    response_model=ResponseModel[AfiliadoPublico],
+    responses=APIResponse.default(),  # type: ignore
+)
+async def obtener_afiliado(  # noqa: PLR0913, PLR0917
+    tipo_documento: str,
+    nro_documento: str,
+    dni: Annotated[str, Query(description="DNI del responsable")],
+    usuario: Annotated[str, Query(description="Usuario que realiza la consulta")],
+    afiliado_service: Annotated[AfiliadoService, Depends(get_afiliado_service)],
+    opcion: Annotated[int, Query(description="Opción de consulta")] = 1,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    """Consultar afiliado con soporte de caché HTTP.
+
+    El documento se normaliza antes de leer la caché (``DOC-422`` si no es
+    válido para el tipo). Si ``If-None-Match`` coincide con el contenido
+    almacenado y este fue verificado hoy, responde 304 sin cuerpo tras leer
+    solo los validadores.
+    """
+    try:
+        consulta = ConsultaAfiliadoRequest(
+            opcion=opcion,
+            dni=dni,
+            tipo_documento=tipo_documento,
+            nro_documento=nro_documento,
+            usuario=usuario,
         )
-    ):
-        case Ok(value):
-            token = value
+    except ValidationError as e:
+        raise APIException(
+            error_code=CustomExceptionCode.INVALID_DOCUMENT,
+            http_status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            message="; ".join(error["msg"] for error in e.errors()),
+        ) from e
 
-        case Err((error_code, status_code)):
+    if if_none_match:
+        validadores = await afiliado_service.obtener_validadores(consulta.nro_documento)
+        if validadores is not None:
+            content_hash, verificado = validadores
+            if (
+                content_hash
+                and verificado
+                and verificado >= inicio_del_dia()
+                and coincide_etag(if_none_match, etag(content_hash))
+            ):
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED,
+                    headers=cabeceras_cache(content_hash, verificado),
+                )
+
+    afiliado = await _consultar_afiliado(consulta, afiliado_service)
+    return respuesta_json(
+        AfiliadoPublico,
+        afiliado,
+        "Consulta realizada correctamente",
+        headers=cabeceras_afiliado(afiliado),
+    )
+
+
+async def _consultar_afiliado(
+    consulta: ConsultaAfiliadoRequest, afiliado_service: AfiliadoService
+) -> AfiliadoPublico:
+    """Consulta el afiliado con caché.
+
+    La sesión del SIS se obtiene del pool de credenciales solo si la consulta
+    no se resuelve desde la caché.
+    """
+    match await afiliado_service.consultar_afiliado(None, consulta):
+        case Ok(afiliado):
+            return afiliado
+
+        case Err((error_code, status_code, message)):
             raise APIException(
                 error_code=error_code,
                 http_status_code=status_code,
                 log_exception=True,
+                message=message,
             )
 
-    match await afiliado_service.consultar_afiliado(token, consulta):
-        case Ok(afiliado):
-            return ResponseModel[Afiliado](
-                data=afiliado,
-                message="Consulta realizada correctamente",
+
+@app.get(
+    "/afiliados/buscar",
+    tags=["SIS"],
+    response_model=ResponseModel[BusquedaAfiliados],
+    responses=APIResponse.default(),  # type: ignore
+)
+async def buscar_afiliados(
+    q: Annotated[
+        str,
+        Query(min_length=3, max_length=100, description="Apellidos y/o nombres"),
+    ],
+    afiliado_service: Annotated[AfiliadoService, Depends(get_afiliado_service)],
+    limite: Annotated[int, Query(ge=1, le=100)] = 20,
+    despues: Annotated[
+        str | None, Query(description="Cursor ``siguiente`` de la página anterior")
+    ] = None,
+) -> Response:
+    """Buscar afiliados de la caché local por apellidos y nombres.
+
+    No consulta al SIS: solo encuentra afiliados consultados antes. Los
+    resultados se ordenan por nombre completo y se paginan por cursor.
+    """
+    match await afiliado_service.buscar_por_nombre(q, limite, despues):
+        case Ok(busqueda):
+            return respuesta_json(
+                BusquedaAfiliados, busqueda, "Búsqueda realizada correctamente"
             )
 
         case Err((error_code, status_code, message)):
             raise APIException(
                 error_code=error_code,
                 http_status_code=status_code,
-                log_exception=True,
                 message=message,
             )
+
+
+@app.get(
+    "/afiliado/{nro_documento}/historial",
+    tags=["SIS"],
+    response_model=ResponseModel[list[AfiliadoHistorial]],
+    responses=APIResponse.default(),  # type: ignore
+)
+async def historial_afiliado(
+    nro_documento: str,
+    afiliado_service: Annotated[AfiliadoService, Depends(get_afiliado_service)],
+    tipo_documento: Annotated[str, Query(description="Tipo de documento")] = "1",
+    limite: Annotated[int, Query(ge=1, le=500)] = 50,
+) -> Response:
+    """Historial de cambios de un afiliado, del más reciente al más antiguo.
+
+    El documento se normaliza como en las consultas (``DOC-422`` si no es
+    válido para el tipo), así que sus variantes comparten historial.
+    """
+    try:
+        numero = normalizar_documento(tipo_documento, nro_documento)
+    except ValueError as e:
+        raise APIException(
+            error_code=CustomExceptionCode.INVALID_DOCUMENT,
+            http_status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            message=str(e),
+        ) from e
+    historial = await afiliado_service.obtener_historial(numero, limite)
+    return respuesta_json(
+        list[AfiliadoHistorial], historial, "Historial obtenido correctamente"
+    )
+
+
+@app.post(
+    "/consultas/jobs",
+    tags=["SIS"],
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=ResponseModel[ConsultaJobEstado],
+    responses=APIResponse.default(),  # type: ignore
+)
+async def crear_job_consultas(job_request: ConsultaJobRequest) -> Response:
+    """Encolar consultas de afiliado para procesarlas en segundo plano.
+
+    Responde de inmediato con el identificador del job; el avance y los
+    resultados se consultan en ``GET /consultas/jobs/{job_id}``.
+    """
+    with get_database_config().get_session_context() as session:
+        repository = ConsultaJobRepository(session)
+        job = repository.encolar(job_request.consultas)
+        session.flush()
+        estado = ConsultaJobEstado.desde_items(job, repository.listar_items(job.id))
+    return respuesta_json(
+        ConsultaJobEstado,
+        estado,
+        "Consultas encoladas correctamente",
+        headers={"Location": f"/consultas/jobs/{job.id}"},
+        status_code=status.HTTP_202_ACCEPTED,
+    )
+
+
+@app.get(
+    "/consultas/jobs/{job_id}",
+    tags=["SIS"],
+    response_model=ResponseModel[ConsultaJobEstado],
+    responses=APIResponse.default(),  # type: ignore
+)
+async def obtener_job_consultas(job_id: uuid.UUID) -> Response:
+    """Avance y resultados de un job de consultas."""
+    with get_database_config().get_session_context() as session:
+        repository = ConsultaJobRepository(session)
+        job = repository.obtener(job_id)
+        items = repository.listar_items(job_id) if job is not None else []
+    if job is None:
+        raise APIException(
+            error_code=CustomExceptionCode.JOB_NOT_FOUND,
+            http_status_code=status.HTTP_404_NOT_FOUND,
+        )
+    return respuesta_json(
+        ConsultaJobEstado,
+        ConsultaJobEstado.desde_items(job, items),
+        "Job obtenido correctamente",
+    )
+
+
+@app.post(
+    "/suscripciones",
+    tags=["Suscripciones"],
+    status_code=status.HTTP_201_CREATED,
+    response_model=ResponseModel[SuscripcionPublica],
+    responses=APIResponse.default(),  # type: ignore
+)
+async def crear_suscripcion(suscripcion_request: SuscripcionRequest) -> Response:
+    """Suscribirse a los cambios de un afiliado.
+
+    Cada vez que una consulta al SIS cambia el contenido del afiliado se
+    entrega un evento por webhook (``POST`` a ``webhook_url``) o por el
+    stream ``GET /eventos/{suscripcion_id}`` (canal ``sse``).
+    """
+    with get_database_config().get_session_context() as session:
+        suscripcion = SuscripcionRepository(session).crear(suscripcion_request)
+    return respuesta_json(
+        SuscripcionPublica,
+        SuscripcionPublica.desde(suscripcion),
+        "Suscripción creada correctamente",
+        headers={"Location": f"/suscripciones/{suscripcion.id}"},
+        status_code=status.HTTP_201_CREATED,
+    )
+
+
+@app.delete(
+    "/suscripciones/{suscripcion_id}",
+    tags=["Suscripciones"],
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses=APIResponse.default(),  # type: ignore
+)
+async def eliminar_suscripcion(suscripcion_id: uuid.UUID) -> Response:
+    """Eliminar una suscripción y sus eventos pendientes."""
+    with get_database_config().get_session_context() as session:
+        eliminada = SuscripcionRepository(session).eliminar(suscripcion_id)
+    if not eliminada:
+        raise APIException(
+            error_code=CustomExceptionCode.SUSCRIPCION_NOT_FOUND,
+            http_status_code=status.HTTP_404_NOT_FOUND,
+        )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@app.get(
+    "/eventos/{suscripcion_id}",
+    tags=["Suscripciones"],
+    response_class=StreamingResponse,
+    responses=APIResponse.default(),  # type: ignore
+)
+async def eventos_suscripcion(
+    suscripcion_id: uuid.UUID,
+    request: Request,
+    last_event_id: Annotated[int | None, Header()] = None,
+) -> StreamingResponse:
+    """Stream SSE con los cambios de una suscripción de canal ``sse``.
+
+    Con ``Last-Event-ID`` se reenvían los eventos posteriores al indicado.
+    """
+    with get_database_config().get_session_context() as session:
+        suscripcion = SuscripcionRepository(session).obtener(suscripcion_id)
+    if suscripcion is None or suscripcion.canal != CanalSuscripcion.SSE:
+        raise APIException(
+            error_code=CustomExceptionCode.SUSCRIPCION_NOT_FOUND,
+            http_status_code=status.HTTP_404_NOT_FOUND,
+        )
+    return StreamingResponse(
+        stream_sse(suscripcion_id, last_event_id, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Periodo máximo de un reporte de uso
+DIAS_MAXIMOS_REPORTE = 366
+
+
+@app.get(
+    "/reportes",
+    tags=["Reportes"],
+    response_model=ResponseModel[ReporteUso],
+    responses=APIResponse.default(),  # type: ignore
+)
+async def reporte_uso(
+    desde: Annotated[
+        date | None, Query(description="Primer día (hace 29 días)")
+    ] = None,
+    hasta: Annotated[date | None, Query(description="Último día (hoy)")] = None,
+    usuario: Annotated[str | None, Query(description="Solo este usuario")] = None,
+) -> Response:
+    """Consultas por día y por usuario, uso de la caché y errores por código.
+
+    Lee solo los resúmenes diarios, que se actualizan cada
+    ``REPORTES_INTERVAL`` segundos; ``actualizado_at`` indica la última
+    actualización.
+    """
+    hasta = hasta or datetime.now().date()  # noqa: DTZ005
+    desde = desde or hasta - timedelta(days=29)
+    if desde > hasta or (hasta - desde).days >= DIAS_MAXIMOS_REPORTE:
+        raise APIException(
+            error_code=CustomExceptionCode.REPORTE_INVALIDO,
+            http_status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    with get_database_config().get_session_context() as session:
+        reporte = armar_reporte(session, desde, hasta, usuario)
+    return respuesta_json(ReporteUso, reporte, "Reporte generado correctamente")
+
+
+# Exportaciones en curso en este proceso; cada una ocupa una conexión
+cupos_exportacion = CuposExportacion(settings.exportacion_max_concurrency)
+
+
+@app.get(
+    "/exportaciones/{tabla}",
+    tags=["Reportes"],
+    response_class=StreamingResponse,
+    responses=APIResponse.default(),  # type: ignore
+)
+async def exportar_tabla(
+    tabla: TablaExportable,
+    formato: FormatoExportacion = FormatoExportacion.CSV,
+    desde: Annotated[date | None, Query(description="Primer día incluido")] = None,
+    hasta: Annotated[date | None, Query(description="Último día incluido")] = None,
+) -> StreamingResponse:
+    """Exportar ``consulta`` (por ``created_at``) o ``afiliado`` (por ``VerifiedAt``).
+
+    La respuesta se transmite por bloques a medida que se lee la tabla, sin
+    cargarla en memoria. Se permiten ``EXPORTACION_MAX_CONCURRENCY``
+    exportaciones simultáneas por proceso.
+    """
+    if not formato_disponible(formato):
+        raise APIException(
+            error_code=CustomExceptionCode.FORMATO_NO_DISPONIBLE,
+            http_status_code=status.HTTP_501_NOT_IMPLEMENTED,
+        )
+    if not cupos_exportacion.tomar():
+        raise APIException(
+            error_code=CustomExceptionCode.SERVICE_OVERLOADED,
+            http_status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            message="Hay demasiadas exportaciones en curso",
+        )
+    archivo = nombre_archivo(tabla, formato, desde, hasta)
+    # El cupo se libera en la respuesta, aunque el cuerpo nunca se transmita
+    return RespuestaExportacion(
+        stream_exportacion(
+            lambda destino: exportar(
+                destino,
+                tabla,
+                formato,
+                desde,
+                hasta,
+                lote=settings.exportacion_batch_size,
+            )
+        ),
+        cupos_exportacion,
+        media_type=TIPOS_CONTENIDO[formato],
+        headers={"Content-Disposition": f'attachment; filename="{archivo}"'},
+    )
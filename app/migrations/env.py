@@ -6,7 +6,13 @@ from sqlmodel import SQLModel
 
 from app.database import DatabaseConfig
 from app.models.afiliado import Afiliado
+from app.models.catalogo import Eess, TipoSeguro, Ubigeo
 from app.models.consulta import Consulta
+from app.models.afiliado_historial import AfiliadoHistorial
+from app.models.rate_limit import SISRateLimit
+from app.models.consulta_job import ConsultaJob, ConsultaJobItem
+from app.models.suscripcion import Notificacion, Suscripcion
+from app.models.reporte import ConsultaErrorDiario, ConsultaUsoDiario, ReporteAvance
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,164 @@
+"""afiliado tipado
+
+Revision ID: 8e3f0b6c2a17
+Revises: 5a1c7e2d9b41
+Create Date: 2026-10-19 11:04:27.530912
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e3f0b6c2a17'
+down_revision: Union[str, Sequence[str], None] = '5a1c7e2d9b41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Largo máximo de cada columna de texto
+LONGITUDES = {
+    'IdError': 10,
+    'Resultado': 255,
+    'TipoDocumento': 5,
+    'NroDocumento': 20,
+    'ApePaterno': 100,
+    'ApeMaterno': 100,
+    'Nombres': 100,
+    'EESS': 20,
+    'DescEESS': 200,
+    'EESSUbigeo': 10,
+    'DescEESSUbigeo': 200,
+    'Regimen': 10,
+    'TipoSeguro': 10,
+    'DescTipoSeguro': 100,
+    'Contrato': 50,
+    'Estado': 20,
+    'Tabla': 10,
+    'IdNumReg': 20,
+    'Genero': 5,
+    'IdUbigeo': 10,
+    'Disa': 10,
+    'TipoFormato': 10,
+    'NroContrato': 20,
+    'Correlativo': 20,
+    'IdPlan': 10,
+    'IdGrupoPoblacional': 10,
+    'MsgConfidencial': 500,
+}
+
+FECHAS = ('FecAfiliacion', 'FecCaducidad', 'FecNacimiento')
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+
+# Convierte los formatos de fecha del SIS a DATE con las mismas reglas que
+# app.models.afiliado.parsear_fecha: las fechas inexistentes (20231399,
+# 31/02/2023) quedan NULL en lugar de abortar el ALTER
+FUNCION_FECHA = r"""
+CREATE FUNCTION pg_temp.fecha_sis(valor text) RETURNS date
+LANGUAGE plpgsql IMMUTABLE AS $$
+DECLARE
+    texto text := btrim(valor);
+    fecha date;
+BEGIN
+    IF texto ~ '^\d{8}$' THEN
+        fecha := to_date(texto, 'YYYYMMDD');
+    ELSIF texto ~ '^\d{2}/\d{2}/\d{4}' THEN
+        fecha := to_date(left(texto, 10), 'DD/MM/YYYY');
+    ELSIF texto ~ '^\d{4}-\d{2}-\d{2}' THEN
+        fecha := to_date(left(texto, 10), 'YYYY-MM-DD');
+    ELSE
+        RETURN NULL;
+    END IF;
+    -- El año 0000 sería 1 a. C.
+    IF fecha < DATE '0001-01-01' THEN
+        RETURN NULL;
+    END IF;
+    RETURN fecha;
+EXCEPTION WHEN datetime_field_overflow OR invalid_datetime_format THEN
+    RETURN NULL;
+END
+$$
+"""
+
+
+def _parsear_fecha(columna: str) -> str:
+    """Expresión SQL que convierte los formatos de fecha del SIS a DATE."""
+    return f"pg_temp.fecha_sis(\"{columna}\")"
+
+
+def _contar_perdidas() -> dict[str, int]:
+    """Filas cuyo valor se recortaría o quedaría NULL, por columna."""
+    texto = [
+        f"count(*) FILTER (WHERE nullif(btrim(left(\"{columna}\", {longitud})), '') "
+        f"IS DISTINCT FROM nullif(btrim(\"{columna}\"), ''))"
+        for columna, longitud in LONGITUDES.items()
+    ]
+    fechas = [
+        f"count(*) FILTER (WHERE nullif(btrim(\"{columna}\"), '') IS NOT NULL "
+        f"AND ({_parsear_fecha(columna)}) IS NULL)"
+        for columna in FECHAS
+    ]
+    fila = op.get_bind().execute(
+        sa.text(f"SELECT {', '.join(texto + fechas)} FROM afiliado")
+    ).one()
+    columnas = [*LONGITUDES, *FECHAS]
+    return {c: n for c, n in zip(columnas, fila, strict=True) if n}
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Los textos más largos que la nueva columna se recortan y las fechas que
+    no se pueden interpretar quedan NULL. Antes de cambiar los tipos se
+    cuentan esas filas: si hay alguna, la migración se detiene salvo que se
+    acepte la pérdida con ``alembic -x permitir_perdida=1 upgrade head``.
+    """
+    op.execute(FUNCION_FECHA)
+    perdidas = _contar_perdidas()
+    for columna, filas in perdidas.items():
+        logger.warning(
+            'afiliado.%s: %d filas se recortarán o quedarán NULL', columna, filas
+        )
+    if perdidas and not context.get_x_argument(as_dictionary=True).get(
+        'permitir_perdida'
+    ):
+        raise RuntimeError(
+            'La migración recortaría o anularía datos de afiliado '
+            f'({sum(perdidas.values())} valores); revise los avisos y ejecute '
+            'con -x permitir_perdida=1 para aceptar la pérdida'
+        )
+    for columna, longitud in LONGITUDES.items():
+        op.alter_column('afiliado', columna,
+               existing_type=sqlmodel.sql.sqltypes.AutoString(),
+               type_=sqlmodel.sql.sqltypes.AutoString(length=longitud),
+               existing_nullable=True,
+               postgresql_using=f"nullif(btrim(left(\"{columna}\", {longitud})), '')")
+    for columna in FECHAS:
+        op.alter_column('afiliado', columna,
+               existing_type=sqlmodel.sql.sqltypes.AutoString(),
+               type_=sa.Date(),
+               existing_nullable=True,
+               postgresql_using=_parsear_fecha(columna))
+    op.execute('DROP FUNCTION pg_temp.fecha_sis(text)')
+    op.create_index(op.f('ix_afiliado_FecCaducidad'), 'afiliado', ['FecCaducidad'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_afiliado_FecCaducidad'), table_name='afiliado')
+    for columna in FECHAS:
+        op.alter_column('afiliado', columna,
+               existing_type=sa.Date(),
+               type_=sqlmodel.sql.sqltypes.AutoString(),
+               existing_nullable=True,
+               postgresql_using=f"to_char(\"{columna}\", 'YYYYMMDD')")
+    for columna in LONGITUDES:
+        op.alter_column('afiliado', columna,
+               existing_type=sqlmodel.sql.sqltypes.AutoString(length=LONGITUDES[columna]),
+               type_=sqlmodel.sql.sqltypes.AutoString(),
+               existing_nullable=True)
@@ -0,0 +1,57 @@
+"""catalogos
+
+Revision ID: e7f1a2b9c835
+Revises: d5a8c3e61b24
+Create Date: 2026-10-19 20:14:52.903417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7f1a2b9c835'
+down_revision: Union[str, Sequence[str], None] = 'd5a8c3e61b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Catálogo -> (columna del código, columna de la descripción, largo original)
+CATALOGOS = {
+    'eess': ('EESS', 'DescEESS', 200),
+    'ubigeo': ('EESSUbigeo', 'DescEESSUbigeo', 200),
+    'tipo_seguro': ('TipoSeguro', 'DescTipoSeguro', 100),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for tabla, (codigo, descripcion, _) in CATALOGOS.items():
+        op.create_table(tabla,
+        sa.Column('codigo', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+        sa.Column('descripcion', sqlmodel.sql.sqltypes.AutoString(length=200), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('codigo')
+        )
+        # Se conserva la descripción más reciente de cada código
+        op.execute(
+            f'INSERT INTO {tabla} (codigo, descripcion, updated_at) '
+            f'SELECT DISTINCT ON ("{codigo}") "{codigo}", "{descripcion}", now() '
+            f'FROM afiliado '
+            f'WHERE "{codigo}" IS NOT NULL AND "{descripcion}" IS NOT NULL '
+            f'ORDER BY "{codigo}", "VerifiedAt" DESC NULLS LAST'
+        )
+        op.drop_column('afiliado', descripcion)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for tabla, (codigo, descripcion, longitud) in CATALOGOS.items():
+        op.add_column('afiliado', sa.Column(descripcion, sqlmodel.sql.sqltypes.AutoString(length=longitud), nullable=True))
+        op.execute(
+            f'UPDATE afiliado SET "{descripcion}" = left(c.descripcion, {longitud}) '
+            f'FROM {tabla} c WHERE c.codigo = afiliado."{codigo}"'
+        )
+        op.drop_table(tabla)
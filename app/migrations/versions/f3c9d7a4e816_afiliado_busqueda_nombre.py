@@ -0,0 +1,75 @@
+"""afiliado busqueda nombre
+
+Revision ID: f3c9d7a4e816
+Revises: e7f1a2b9c835
+Create Date: 2026-10-19 21:37:05.118264
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c9d7a4e816'
+down_revision: Union[str, Sequence[str], None] = 'e7f1a2b9c835'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Debe coincidir con NOMBRE_COMPLETO de app/models/afiliado.py
+NOMBRE_COMPLETO = (
+    "(coalesce(\"ApePaterno\", '') || ' ' || coalesce(\"ApeMaterno\", '') "
+    "|| ' ' || coalesce(\"Nombres\", ''))"
+)
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    pg_trgm es parte de los módulos contrib de PostgreSQL (disponible en los
+    servicios administrados). Sin ella la búsqueda funciona, pero recorre el
+    índice B-tree filtrando en lugar de usar los trigramas: la migración se
+    detiene salvo que se acepte con ``alembic -x sin_trgm=1 upgrade head``.
+    """
+    disponible = op.get_bind().execute(sa.text(
+        "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+    )).scalar()
+    if disponible:
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    elif context.get_x_argument(as_dictionary=True).get('sin_trgm'):
+        logger.warning(
+            'pg_trgm no está disponible; se omite '
+            'ix_afiliado_nombre_completo_trgm y la búsqueda por nombre '
+            'recorrerá el índice B-tree'
+        )
+    else:
+        raise RuntimeError(
+            'La extensión pg_trgm no está disponible (paquete contrib de '
+            'PostgreSQL); instálela o ejecute con -x sin_trgm=1 para crear '
+            'solo el índice B-tree'
+        )
+    # CONCURRENTLY no bloquea las escrituras en afiliado mientras se construyen
+    # los índices, pero no puede ejecutarse dentro de una transacción
+    with op.get_context().autocommit_block():
+        if disponible:
+            op.create_index('ix_afiliado_nombre_completo_trgm', 'afiliado',
+                            [sa.text(f'{NOMBRE_COMPLETO} gin_trgm_ops')],
+                            unique=False, postgresql_using='gin',
+                            postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_afiliado_nombre_completo_id', 'afiliado',
+                        [sa.text(NOMBRE_COMPLETO), 'id'],
+                        unique=False, postgresql_concurrently=True,
+                        if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_afiliado_nombre_completo_id', table_name='afiliado',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_afiliado_nombre_completo_trgm', table_name='afiliado',
+                      postgresql_concurrently=True, if_exists=True)
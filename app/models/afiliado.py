@@ -1,40 +1,231 @@
-from datetime import datetime
+import hashlib
+import json
+import re
+from datetime import date, datetime
+from typing import Any, Self
 
-from sqlmodel import Field, SQLModel
+from sqlalchemy import Date, Index, func
+from sqlmodel import AutoString, Field, SQLModel
 
+from app.models.catalogo import DIMENSIONES, CatalogoBase
+from tools.logger import Logger
 
-class Afiliado(SQLModel, table=True):
-    """Modelo de afiliado."""
+# Configurar logging
+logger = Logger(__name__)
+
+# Formatos de fecha que puede devolver el SIS: patrón del inicio del texto,
+# caracteres que forman la fecha y su formato. Lo que sigue a la fecha (una
+# hora) se ignora. La migración 8e3f0b6c2a17 aplica las mismas reglas en SQL
+FORMATOS_FECHA = (
+    (re.compile(r"\d{8}$"), 8, "%Y%m%d"),
+    (re.compile(r"\d{2}/\d{2}/\d{4}"), 10, "%d/%m/%Y"),
+    (re.compile(r"\d{4}-\d{2}-\d{2}"), 10, "%Y-%m-%d"),
+)
+
+# Columnas que no provienen del SIS
+CAMPOS_LOCALES = frozenset({"id", "CreatedAt", "ContentHash", "VerifiedAt"})
+
+# Largo máximo de las descripciones que se guardan en los catálogos
+LARGO_DESCRIPCION = CatalogoBase.model_fields["descripcion"].metadata[0].max_length
+
+
+def parsear_fecha(valor: Any) -> date | None:  # noqa: ANN401
+    """Convierte una fecha del SIS a ``date``; devuelve None si no es válida."""
+    if valor is None or isinstance(valor, date):
+        return valor
+    texto = str(valor).strip()
+    if not texto:
+        return None
+    for patron, largo, formato in FORMATOS_FECHA:
+        if not patron.match(texto):
+            continue
+        try:
+            return datetime.strptime(texto[:largo], formato).date()  # noqa: DTZ007
+        except ValueError:
+            logger.warning("Fecha del SIS inexistente: %s", texto)
+            return None
+    logger.warning("Fecha del SIS con formato desconocido: %s", texto)
+    return None
+
+
+def descripciones_sis(datos: dict[str, Any]) -> dict[str, str | None]:
+    """Descripciones de la respuesta del SIS que van a los catálogos."""
+    descripciones: dict[str, str | None] = {}
+    for campo in DIMENSIONES:
+        valor = datos.get(campo)
+        texto = None if valor is None else str(valor).strip() or None
+        descripciones[campo] = texto[:LARGO_DESCRIPCION] if texto else None
+    return descripciones
+
+
+class AfiliadoBase(SQLModel):
+    """Campos del afiliado que se guardan en la tabla ``afiliado``."""
 
     id: int | None = Field(default=None, primary_key=True)
-    IdError: str | None = None
-    Resultado: str | None = None
+    IdError: str | None = Field(default=None, max_length=10)
+    Resultado: str | None = Field(default=None, max_length=255)
+    TipoDocumento: str | None = Field(default=None, max_length=5)
+    NroDocumento: str | None = Field(default=None, index=True, max_length=20)
+    ApePaterno: str | None = Field(default=None, max_length=100)
+    ApeMaterno: str | None = Field(default=None, max_length=100)
+    Nombres: str | None = Field(default=None, max_length=100)
+    FecAfiliacion: date | None = None
+    EESS: str | None = Field(default=None, max_length=20)
+    EESSUbigeo: str | None = Field(default=None, max_length=10)
+    Regimen: str | None = Field(default=None, max_length=10)
+    TipoSeguro: str | None = Field(default=None, max_length=10)
+    Contrato: str | None = Field(default=None, max_length=50)
+    FecCaducidad: date | None = Field(default=None, index=True)
+    Estado: str | None = Field(default=None, max_length=20)
+    Tabla: str | None = Field(default=None, max_length=10)
+    IdNumReg: str | None = Field(default=None, max_length=20)
+    Genero: str | None = Field(default=None, max_length=5)
+    FecNacimiento: date | None = None
+    IdUbigeo: str | None = Field(default=None, max_length=10)
+    Disa: str | None = Field(default=None, max_length=10)
+    TipoFormato: str | None = Field(default=None, max_length=10)
+    NroContrato: str | None = Field(default=None, max_length=20)
+    Correlativo: str | None = Field(default=None, max_length=20)
+    IdPlan: str | None = Field(default=None, max_length=10)
+    IdGrupoPoblacional: str | None = Field(default=None, max_length=10)
+    MsgConfidencial: str | None = Field(default=None, max_length=500)
+    CreatedAt: datetime = Field(default_factory=datetime.now)
+    ContentHash: str | None = Field(default=None, max_length=64)
+    VerifiedAt: datetime | None = None
+
+
+class Afiliado(AfiliadoBase, table=True):
+    """Modelo de afiliado.
+
+    Las descripciones de establecimiento, ubigeo y tipo de seguro no se
+    repiten en cada fila: se guardan una vez en los catálogos
+    (``app/models/catalogo.py``) y se agregan al responder con
+    ``AfiliadoPublico``.
+    """
+
+    @classmethod
+    def desde_sis(cls, datos: dict[str, Any]) -> Self:
+        """Construye el afiliado a partir de la respuesta SOAP.
+
+        Los modelos ``table=True`` no validan en el constructor, así que aquí
+        se parsean las fechas, se limpian los textos y se recortan al largo
+        de la columna para no fallar recién al insertar.
+        """
+        columnas = cls.__table__.columns  # type: ignore
+        valores: dict[str, Any] = {}
+        for nombre, valor in datos.items():
+            if nombre not in columnas or nombre in CAMPOS_LOCALES:
+                continue
+            tipo = columnas[nombre].type
+            if isinstance(tipo, Date):
+                valores[nombre] = parsear_fecha(valor)
+            elif isinstance(tipo, AutoString):
+                texto = None if valor is None else str(valor).strip() or None
+                if texto and tipo.length and len(texto) > tipo.length:
+                    logger.warning("Valor del SIS recortado en %s", nombre)
+                    texto = texto[: tipo.length]
+                valores[nombre] = texto
+            else:
+                valores[nombre] = valor
+        afiliado = cls(**valores)
+        afiliado.ContentHash = afiliado.calcular_hash(descripciones_sis(datos))
+        return afiliado
+
+    def datos_sis(self) -> dict[str, Any]:
+        """Campos provenientes del SIS, sin metadatos locales."""
+        return self.model_dump(exclude=CAMPOS_LOCALES)
+
+    def calcular_hash(self, descripciones: dict[str, str | None]) -> str:
+        """Hash del contenido normalizado para detectar cambios sin comparar campos.
+
+        Incluye las descripciones del SIS, de modo que el hash es el mismo que
+        cuando se guardaban en la fila y un cambio de descripción también se
+        detecta.
+        """
+        contenido = json.dumps(
+            {**self.datos_sis(), **descripciones},
+            sort_keys=True,
+            default=str,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(contenido.encode()).hexdigest()
+
+
+class AfiliadoPublico(AfiliadoBase):
+    """Afiliado con las descripciones de los catálogos, tal como se responde."""
+
+    DescEESS: str | None = None
+    DescEESSUbigeo: str | None = None
+    DescTipoSeguro: str | None = None
+
+    @classmethod
+    def desde(
+        cls, afiliado: Afiliado, descripciones: dict[str, str | None]
+    ) -> "AfiliadoPublico":
+        """Combina la fila del afiliado con sus descripciones."""
+        return cls.model_construct(**afiliado.model_dump(), **descripciones)
+
+    @classmethod
+    def desde_sis(cls, datos: dict[str, Any]) -> "AfiliadoPublico":
+        """Construye el afiliado completo a partir de la respuesta SOAP."""
+        return cls.desde(Afiliado.desde_sis(datos), descripciones_sis(datos))
+
+    def registro(self) -> Afiliado:
+        """Fila de la tabla ``afiliado``, sin las descripciones.
+
+        Como en ``Afiliado.desde_sis``, solo quedan marcados como asignados los
+        campos del SIS y el hash, así el *upsert* no pisa los metadatos locales.
+        """
+        afiliado = Afiliado(
+            **self.model_dump(exclude=CAMPOS_LOCALES | set(DIMENSIONES))
+        )
+        afiliado.ContentHash = self.ContentHash
+        return afiliado
+
+    def descripciones(self) -> dict[str, str | None]:
+        """Descripciones del SIS por campo."""
+        return {campo: getattr(self, campo) for campo in DIMENSIONES}
+
+
+# Nombre completo en una sola expresión (inmutable, para poder indexarla): la
+# búsqueda por nombre la usa tal cual para que PostgreSQL elija los índices
+NOMBRE_COMPLETO = (
+    func.coalesce(Afiliado.ApePaterno, "")
+    + " "
+    + func.coalesce(Afiliado.ApeMaterno, "")
+    + " "
+    + func.coalesce(Afiliado.Nombres, "")
+)
+
+# Trigramas para filtrar por fragmentos del nombre (ILIKE '%...%') y B-tree
+# para recorrer en orden (paginación por clave) cuando el filtro es poco
+# selectivo
+Index(
+    "ix_afiliado_nombre_completo_trgm",
+    NOMBRE_COMPLETO.label("nombre_completo"),
+    postgresql_using="gin",
+    postgresql_ops={"nombre_completo": "gin_trgm_ops"},
+)
+Index("ix_afiliado_nombre_completo_id", NOMBRE_COMPLETO, Afiliado.id)
+
+
+class AfiliadoResumen(SQLModel):
+    """Datos de un afiliado en los resultados de la búsqueda por nombre."""
+
     TipoDocumento: str | None = None
-    NroDocumento: str | None = Field(default=None, index=True)
+    NroDocumento: str | None = None
     ApePaterno: str | None = None
     ApeMaterno: str | None = None
     Nombres: str | None = None
-    FecAfiliacion: str | None = None
-    EESS: str | None = None
-    DescEESS: str | None = None
-    EESSUbigeo: str | None = None
-    DescEESSUbigeo: str | None = None
-    Regimen: str | None = None
-    TipoSeguro: str | None = None
-    DescTipoSeguro: str | None = None
-    Contrato: str | None = None
-    FecCaducidad: str | None = None
-    Estado: str | None = None
-    Tabla: str | None = None
-    IdNumReg: str | None = None
+    FecNacimiento: date | None = None
     Genero: str | None = None
-    FecNacimiento: str | None = None
-    IdUbigeo: str | None = None
-    Disa: str | None = None
-    TipoFormato: str | None = None
-    NroContrato: str | None = None
-    Correlativo: str | None = None
-    IdPlan: str | None = None
-    IdGrupoPoblacional: str | None = None
-    MsgConfidencial: str | None = None
-    CreatedAt: datetime = Field(default_factory=datetime.now)
+    Estado: str | None = None
+    VerifiedAt: datetime | None = None
+
+
+class BusquedaAfiliados(SQLModel):
+    """Página de resultados de la búsqueda por nombre."""
+
+    resultados: list[AfiliadoResumen]
+    # Cursor para pedir la página siguiente; None si no hay más resultados
+    siguiente: str | None = None
@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import JSON, Column, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Field, SQLModel
+
+
+class AfiliadoHistorial(SQLModel, table=True):
+    """Historial de cambios de un afiliado.
+
+    Solo se agrega una fila cuando cambia el contenido devuelto por el SIS.
+    ``cambios`` guarda los campos que cambiaron respecto de la versión
+    anterior; la primera fila de cada documento guarda la versión completa.
+    """
+
+    __tablename__ = "afiliado_historial"  # type: ignore
+    __table_args__ = (
+        Index(
+            "ix_afiliado_historial_numero_documento_valid_from",
+            "numero_documento",
+            "valid_from",
+        ),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    numero_documento: str = Field(max_length=20)
+    valid_from: datetime = Field(default_factory=datetime.now)
+    content_hash: str = Field(max_length=64)
+    completo: bool = False
+    cambios: dict[str, Any] = Field(
+        sa_column=Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+    )
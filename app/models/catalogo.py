@@ -0,0 +1,42 @@
+from datetime import UTC, datetime
+from functools import partial
+
+from sqlalchemy import DateTime
+from sqlmodel import Field, SQLModel
+
+
+class CatalogoBase(SQLModel):
+    """Descripción del SIS asociada a un código."""
+
+    codigo: str = Field(primary_key=True, max_length=20)
+    descripcion: str = Field(max_length=200)
+    updated_at: datetime = Field(
+        default_factory=partial(datetime.now, UTC),
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
+
+
+class Eess(CatalogoBase, table=True):
+    """Establecimiento de salud (``EESS`` / ``DescEESS``)."""
+
+    __tablename__ = "eess"  # type: ignore
+
+
+class Ubigeo(CatalogoBase, table=True):
+    """Ubigeo del establecimiento (``EESSUbigeo`` / ``DescEESSUbigeo``)."""
+
+    __tablename__ = "ubigeo"  # type: ignore
+
+
+class TipoSeguro(CatalogoBase, table=True):
+    """Tipo de seguro (``TipoSeguro`` / ``DescTipoSeguro``)."""
+
+    __tablename__ = "tipo_seguro"  # type: ignore
+
+
+# Campo de descripción del SIS -> (catálogo, campo del afiliado con el código)
+DIMENSIONES: dict[str, tuple[type[CatalogoBase], str]] = {
+    "DescEESS": (Eess, "EESS"),
+    "DescEESSUbigeo": (Ubigeo, "EESSUbigeo"),
+    "DescTipoSeguro": (TipoSeguro, "TipoSeguro"),
+}
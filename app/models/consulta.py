@@ -7,7 +7,7 @@ class Consulta(SQLModel, table=True):
     """Modelo de consulta."""
 
     id: int | None = Field(default=None, primary_key=True)
-    numero_documento: str = Field(index=True, max_length=8)
+    numero_documento: str = Field(index=True, max_length=20)
     usuario: str
     es_local: bool = False
     error_code: str | None = None
@@ -0,0 +1,151 @@
+import uuid
+from collections import Counter
+from datetime import UTC, datetime
+from enum import StrEnum
+from functools import partial
+from typing import Any
+
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Field, SQLModel
+
+
+class EstadoItem(StrEnum):
+    """Estado de una consulta dentro de un job."""
+
+    PENDIENTE = "pendiente"
+    EN_PROCESO = "en_proceso"
+    OK = "ok"
+    ERROR = "error"
+
+
+class ConsultaJob(SQLModel, table=True):
+    """Job de consultas asíncronas: agrupa las consultas enviadas juntas."""
+
+    __tablename__ = "consulta_job"  # type: ignore
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    total: int
+    created_at: datetime = Field(
+        default_factory=partial(datetime.now, UTC),
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
+
+
+class ConsultaJobItem(SQLModel, table=True):
+    """Consulta encolada; los workers la reclaman con ``FOR UPDATE SKIP LOCKED``.
+
+    ``disponible_desde`` es el instante a partir del cual un worker puede
+    tomarla: para las pendientes permite esperar antes de un reintento y para
+    las que están en proceso vence el *lease* de un worker que se cayó.
+    """
+
+    __tablename__ = "consulta_job_item"  # type: ignore
+    __table_args__ = (
+        Index("ix_consulta_job_item_job_id_posicion", "job_id", "posicion"),
+        Index(
+            "ix_consulta_job_item_cola",
+            "disponible_desde",
+            postgresql_where=text("estado IN ('pendiente', 'en_proceso')"),
+        ),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    job_id: uuid.UUID = Field(
+        sa_column=Column(
+            ForeignKey("consulta_job.id", ondelete="CASCADE"), nullable=False
+        )
+    )
+    posicion: int
+    consulta: dict[str, Any] = Field(
+        sa_column=Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+    )
+    estado: str = Field(default=EstadoItem.PENDIENTE, max_length=20)
+    intentos: int = 0
+    disponible_desde: datetime = Field(
+        default_factory=partial(datetime.now, UTC),
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
+    resultado: dict[str, Any] | None = Field(
+        default=None,
+        sa_column=Column(
+            JSON(none_as_null=True).with_variant(
+                JSONB(none_as_null=True), "postgresql"
+            ),
+            nullable=True,
+        ),
+    )
+    status_code: int | None = None
+    error_code: str | None = Field(default=None, max_length=20)
+    error_description: str | None = None
+    updated_at: datetime | None = Field(
+        default=None,
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
+
+
+class ConsultaJobResultado(SQLModel):
+    """Resultado de una consulta dentro de un job."""
+
+    posicion: int
+    nro_documento: str
+    estado: EstadoItem
+    intentos: int
+    afiliado: dict[str, Any] | None = None
+    error_code: str | None = None
+    error_description: str | None = None
+
+
+class ConsultaJobEstado(SQLModel):
+    """Avance y resultados de un job de consultas."""
+
+    id: uuid.UUID
+    estado: EstadoItem
+    total: int
+    pendientes: int
+    en_proceso: int
+    completadas: int
+    con_error: int
+    created_at: datetime
+    resultados: list[ConsultaJobResultado]
+
+    @classmethod
+    def desde_items(
+        cls, job: ConsultaJob, items: list[ConsultaJobItem]
+    ) -> "ConsultaJobEstado":
+        """Resume el avance del job a partir del estado de sus consultas.
+
+        El job queda ``en_proceso`` mientras alguna consulta no terminó y
+        ``error`` si al menos una terminó con error.
+        """
+        conteo = Counter(item.estado for item in items)
+        if conteo[EstadoItem.PENDIENTE] == len(items):
+            estado = EstadoItem.PENDIENTE
+        elif conteo[EstadoItem.PENDIENTE] or conteo[EstadoItem.EN_PROCESO]:
+            estado = EstadoItem.EN_PROCESO
+        elif conteo[EstadoItem.ERROR]:
+            estado = EstadoItem.ERROR
+        else:
+            estado = EstadoItem.OK
+        return cls(
+            id=job.id,
+            estado=estado,
+            total=job.total,
+            pendientes=conteo[EstadoItem.PENDIENTE],
+            en_proceso=conteo[EstadoItem.EN_PROCESO],
+            completadas=conteo[EstadoItem.OK],
+            con_error=conteo[EstadoItem.ERROR],
+            created_at=job.created_at,
+            resultados=[
+                ConsultaJobResultado(
+                    posicion=item.posicion,
+                    nro_documento=item.consulta["nro_documento"],
+                    estado=EstadoItem(item.estado),
+                    intentos=item.intentos,
+                    afiliado=item.resultado,
+                    error_code=item.error_code,
+                    error_description=item.error_description,
+                )
+                for item in items
+            ],
+        )
@@ -0,0 +1,14 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime
+from sqlmodel import Field, SQLModel
+
+
+class SISRateLimit(SQLModel, table=True):
+    """Estado compartido del token bucket para el tráfico saliente al SIS."""
+
+    __tablename__ = "sis_rate_limit"  # type: ignore
+
+    nombre: str = Field(primary_key=True, max_length=100)
+    tokens: float
+    actualizado: datetime = Field(sa_type=DateTime(timezone=True))  # type: ignore
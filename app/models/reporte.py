@@ -0,0 +1,88 @@
+from datetime import UTC, date, datetime
+from functools import partial
+
+from sqlalchemy import DateTime
+from sqlmodel import Field, SQLModel
+
+
+class ConsultaUsoDiario(SQLModel, table=True):
+    """Consultas de un usuario en un día, acumuladas desde ``consulta``."""
+
+    __tablename__ = "consulta_uso_diario"  # type: ignore
+
+    dia: date = Field(primary_key=True)
+    usuario: str = Field(primary_key=True)
+    total: int = 0
+    # Respondidas desde la caché local (``es_local``)
+    locales: int = 0
+    # Terminadas con ``error_code``
+    errores: int = 0
+
+
+class ConsultaErrorDiario(SQLModel, table=True):
+    """Consultas con error de un usuario en un día, por código de error."""
+
+    __tablename__ = "consulta_error_diario"  # type: ignore
+
+    dia: date = Field(primary_key=True)
+    usuario: str = Field(primary_key=True)
+    error_code: str = Field(primary_key=True)
+    total: int = 0
+
+
+class ReporteAvance(SQLModel, table=True):
+    """Última fila de ``consulta`` incorporada a los resúmenes (*watermark*)."""
+
+    __tablename__ = "reporte_avance"  # type: ignore
+
+    nombre: str = Field(primary_key=True, max_length=50)
+    ultimo_id: int = 0
+    updated_at: datetime = Field(
+        default_factory=partial(datetime.now, UTC),
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
+
+
+class UsoDiario(SQLModel):
+    """Uso de un día en el reporte."""
+
+    dia: date
+    total: int
+    locales: int
+    errores: int
+    # Proporción respondida desde la caché local y proporción con error
+    tasa_cache: float
+    tasa_error: float
+
+
+class UsoUsuario(SQLModel):
+    """Uso de un usuario en el periodo del reporte."""
+
+    usuario: str
+    total: int
+    locales: int
+    errores: int
+    tasa_cache: float
+    tasa_error: float
+
+
+class ErrorFrecuente(SQLModel):
+    """Consultas con un código de error en el periodo del reporte."""
+
+    error_code: str
+    total: int
+    # Proporción sobre el total de consultas del periodo
+    tasa: float
+
+
+class ReporteUso(SQLModel):
+    """Reporte de uso armado solo con los resúmenes diarios."""
+
+    desde: date
+    hasta: date
+    # Última actualización de los resúmenes; las consultas posteriores se
+    # incorporan en la siguiente
+    actualizado_at: datetime | None
+    dias: list[UsoDiario]
+    usuarios: list[UsoUsuario]
+    errores: list[ErrorFrecuente]
@@ -0,0 +1,110 @@
+import uuid
+from datetime import UTC, datetime
+from enum import StrEnum
+from functools import partial
+from typing import Any
+
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Field, SQLModel
+
+
+class CanalSuscripcion(StrEnum):
+    """Medio por el que se entregan los eventos de una suscripción."""
+
+    WEBHOOK = "webhook"
+    SSE = "sse"
+
+
+class EstadoNotificacion(StrEnum):
+    """Estado de entrega de una notificación."""
+
+    PENDIENTE = "pendiente"
+    ENVIADA = "enviada"
+    ERROR = "error"
+
+
+class Suscripcion(SQLModel, table=True):
+    """Interés de un cliente en los cambios de un documento."""
+
+    __tablename__ = "suscripcion"  # type: ignore
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    numero_documento: str = Field(max_length=20, index=True)
+    canal: str = Field(default=CanalSuscripcion.WEBHOOK, max_length=10)
+    webhook_url: str | None = Field(default=None, max_length=500)
+    # Clave para firmar los webhooks (HMAC-SHA256); nunca se devuelve
+    secreto: str | None = Field(default=None, max_length=200)
+    created_at: datetime = Field(
+        default_factory=partial(datetime.now, UTC),
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
+
+
+class Notificacion(SQLModel, table=True):
+    """Evento pendiente de entrega a una suscripción (*outbox*).
+
+    Se inserta en la misma transacción que el cambio del afiliado, así que
+    no se pierden eventos si el proceso se cae antes de entregarlos. Las de
+    canal ``webhook`` las envía el despachador; las de ``sse`` las lee el
+    *stream* de la suscripción.
+    """
+
+    __tablename__ = "notificacion"  # type: ignore
+    __table_args__ = (
+        Index("ix_notificacion_suscripcion_id_id", "suscripcion_id", "id"),
+        Index(
+            "ix_notificacion_cola",
+            "disponible_desde",
+            postgresql_where=text("estado = 'pendiente' AND canal = 'webhook'"),
+        ),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    suscripcion_id: uuid.UUID = Field(
+        sa_column=Column(
+            ForeignKey("suscripcion.id", ondelete="CASCADE"), nullable=False
+        )
+    )
+    canal: str = Field(max_length=10)
+    evento: dict[str, Any] = Field(
+        sa_column=Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+    )
+    estado: str = Field(default=EstadoNotificacion.PENDIENTE, max_length=20)
+    intentos: int = 0
+    disponible_desde: datetime = Field(
+        default_factory=partial(datetime.now, UTC),
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
+    error: str | None = None
+    created_at: datetime = Field(
+        default_factory=partial(datetime.now, UTC),
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
+    enviada_at: datetime | None = Field(
+        default=None,
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
+
+
+class SuscripcionPublica(SQLModel):
+    """Suscripción tal como se devuelve al cliente (sin el secreto)."""
+
+    id: uuid.UUID
+    numero_documento: str
+    canal: CanalSuscripcion
+    webhook_url: str | None
+    firmada: bool
+    created_at: datetime
+
+    @classmethod
+    def desde(cls, suscripcion: Suscripcion) -> "SuscripcionPublica":
+        """Construye la vista pública de una suscripción."""
+        return cls(
+            id=suscripcion.id,
+            numero_documento=suscripcion.numero_documento,
+            canal=CanalSuscripcion(suscripcion.canal),
+            webhook_url=suscripcion.webhook_url,
+            firmada=suscripcion.secreto is not None,
+            created_at=suscripcion.created_at,
+        )
@@ -0,0 +1,65 @@
+from typing import Any
+
+from sqlmodel import Session, col, select
+
+from app.models.afiliado import CAMPOS_LOCALES, Afiliado
+from app.models.afiliado_historial import AfiliadoHistorial
+
+
+class AfiliadoHistorialRepository:
+    """Repositorio del historial de cambios de afiliados."""
+
+    def __init__(self, db_session: Session) -> None:
+        """Inicializa el repositorio."""
+        self.db_session = db_session
+
+    def registrar(
+        self, nuevo: Afiliado, anterior: dict[str, Any] | None = None
+    ) -> AfiliadoHistorial | None:
+        """Agrega una versión al historial.
+
+        El hash de contenido incluye las descripciones de los catálogos, que
+        no están en la fila: si solo cambió una descripción, los campos del
+        afiliado son los mismos y no se agrega ninguna versión.
+
+        Args:
+            nuevo: Afiliado con el contenido recién recibido del SIS
+            anterior: Contenido de la versión previa ya registrada en el
+                historial; si es None se guarda la versión completa
+
+        Returns:
+            La versión agregada, o None si no cambió ningún campo
+
+        """
+        actual = nuevo.model_dump(mode="json", exclude=CAMPOS_LOCALES)
+        if anterior is None:
+            cambios = {campo: valor for campo, valor in actual.items() if valor}
+        else:
+            cambios = {
+                campo: valor
+                for campo, valor in actual.items()
+                if anterior.get(campo) != valor
+            }
+            if not cambios:
+                return None
+
+        historial = AfiliadoHistorial(
+            numero_documento=nuevo.NroDocumento or "",
+            content_hash=nuevo.ContentHash or "",
+            completo=anterior is None,
+            cambios=cambios,
+        )
+        self.db_session.add(historial)
+        return historial
+
+    def listar(
+        self, numero_documento: str, limite: int = 50
+    ) -> list[AfiliadoHistorial]:
+        """Lista las versiones de un documento, de la más reciente a la más antigua."""
+        statement = (
+            select(AfiliadoHistorial)
+            .where(AfiliadoHistorial.numero_documento == numero_documento)
+            .order_by(col(AfiliadoHistorial.valid_from).desc())
+            .limit(limite)
+        )
+        return list(self.db_session.exec(statement).all())
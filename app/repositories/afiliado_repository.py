@@ -1,11 +1,33 @@
+from datetime import datetime
+
+from sqlalchemy import tuple_
 from sqlmodel import Session, select
 
-from app.models.afiliado import Afiliado
+from app.database import marcar_escritura
+from app.models.afiliado import (
+    CAMPOS_LOCALES,
+    NOMBRE_COMPLETO,
+    Afiliado,
+    AfiliadoResumen,
+)
+from app.repositories.afiliado_historial_repository import (
+    AfiliadoHistorialRepository,
+)
+from app.repositories.suscripcion_repository import SuscripcionRepository
 from tools.logger import Logger
 
 # Configurar logging
 logger = Logger(__name__)
 
+# Clave de réplica de la búsqueda por nombre: nunca se marca como escrita, así
+# que la búsqueda va a la réplica (si hay) y tolera su retraso
+BUSQUEDA = "busqueda"
+
+
+def _escapar_like(texto: str) -> str:
+    """Escapa los comodines de LIKE para buscar el texto literal."""
+    return texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
 
 class AfiliadoRepository:
     """Repositorio para operaciones CRUD de afiliados."""
@@ -13,25 +35,124 @@ class AfiliadoRepository:
     def __init__(self, db_session: Session) -> None:
         """Inicializa el repositorio."""
         self.db_session = db_session
+        self.historial = AfiliadoHistorialRepository(db_session)
+        self.suscripciones = SuscripcionRepository(db_session)
 
-    def buscar_por_documento(self, numero_documento: str | None) -> Afiliado | None:
-        """Busca un afiliado por número y tipo de documento."""
+    def buscar_por_documento(
+        self, numero_documento: str | None, *, replica: bool = False
+    ) -> Afiliado | None:
+        """Busca un afiliado por número y tipo de documento.
+
+        Con ``replica=True`` la lectura puede atenderla la réplica; el *upsert*
+        lee siempre del primario.
+        """
         statement = select(Afiliado).where(Afiliado.NroDocumento == numero_documento)
-        return self.db_session.exec(statement).first()
+        bind_arguments = {"replica": numero_documento} if replica else None
+        return self.db_session.exec(statement, bind_arguments=bind_arguments).first()
+
+    def obtener_validadores(
+        self, numero_documento: str
+    ) -> tuple[str | None, datetime | None] | None:
+        """Obtiene solo el hash de contenido y la fecha de verificación."""
+        statement = select(Afiliado.ContentHash, Afiliado.VerifiedAt).where(
+            Afiliado.NroDocumento == numero_documento
+        )
+        fila = self.db_session.exec(
+            statement, bind_arguments={"replica": numero_documento}
+        ).first()
+        return None if fila is None else (fila[0], fila[1])
+
+    def buscar_por_nombre(
+        self,
+        terminos: list[str],
+        limite: int,
+        despues: tuple[str, int] | None = None,
+    ) -> list[tuple[str, int, AfiliadoResumen]]:
+        """Busca afiliados cuyo nombre completo contiene todos los términos.
+
+        Ordena por nombre completo e ``id`` y continúa después de ``despues``
+        (paginación por clave). Cada término se filtra con ``ILIKE``, que usa
+        el índice de trigramas; el orden lo resuelve el índice B-tree.
+
+        Returns:
+            Filas como ``(nombre_completo, id, resumen)``
+
+        """
+        nombre = NOMBRE_COMPLETO.label("nombre_completo")
+        columnas = [getattr(Afiliado, campo) for campo in AfiliadoResumen.model_fields]
+        statement = select(nombre, Afiliado.id, *columnas)
+        for termino in terminos:
+            statement = statement.where(
+                NOMBRE_COMPLETO.ilike(f"%{_escapar_like(termino)}%", escape="\\")
+            )
+        if despues is not None:
+            statement = statement.where(
+                tuple_(NOMBRE_COMPLETO, Afiliado.id) > tuple_(*despues)
+            )
+        statement = statement.order_by(NOMBRE_COMPLETO, Afiliado.id).limit(limite)
+        filas = self.db_session.exec(
+            statement,  # type: ignore
+            bind_arguments={"replica": BUSQUEDA},
+        ).all()
+        return [
+            (
+                fila[0],
+                fila[1],
+                AfiliadoResumen.model_construct(
+                    **dict(zip(AfiliadoResumen.model_fields, fila[2:], strict=True))
+                ),
+            )
+            for fila in filas
+        ]
 
     def guardar_o_actualizar(self, afiliado_data: Afiliado) -> Afiliado:
-        """Guarda un nuevo afiliado o actualiza uno existente (upsert)."""
+        """Guarda un nuevo afiliado o actualiza uno existente (upsert).
+
+        Si el hash de contenido coincide con el almacenado solo se actualiza
+        ``VerifiedAt``, evitando reescribir la fila completa. Cuando cambia,
+        se agrega una versión al historial y se avisa a los suscriptores del
+        documento en la misma transacción; si solo cambiaron descripciones
+        de los catálogos, solo se guarda el nuevo hash.
+        """
         afiliado_existente = self.buscar_por_documento(afiliado_data.NroDocumento)
+        ahora = datetime.now()  # noqa: DTZ005
+        marcar_escritura(self.db_session, afiliado_data.NroDocumento)
 
         if afiliado_existente:
+            if (
+                afiliado_existente.ContentHash is not None
+                and afiliado_existente.ContentHash == afiliado_data.ContentHash
+            ):
+                afiliado_existente.VerifiedAt = ahora
+                self.db_session.add(afiliado_existente)
+                logger.info("Afiliado sin cambios, solo se marca la verificación")
+                return afiliado_existente
+
+            # Registrar la nueva versión en el historial antes de sobrescribir;
+            # sin hash previo no hay versión base y se guarda la ficha completa
+            anterior = (
+                afiliado_existente.model_dump(mode="json", exclude=CAMPOS_LOCALES)
+                if afiliado_existente.ContentHash is not None
+                else None
+            )
+            historial = self.historial.registrar(afiliado_data, anterior)
+
             # Actualizar registro existente
             for key, value in afiliado_data.model_dump(exclude_unset=True).items():
                 setattr(afiliado_existente, key, value)
+            afiliado_existente.ContentHash = afiliado_data.ContentHash
+            afiliado_existente.VerifiedAt = ahora
 
             self.db_session.add(afiliado_existente)
+            if historial is not None:
+                self.suscripciones.notificar_cambio(historial)
             logger.info("Afiliado en sesion para actualizar en la base de datos")
             return afiliado_existente
         # Crear nuevo registro
+        afiliado_data.VerifiedAt = ahora
+        historial = self.historial.registrar(afiliado_data)
         self.db_session.add(afiliado_data)
+        if historial is not None:
+            self.suscripciones.notificar_cambio(historial)
         logger.info("Nuevo afiliado en sesion para guardar en la base de datos")
         return afiliado_data
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+
+from app.models.catalogo import DIMENSIONES, CatalogoBase
+
+
+class CatalogoRepository:
+    """Repositorio de los catálogos de descripciones del SIS."""
+
+    def __init__(self, db_session: Session) -> None:
+        """Inicializa el repositorio."""
+        self.db_session = db_session
+
+    def version(self) -> tuple[datetime | None, ...]:
+        """Última modificación de cada catálogo, en una sola consulta."""
+        statement = select(
+            *(
+                select(func.max(modelo.updated_at)).scalar_subquery()
+                for modelo, _ in DIMENSIONES.values()
+            )
+        )
+        return tuple(self.db_session.exec(statement).one())  # type: ignore
+
+    def listar(self, modelo: type[CatalogoBase]) -> dict[str, str]:
+        """Descripciones de un catálogo por código."""
+        statement = select(modelo.codigo, modelo.descripcion)  # type: ignore
+        return dict(self.db_session.exec(statement).all())  # type: ignore
+
+    def guardar(
+        self, modelo: type[CatalogoBase], codigo: str, descripcion: str
+    ) -> None:
+        """Inserta o actualiza una descripción.
+
+        ``ON CONFLICT`` evita que dos procesos que ven el mismo código nuevo a
+        la vez fallen con una clave duplicada.
+        """
+        dialecto = self.db_session.get_bind().dialect.name
+        insertar = postgresql.insert if dialecto == "postgresql" else sqlite.insert
+        statement = insertar(modelo).values(
+            codigo=codigo, descripcion=descripcion, updated_at=func.now()
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=["codigo"],
+            set_={"descripcion": descripcion, "updated_at": func.now()},
+        )
+        self.db_session.exec(statement)  # type: ignore
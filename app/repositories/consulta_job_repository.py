@@ -0,0 +1,179 @@
+import uuid
+from datetime import timedelta
+
+from sqlalchemy import func, update
+from sqlmodel import Session, col, select
+
+from app.api.requests import ConsultaAfiliadoRequest
+from app.models.consulta_job import ConsultaJob, ConsultaJobItem, EstadoItem
+
+
+class ConsultaJobRepository:
+    """Cola de consultas asíncronas persistida en PostgreSQL."""
+
+    def __init__(self, db_session: Session) -> None:
+        """Inicializa el repositorio."""
+        self.db_session = db_session
+
+    def encolar(self, consultas: list[ConsultaAfiliadoRequest]) -> ConsultaJob:
+        """Crea un job con una fila pendiente por consulta."""
+        job = ConsultaJob(total=len(consultas))
+        self.db_session.add(job)
+        self.db_session.add_all(
+            ConsultaJobItem(job_id=job.id, posicion=posicion, consulta=c.model_dump())
+            for posicion, c in enumerate(consultas)
+        )
+        return job
+
+    def obtener(self, job_id: uuid.UUID) -> ConsultaJob | None:
+        """Obtiene un job por su identificador."""
+        return self.db_session.get(ConsultaJob, job_id)
+
+    def listar_items(self, job_id: uuid.UUID) -> list[ConsultaJobItem]:
+        """Consultas de un job en el orden en que se enviaron."""
+        statement = (
+            select(ConsultaJobItem)
+            .where(ConsultaJobItem.job_id == job_id)
+            .order_by(col(ConsultaJobItem.posicion))
+        )
+        return list(self.db_session.exec(statement).all())
+
+    def reclamar(
+        self, limite: int, lease: float, max_intentos: int
+    ) -> list[ConsultaJobItem]:
+        """Toma hasta ``limite`` consultas disponibles para este worker.
+
+        ``FOR UPDATE SKIP LOCKED`` hace que workers concurrentes tomen filas
+        distintas sin esperarse. Las filas quedan ``en_proceso`` durante
+        ``lease`` segundos; si el worker se cae antes de terminar, vuelven a
+        estar disponibles al vencer ese plazo, salvo que ya hayan agotado los
+        ``max_intentos`` (ver ``descartar_agotadas``).
+        """
+        disponibles = (
+            select(ConsultaJobItem.id)
+            .where(
+                col(ConsultaJobItem.estado).in_(
+                    [EstadoItem.PENDIENTE, EstadoItem.EN_PROCESO]
+                ),
+                col(ConsultaJobItem.disponible_desde) <= func.now(),
+                col(ConsultaJobItem.intentos) < max_intentos,
+            )
+            .order_by(col(ConsultaJobItem.disponible_desde), col(ConsultaJobItem.id))
+            .limit(limite)
+            .with_for_update(skip_locked=True)
+        )
+        statement = (
+            update(ConsultaJobItem)
+            .where(col(ConsultaJobItem.id).in_(disponibles.scalar_subquery()))
+            .values(
+                estado=EstadoItem.EN_PROCESO,
+                intentos=ConsultaJobItem.intentos + 1,
+                disponible_desde=func.now() + timedelta(seconds=lease),
+                updated_at=func.now(),
+            )
+            .returning(ConsultaJobItem)
+        )
+        return list(self.db_session.scalars(statement).all())
+
+    def descartar_agotadas(self, max_intentos: int) -> int:
+        """Termina con error las consultas sin intentos restantes.
+
+        Son las de un worker que se detuvo durante el último intento: al
+        vencer su lease ya no se reclaman y quedarían ``en_proceso`` para
+        siempre.
+
+        Returns:
+            Cantidad de consultas descartadas
+
+        """
+        statement = (
+            update(ConsultaJobItem)
+            .where(
+                col(ConsultaJobItem.estado).in_(
+                    [EstadoItem.PENDIENTE, EstadoItem.EN_PROCESO]
+                ),
+                col(ConsultaJobItem.disponible_desde) <= func.now(),
+                col(ConsultaJobItem.intentos) >= max_intentos,
+            )
+            .values(
+                estado=EstadoItem.ERROR,
+                error_description=f"Se agotaron los {max_intentos} intentos",
+                updated_at=func.now(),
+            )
+        )
+        return self.db_session.execute(statement).rowcount  # type: ignore
+
+    def renovar(self, item: ConsultaJobItem, lease: float) -> bool:
+        """Extiende el lease de una consulta reclamada antes de procesarla.
+
+        Returns:
+            False si la consulta ya no es de este worker: su lease venció
+            mientras esperaba en el lote y otro worker la reclamó
+
+        """
+        return self._actualizar_propia(
+            item,
+            disponible_desde=func.now() + timedelta(seconds=lease),
+            updated_at=func.now(),
+        )
+
+    def finalizar(  # noqa: PLR0913
+        self,
+        item: ConsultaJobItem,
+        estado: EstadoItem,
+        *,
+        resultado: dict | None = None,
+        status_code: int | None = None,
+        error_code: str | None = None,
+        error_description: str | None = None,
+    ) -> bool:
+        """Registra el resultado final de una consulta.
+
+        Returns:
+            False si otro worker reclamó la consulta y el resultado se descartó
+
+        """
+        return self._actualizar_propia(
+            item,
+            estado=estado,
+            resultado=resultado,
+            status_code=status_code,
+            error_code=error_code,
+            error_description=error_description,
+            updated_at=func.now(),
+        )
+
+    def reintentar(
+        self, item: ConsultaJobItem, espera: float, error_description: str | None
+    ) -> bool:
+        """Devuelve la consulta a la cola para reintentarla tras ``espera`` segundos.
+
+        Returns:
+            False si otro worker reclamó la consulta entretanto
+
+        """
+        return self._actualizar_propia(
+            item,
+            estado=EstadoItem.PENDIENTE,
+            error_description=error_description,
+            disponible_desde=func.now() + timedelta(seconds=espera),
+            updated_at=func.now(),
+        )
+
+    def _actualizar_propia(self, item: ConsultaJobItem, **valores: object) -> bool:
+        """Actualiza la consulta solo si sigue reclamada por este worker.
+
+        Cada reclamo incrementa ``intentos``, así que si cambió, la consulta
+        la tomó otro worker tras vencer el lease y esta escritura no aplica.
+        """
+        statement = (
+            update(ConsultaJobItem)
+            .where(
+                col(ConsultaJobItem.id) == item.id,
+                col(ConsultaJobItem.estado) == EstadoItem.EN_PROCESO,
+                col(ConsultaJobItem.intentos) == item.intentos,
+            )
+            .values(**valores)
+            .execution_options(synchronize_session=False)
+        )
+        return self.db_session.execute(statement).rowcount == 1  # type: ignore
@@ -1,9 +1,10 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
-from sqlmodel import Session, select
+from sqlmodel import Session, and_, col, or_, select
 
 from app.api.requests import ConsultaAfiliadoRequest
+from app.database import marcar_escritura
 from app.models.consulta import Consulta
 
 
@@ -26,9 +27,54 @@ class ConsultaRepository:
             Consulta.error_code == None,
         )
 
-        historial = self.db_session.exec(statement).first()
+        # Lectura de validez de caché: puede atenderla la réplica
+        historial = self.db_session.exec(
+            statement, bind_arguments={"replica": numero_documento}
+        ).first()
         return historial is not None
 
+    def buscar_error_reciente(
+        self, numero_documento: str, ttls: dict[str, int]
+    ) -> Consulta | None:
+        """Busca un error del SIS aún vigente en la caché negativa.
+
+        Args:
+            numero_documento: Documento consultado
+            ttls: Segundos de vigencia por código de error; los códigos que
+                no figuran no se cachean
+
+        Returns:
+            La consulta con el error más reciente, o None si no hay vigentes
+
+        """
+        ahora = datetime.now()  # noqa: DTZ005
+        vigentes = [
+            and_(
+                Consulta.error_code == error_code,
+                Consulta.created_at >= ahora - timedelta(seconds=ttl),
+            )
+            for error_code, ttl in ttls.items()
+            if ttl > 0
+        ]
+        if not vigentes:
+            return None
+
+        # Solo respuestas reales del SIS: las servidas desde caché no renuevan
+        # la vigencia
+        statement = (
+            select(Consulta)
+            .where(
+                Consulta.numero_documento == numero_documento,
+                Consulta.es_local == False,
+                or_(*vigentes),
+            )
+            .order_by(col(Consulta.created_at).desc())
+            .limit(1)
+        )
+        return self.db_session.exec(
+            statement, bind_arguments={"replica": numero_documento}
+        ).first()
+
     def registrar_consulta(
         self,
         consulta: ConsultaAfiliadoRequest,
@@ -46,3 +92,6 @@ class ConsultaRepository:
             error_description=error_description,
         )
         self.db_session.add(historial_consulta)
+        # Una respuesta real del SIS cambia la validez de la caché del documento
+        if not es_local:
+            marcar_escritura(self.db_session, consulta.nro_documento)
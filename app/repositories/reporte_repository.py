@@ -0,0 +1,178 @@
+from datetime import date, datetime
+
+from sqlalchemy import Integer, case, cast, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, col, select
+
+from app.models.consulta import Consulta
+from app.models.reporte import ConsultaErrorDiario, ConsultaUsoDiario, ReporteAvance
+
+# Avance de los resúmenes de la tabla ``consulta``
+AVANCE_CONSULTA = "consulta"
+
+# Clave de réplica de los reportes: toleran el retraso de la réplica
+REPORTES = "reportes"
+
+
+class ReporteRepository:
+    """Resúmenes diarios de ``consulta`` y las lecturas de los reportes."""
+
+    def __init__(self, db_session: Session) -> None:
+        """Inicializa el repositorio."""
+        self.db_session = db_session
+
+    def bloquear_avance(self) -> ReporteAvance:
+        """Obtiene el avance bloqueándolo hasta el fin de la transacción.
+
+        El bloqueo serializa las actualizaciones de varios procesos: el que
+        espera lee el avance ya movido por el otro y no repite filas.
+        """
+        statement = (
+            select(ReporteAvance)
+            .where(ReporteAvance.nombre == AVANCE_CONSULTA)
+            .with_for_update()
+        )
+        avance = self.db_session.exec(statement).first()
+        if avance is None:
+            avance = ReporteAvance(nombre=AVANCE_CONSULTA)
+            self.db_session.add(avance)
+        return avance
+
+    def siguiente_tramo(self, desde_id: int, lote: int, corte: datetime) -> int | None:
+        """Último ``id`` del siguiente tramo de hasta ``lote`` consultas.
+
+        El tramo termina antes de la primera consulta creada después de
+        ``corte``: una consulta reciente puede seguir en una transacción
+        abierta con un ``id`` menor que otra ya confirmada, y el avance la
+        saltaría.
+
+        Returns:
+            El último ``id`` del tramo, o None si no hay consultas nuevas
+
+        """
+        tramo = (
+            select(Consulta.id, Consulta.created_at)
+            .where(col(Consulta.id) > desde_id)
+            .order_by(col(Consulta.id))
+            .limit(lote)
+            .subquery()
+        )
+        primera_reciente = func.min(case((tramo.c.created_at >= corte, tramo.c.id)))
+        statement = select(
+            func.coalesce(primera_reciente - 1, func.max(tramo.c.id))
+        ).select_from(tramo)
+        hasta_id = self.db_session.exec(statement).one()  # type: ignore
+        return hasta_id if hasta_id is not None and hasta_id > desde_id else None
+
+    def acumular(self, desde_id: int, hasta_id: int) -> None:
+        """Suma a los resúmenes las consultas con ``id`` en ``(desde, hasta]``."""
+        dia = func.date(Consulta.created_at)
+        tramo = (col(Consulta.id) > desde_id, col(Consulta.id) <= hasta_id)
+
+        uso = select(
+            dia,
+            Consulta.usuario,
+            func.count(),
+            func.sum(cast(Consulta.es_local, Integer)),
+            func.count(Consulta.error_code),
+        ).where(*tramo)
+        self._sumar(
+            ConsultaUsoDiario,
+            ["dia", "usuario", "total", "locales", "errores"],
+            uso.group_by(dia, Consulta.usuario),
+        )
+
+        errores = select(
+            dia, Consulta.usuario, Consulta.error_code, func.count()
+        ).where(*tramo, col(Consulta.error_code).is_not(None))
+        self._sumar(
+            ConsultaErrorDiario,
+            ["dia", "usuario", "error_code", "total"],
+            errores.group_by(dia, Consulta.usuario, Consulta.error_code),
+        )
+
+    def _sumar(
+        self,
+        modelo: type[ConsultaUsoDiario | ConsultaErrorDiario],
+        columnas: list[str],
+        agregado: object,
+    ) -> None:
+        """Inserta los conteos agregados o los suma a los existentes."""
+        dialecto = self.db_session.get_bind().dialect.name
+        insertar = postgresql.insert if dialecto == "postgresql" else sqlite.insert
+        tabla = modelo.__table__  # type: ignore
+        statement = insertar(tabla).from_select(columnas, agregado)  # type: ignore
+        claves = [c.name for c in tabla.primary_key]
+        statement = statement.on_conflict_do_update(
+            index_elements=claves,
+            set_={
+                columna: tabla.c[columna] + statement.excluded[columna]
+                for columna in columnas
+                if columna not in claves
+            },
+        )
+        self.db_session.exec(statement)  # type: ignore
+
+    def uso_por_dia(
+        self, desde: date, hasta: date, usuario: str | None = None
+    ) -> list[tuple[date, int, int, int]]:
+        """Totales, locales y errores por día del periodo."""
+        return self._uso(ConsultaUsoDiario.dia, desde, hasta, usuario)  # type: ignore
+
+    def uso_por_usuario(
+        self, desde: date, hasta: date, usuario: str | None = None
+    ) -> list[tuple[str, int, int, int]]:
+        """Totales, locales y errores por usuario en el periodo."""
+        return self._uso(ConsultaUsoDiario.usuario, desde, hasta, usuario)  # type: ignore
+
+    def _uso(
+        self, grupo: object, desde: date, hasta: date, usuario: str | None
+    ) -> list[tuple]:
+        """Suma los resúmenes de uso del periodo agrupados por ``grupo``."""
+        statement = select(
+            grupo,
+            func.sum(ConsultaUsoDiario.total),
+            func.sum(ConsultaUsoDiario.locales),
+            func.sum(ConsultaUsoDiario.errores),
+        ).where(
+            col(ConsultaUsoDiario.dia) >= desde, col(ConsultaUsoDiario.dia) <= hasta
+        )
+        if usuario is not None:
+            statement = statement.where(ConsultaUsoDiario.usuario == usuario)
+        statement = statement.group_by(grupo).order_by(grupo)  # type: ignore
+        return list(
+            self.db_session.exec(
+                statement,  # type: ignore
+                bind_arguments={"replica": REPORTES},
+            ).all()
+        )
+
+    def errores(
+        self, desde: date, hasta: date, usuario: str | None = None
+    ) -> list[tuple[str, int]]:
+        """Consultas por código de error en el periodo, de más a menos."""
+        total = func.sum(ConsultaErrorDiario.total)
+        statement = select(ConsultaErrorDiario.error_code, total).where(
+            col(ConsultaErrorDiario.dia) >= desde,
+            col(ConsultaErrorDiario.dia) <= hasta,
+        )
+        if usuario is not None:
+            statement = statement.where(ConsultaErrorDiario.usuario == usuario)
+        statement = statement.group_by(ConsultaErrorDiario.error_code).order_by(
+            total.desc(), ConsultaErrorDiario.error_code
+        )
+        return list(
+            self.db_session.exec(
+                statement,  # type: ignore
+                bind_arguments={"replica": REPORTES},
+            ).all()
+        )
+
+    def actualizado_at(self) -> datetime | None:
+        """Momento de la última actualización de los resúmenes."""
+        statement = select(ReporteAvance.updated_at).where(
+            ReporteAvance.nombre == AVANCE_CONSULTA
+        )
+        return self.db_session.exec(
+            statement, bind_arguments={"replica": REPORTES}
+        ).first()
@@ -0,0 +1,164 @@
+import uuid
+from datetime import timedelta
+
+from sqlalchemy import delete, func, insert, literal, update
+from sqlmodel import Session, col, select
+
+from app.api.requests import SuscripcionRequest
+from app.models.afiliado_historial import AfiliadoHistorial
+from app.models.suscripcion import (
+    CanalSuscripcion,
+    EstadoNotificacion,
+    Notificacion,
+    Suscripcion,
+)
+
+
+class SuscripcionRepository:
+    """Repositorio de suscripciones y de su cola de notificaciones."""
+
+    def __init__(self, db_session: Session) -> None:
+        """Inicializa el repositorio."""
+        self.db_session = db_session
+
+    def crear(self, request: SuscripcionRequest) -> Suscripcion:
+        """Registra una suscripción."""
+        suscripcion = Suscripcion(
+            numero_documento=request.numero_documento,
+            canal=request.canal,
+            webhook_url=str(request.webhook_url) if request.webhook_url else None,
+            secreto=request.secreto,
+        )
+        self.db_session.add(suscripcion)
+        return suscripcion
+
+    def obtener(self, suscripcion_id: uuid.UUID) -> Suscripcion | None:
+        """Obtiene una suscripción por su identificador."""
+        return self.db_session.get(Suscripcion, suscripcion_id)
+
+    def eliminar(self, suscripcion_id: uuid.UUID) -> bool:
+        """Elimina una suscripción y sus notificaciones pendientes."""
+        resultado = self.db_session.execute(
+            delete(Suscripcion).where(col(Suscripcion.id) == suscripcion_id)
+        )
+        return bool(resultado.rowcount)  # type: ignore
+
+    def notificar_cambio(self, historial: AfiliadoHistorial) -> None:
+        """Encola el cambio para todas las suscripciones del documento.
+
+        Es un solo ``INSERT ... SELECT`` dentro de la transacción del cambio:
+        sin suscripciones no inserta nada.
+        """
+        evento = {
+            "numero_documento": historial.numero_documento,
+            "content_hash": historial.content_hash,
+            "valid_from": historial.valid_from.isoformat(),
+            "completo": historial.completo,
+            "cambios": historial.cambios,
+        }
+        tipo_evento = Notificacion.__table__.c.evento.type  # type: ignore
+        suscriptores = select(
+            Suscripcion.id,
+            Suscripcion.canal,
+            literal(evento, type_=tipo_evento),
+            func.now(),
+            func.now(),
+        ).where(Suscripcion.numero_documento == historial.numero_documento)
+        # Los valores por defecto calculados en Python no aplican a un
+        # INSERT ... SELECT, por eso las fechas se toman del servidor
+        self.db_session.execute(
+            insert(Notificacion).from_select(
+                [
+                    "suscripcion_id",
+                    "canal",
+                    "evento",
+                    "disponible_desde",
+                    "created_at",
+                ],
+                suscriptores,
+            )
+        )
+
+    def reclamar(self, limite: int, lease: float) -> list[Notificacion]:
+        """Toma hasta ``limite`` webhooks pendientes con ``FOR UPDATE SKIP LOCKED``.
+
+        Las notificaciones reclamadas no vuelven a estar disponibles hasta que
+        vence el *lease*; si el despachador se cae, se reintentan después.
+        """
+        disponibles = (
+            select(Notificacion.id)
+            .where(
+                Notificacion.estado == EstadoNotificacion.PENDIENTE,
+                Notificacion.canal == CanalSuscripcion.WEBHOOK,
+                col(Notificacion.disponible_desde) <= func.now(),
+            )
+            .order_by(col(Notificacion.disponible_desde), col(Notificacion.id))
+            .limit(limite)
+            .with_for_update(skip_locked=True)
+        )
+        statement = (
+            update(Notificacion)
+            .where(col(Notificacion.id).in_(disponibles.scalar_subquery()))
+            .values(
+                intentos=Notificacion.intentos + 1,
+                disponible_desde=func.now() + timedelta(seconds=lease),
+            )
+            .returning(Notificacion)
+        )
+        return list(self.db_session.scalars(statement).all())
+
+    def suscripciones(self, ids: set[uuid.UUID]) -> dict[uuid.UUID, Suscripcion]:
+        """Obtiene las suscripciones indicadas indexadas por id."""
+        statement = select(Suscripcion).where(col(Suscripcion.id).in_(ids))
+        return {s.id: s for s in self.db_session.exec(statement).all()}
+
+    def pendientes_sse(
+        self, suscripcion_id: uuid.UUID, desde_id: int | None, limite: int
+    ) -> list[Notificacion]:
+        """Eventos a emitir por el *stream* de una suscripción.
+
+        Con ``desde_id`` (cabecera ``Last-Event-ID``) se reenvía todo lo
+        posterior aunque ya se haya emitido; sin él, solo lo pendiente.
+        """
+        statement = select(Notificacion).where(
+            Notificacion.suscripcion_id == suscripcion_id
+        )
+        if desde_id is None:
+            statement = statement.where(
+                Notificacion.estado == EstadoNotificacion.PENDIENTE
+            )
+        else:
+            statement = statement.where(col(Notificacion.id) > desde_id)
+        statement = statement.order_by(col(Notificacion.id)).limit(limite)
+        return list(self.db_session.exec(statement).all())
+
+    def marcar_enviadas(self, ids: list[int]) -> None:
+        """Marca notificaciones como entregadas."""
+        self.db_session.execute(
+            update(Notificacion)
+            .where(col(Notificacion.id).in_(ids))
+            .values(
+                estado=EstadoNotificacion.ENVIADA,
+                enviada_at=func.now(),
+                error=None,
+            )
+        )
+
+    def reintentar(self, ids: list[int], espera: float, error: str) -> None:
+        """Devuelve notificaciones a la cola para reintentarlas más tarde."""
+        self.db_session.execute(
+            update(Notificacion)
+            .where(col(Notificacion.id).in_(ids))
+            .values(
+                disponible_desde=func.now() + timedelta(seconds=espera),
+                error=error,
+            )
+        )
+
+    def descartar(self, ids: list[int], error: str) -> None:
+        """Marca notificaciones como fallidas sin más reintentos."""
+        self.db_session.execute(
+            update(Notificacion)
+            .where(col(Notificacion.id).in_(ids))
+            .values(estado=EstadoNotificacion.ERROR, error=error)
+        )
@@ -0,0 +1,117 @@
+"""Servidor de producción: gunicorn con workers de uvicorn.
+
+El proceso maestro importa la aplicación y parsea el WSDL del SIS una sola vez
+antes de crear los workers (``preload_app``); cada worker hereda el cliente
+SOAP ya construido y solo descarta las conexiones abiertas por el maestro.
+
+Examples:
+    >>> python -m app.server
+    >>> WEB_WORKERS=4 DB_CONNECTION_BUDGET=40 python -m app.server
+
+"""
+
+import os
+from pathlib import Path
+from typing import Any
+
+from gunicorn.app.base import BaseApplication
+from gunicorn.arbiter import Arbiter
+from gunicorn.workers.base import Worker
+
+from app.database import get_database_config
+from app.services.sis_service import reiniciar_conexiones_soap
+from tools.config import Settings, get_settings
+from tools.logger import Logger
+
+# Configurar logging
+logger = Logger(__name__)
+
+
+def resolver_workers(settings: Settings) -> int:
+    """Cantidad de workers: ``WEB_WORKERS`` o la cantidad de núcleos.
+
+    Con ``DB_CONNECTION_BUDGET`` no se crean más workers que conexiones, ya
+    que cada worker necesita al menos una.
+    """
+    workers = settings.web_workers or os.cpu_count() or 1
+    presupuesto = settings.db_connection_budget
+    if presupuesto is not None and workers > presupuesto:
+        logger.warning(
+            "%s workers superan el presupuesto de %s conexiones; se usan %s",
+            workers,
+            presupuesto,
+            presupuesto,
+        )
+        workers = presupuesto
+    return workers
+
+
+def post_fork(server: Arbiter, worker: Worker) -> None:  # noqa: ARG001
+    """Descarta en el worker las conexiones heredadas del maestro."""
+    get_database_config().reiniciar_tras_fork()
+    reiniciar_conexiones_soap()
+
+
+def opciones_gunicorn(settings: Settings) -> dict[str, Any]:
+    """Configuración de gunicorn a partir de los ``Settings``."""
+    opciones: dict[str, Any] = {
+        "bind": f"{settings.web_host}:{settings.web_port}",
+        "workers": settings.web_workers or 1,
+        "worker_class": "uvicorn_worker.UvicornWorker",
+        "preload_app": True,
+        "timeout": settings.web_timeout,
+        "graceful_timeout": settings.web_graceful_timeout,
+        "keepalive": settings.web_keepalive,
+        "max_requests": settings.web_max_requests,
+        "max_requests_jitter": settings.web_max_requests_jitter,
+        "accesslog": "-",
+        "post_fork": post_fork,
+    }
+    # El heartbeat de los workers en memoria evita bloqueos de disco en Docker
+    if Path("/dev/shm").is_dir():  # noqa: S108
+        opciones["worker_tmp_dir"] = "/dev/shm"  # noqa: S108
+    return opciones
+
+
+class Servidor(BaseApplication):
+    """Aplicación gunicorn que precarga la app y el WSDL en el maestro."""
+
+    def __init__(self, opciones: dict[str, Any]) -> None:
+        """Inicializa el servidor con la configuración de gunicorn."""
+        self.opciones = opciones
+        super().__init__()
+
+    def load_config(self) -> None:
+        """Aplica la configuración de gunicorn."""
+        for clave, valor in self.opciones.items():
+            self.cfg.set(clave, valor)
+
+    def load(self) -> Any:  # noqa: ANN401
+        """Importa la aplicación y parsea el WSDL antes de crear los workers."""
+        from app.main import app, precargar_cliente_soap
+
+        if get_settings().soap_sis:
+            precargar_cliente_soap()
+        return app
+
+
+def main() -> None:
+    """Punto de entrada del servidor de producción."""
+    workers = resolver_workers(get_settings())
+    # Los workers reparten DB_CONNECTION_BUDGET según WEB_WORKERS
+    os.environ["WEB_WORKERS"] = str(workers)
+    get_settings.cache_clear()
+    settings = get_settings()
+    logger.info(
+        "Iniciando %s workers en %s:%s (pool por worker: %s + %s)",
+        workers,
+        settings.web_host,
+        settings.web_port,
+        settings.db_pool_size,
+        settings.db_max_overflow,
+    )
+    Servidor(opciones_gunicorn(settings)).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,55 @@
+from datetime import datetime
+from functools import lru_cache
+
 from api_exception import BaseExceptionCode
+from fastapi import status
 from result import Err, Ok, Result
 from sqlmodel import Session
 
 from app.api.exceptions import CustomExceptionCode
+from app.api.paginacion import codificar_cursor, decodificar_cursor
 from app.api.requests import ConsultaAfiliadoRequest
-from app.models.afiliado import Afiliado
+from app.models.afiliado import AfiliadoPublico, BusquedaAfiliados
+from app.models.afiliado_historial import AfiliadoHistorial
+from app.models.consulta import Consulta
 from app.repositories.afiliado_repository import AfiliadoRepository
 from app.repositories.consulta_repository import ConsultaRepository
+from tools.config import get_settings
 from tools.logger import Logger
 
+from .catalogos import get_catalogos
 from .sis_service import SISService
 
 # Configurar logging
 logger = Logger(__name__)
 
+# Largo mínimo de un término de búsqueda: los trigramas no filtran términos
+# más cortos y la búsqueda recorrería toda la tabla
+LARGO_MINIMO_TERMINO = 3
+
+# Errores deterministas del SIS que pueden servirse desde la caché negativa,
+# con el código HTTP con el que se responden. Solo el documento inexistente o
+# inválido: otros IdError (API-422) pueden ser transitorios
+ERRORES_CACHEABLES: dict[BaseExceptionCode, int] = {
+    CustomExceptionCode.AFILIADO_NO_ENCONTRADO: status.HTTP_422_UNPROCESSABLE_ENTITY,
+}
+
+
+@lru_cache(maxsize=1)
+def get_ttls_negativos() -> dict[str, int]:
+    """Vigencia en segundos de la caché negativa por código de error.
+
+    Se configura con ``NEGATIVE_CACHE_TTLS`` (por ejemplo ``API-404=900``).
+    Los códigos que no son errores deterministas del SIS (fallas de
+    transporte, faults, otros ``IdError``) se ignoran aunque se configuren.
+    """
+    cacheables = {error.error_code for error in ERRORES_CACHEABLES}
+    return {
+        error_code: ttl
+        for error_code, ttl in get_settings().negative_cache_ttls.items()
+        if error_code in cacheables
+    }
+
 
 class AfiliadoService:
     """Servicio de negocio para la consulta de afiliados.
@@ -21,8 +57,9 @@ class AfiliadoService:
     Implementa una estrategia de caché que:
     1. Verifica si ya se consultó el afiliado hoy
     2. Si existe caché, lo retorna
-    3. Si no, consulta el servicio externo
-    4. Guarda/actualiza los datos y registra la consulta
+    3. Si el SIS respondió un error determinista hace poco, lo repite
+    4. Si no, consulta el servicio externo
+    5. Guarda/actualiza los datos y registra la consulta
     """
 
     def __init__(self, db_session: Session) -> None:
@@ -31,14 +68,18 @@ class AfiliadoService:
         self.cache_manager = ConsultaRepository(db_session)
         self.repository = AfiliadoRepository(db_session)
         self.sis_service = SISService()
+        self.catalogos = get_catalogos()
+        self.ttls_negativos = get_ttls_negativos()
 
     async def consultar_afiliado(
-        self, token: str, consulta: ConsultaAfiliadoRequest
-    ) -> Result[Afiliado, tuple[BaseExceptionCode, int, str | None]]:
+        self, token: str | None, consulta: ConsultaAfiliadoRequest
+    ) -> Result[AfiliadoPublico, tuple[BaseExceptionCode, int, str | None]]:
         """Consulta un afiliado utilizando estrategia de caché.
 
         Args:
-            token: Token de autorización para el servicio externo
+            token: Token de autorización para el servicio externo; con None se
+                usa el pool de credenciales del servicio (y no se pide sesión
+                si la consulta se resuelve desde caché)
             consulta: Datos de la consulta (DNI, tipo documento)
 
         Returns:
@@ -50,6 +91,13 @@ class AfiliadoService:
             if self.cache_manager.verificar_consulta_hoy(consulta.nro_documento):
                 return await self._consultar_desde_cache(consulta)
 
+            # Verificar si el SIS ya indicó un error determinista hace poco
+            error = self.cache_manager.buscar_error_reciente(
+                consulta.nro_documento, self.ttls_negativos
+            )
+            if error is not None:
+                return await self._responder_error_desde_cache(consulta, error)
+
             # Si no hay caché, consultar servicio externo
             return await self._consultar_servicio_externo(token, consulta)
 
@@ -57,40 +105,141 @@ class AfiliadoService:
             logger.exception("Error inesperado consultando afiliado")
             return Err((CustomExceptionCode.CONSULTAR_AFILIADO_FUAE_ERROR, 500, str(e)))
 
+    async def obtener_historial(
+        self, numero_documento: str, limite: int = 50
+    ) -> list[AfiliadoHistorial]:
+        """Obtiene las versiones registradas de un afiliado."""
+        historial = self.repository.historial.listar(numero_documento, limite)
+        self.db_session.commit()
+        return historial
+
+    async def buscar_por_nombre(
+        self, texto: str, limite: int = 20, despues: str | None = None
+    ) -> Result[BusquedaAfiliados, tuple[BaseExceptionCode, int, str]]:
+        """Busca afiliados de la caché local por apellidos y nombres.
+
+        Cada palabra de ``texto`` debe aparecer en el nombre completo; las de
+        menos de tres letras se ignoran. ``despues`` es el cursor ``siguiente``
+        de la página anterior.
+        """
+        terminos = [
+            termino
+            for termino in texto.upper().split()
+            if len(termino) >= LARGO_MINIMO_TERMINO
+        ]
+        if not terminos:
+            return Err(
+                (
+                    CustomExceptionCode.BUSQUEDA_INVALIDA,
+                    status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    f"Ingrese al menos un término de {LARGO_MINIMO_TERMINO} letras",
+                )
+            )
+        try:
+            cursor = decodificar_cursor(despues, str, int) if despues else None
+        except ValueError as e:
+            return Err(
+                (
+                    CustomExceptionCode.BUSQUEDA_INVALIDA,
+                    status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    str(e),
+                )
+            )
+
+        filas = self.repository.buscar_por_nombre(
+            terminos, limite + 1, tuple(cursor) if cursor else None
+        )
+        self.db_session.commit()
+        siguiente = None
+        if len(filas) > limite:
+            filas = filas[:limite]
+            nombre, afiliado_id, _ = filas[-1]
+            siguiente = codificar_cursor(nombre, afiliado_id)
+        return Ok(
+            BusquedaAfiliados(
+                resultados=[resumen for _, _, resumen in filas], siguiente=siguiente
+            )
+        )
+
+    async def obtener_validadores(
+        self, numero_documento: str
+    ) -> tuple[str | None, datetime | None] | None:
+        """Obtiene los validadores HTTP del afiliado almacenado."""
+        validadores = self.repository.obtener_validadores(numero_documento)
+        self.db_session.commit()
+        return validadores
+
     async def _consultar_desde_cache(
         self, consulta: ConsultaAfiliadoRequest
-    ) -> Result[Afiliado, tuple[BaseExceptionCode, int, str | None]]:
+    ) -> Result[AfiliadoPublico, tuple[BaseExceptionCode, int, str | None]]:
         """Consulta un afiliado desde el caché local."""
-        afiliado = self.repository.buscar_por_documento(consulta.nro_documento)
+        afiliado = self.repository.buscar_por_documento(
+            consulta.nro_documento, replica=True
+        )
         self.cache_manager.registrar_consulta(consulta, es_local=True)
         self.db_session.commit()
-        self.db_session.refresh(afiliado)
         if afiliado is None:
             return Err((CustomExceptionCode.CONSULTAR_AFILIADO_FUAE_ERROR, 404, None))
         logger.info("Datos de afiliado obtenidos desde caché")
         logger.info("Consulta registrada.")
-        return Ok(afiliado)
+        return Ok(self.catalogos.describir(self.db_session, afiliado))
+
+    async def _responder_error_desde_cache(
+        self, consulta: ConsultaAfiliadoRequest, error: Consulta
+    ) -> Result[AfiliadoPublico, tuple[BaseExceptionCode, int, str | None]]:
+        """Repite un error determinista reciente sin llamar al SIS."""
+        error_code = next(
+            codigo
+            for codigo in ERRORES_CACHEABLES
+            if codigo.error_code == error.error_code
+        )
+        self.cache_manager.registrar_consulta(
+            consulta,
+            es_local=True,
+            error_code=error.error_code,
+            error_description=error.error_description,
+        )
+        self.db_session.commit()
+        logger.info("Error del SIS obtenido desde caché negativa")
+        return Err(
+            (error_code, ERRORES_CACHEABLES[error_code], error.error_description)
+        )
 
     async def _consultar_servicio_externo(
-        self, token: str, consulta: ConsultaAfiliadoRequest
-    ) -> Result[Afiliado, tuple[BaseExceptionCode, int, str | None]]:
+        self, token: str | None, consulta: ConsultaAfiliadoRequest
+    ) -> Result[AfiliadoPublico, tuple[BaseExceptionCode, int, str | None]]:
         """Consulta el servicio externo y actualiza la base de datos."""
         logger.info("Consultando servicio SIS para afiliado")
 
-        match await self.sis_service.consultar_afiliado_fuae(token, consulta):
+        # Cerrar la transacción de las lecturas de caché: sin réplica queda
+        # abierta en el primario y, ociosa mientras se espera al SIS, PostgreSQL
+        # la cortaría por idle_in_transaction_session_timeout
+        self.db_session.commit()
+        if token is None:
+            resultado = await self.sis_service.consultar_afiliado(consulta)
+        else:
+            resultado = await self.sis_service.consultar_afiliado_fuae(token, consulta)
+        match resultado:
             case Ok(afiliado):
-                afiliado_guardado = self.repository.guardar_o_actualizar(afiliado)
+                # Las descripciones van a los catálogos y no a la fila
+                self.catalogos.registrar(self.db_session, afiliado)
+                afiliado_guardado = self.repository.guardar_o_actualizar(
+                    afiliado.registro()
+                )
                 self.cache_manager.registrar_consulta(consulta)
 
+                # La sesión no expira los objetos al confirmar, así que se
+                # responde con la instancia en memoria sin volver a leerla
                 self.db_session.commit()
-                self.db_session.refresh(afiliado_guardado)
-                return Ok(afiliado_guardado)
+                return Ok(
+                    AfiliadoPublico.desde(afiliado_guardado, afiliado.descripciones())
+                )
 
             case Err((error_code, status_code, message)):
                 self.cache_manager.registrar_consulta(
                     consulta,
                     error_code=error_code.error_code,
-                    error_description=error_code.message,
+                    error_description=message or error_code.message,
                 )
                 self.db_session.commit()
                 return Err(
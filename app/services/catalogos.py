@@ -0,0 +1,122 @@
+"""Catálogos de establecimientos, ubigeos y tipos de seguro en memoria.
+
+Las descripciones se leen una vez de las tablas ``eess``, ``ubigeo`` y
+``tipo_seguro`` y se consultan en memoria al armar cada respuesta. Cada
+``CATALOGO_REFRESH_INTERVAL`` segundos se compara la última modificación de
+los catálogos (una consulta) y, si cambió en otro proceso, se recargan.
+"""
+
+import time
+from functools import lru_cache
+
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.database import RoutingSession, get_database_config
+from app.models.afiliado import Afiliado, AfiliadoPublico
+from app.models.catalogo import DIMENSIONES
+from app.repositories.catalogo_repository import CatalogoRepository
+from tools.config import get_settings
+from tools.logger import Logger
+
+# Configurar logging
+logger = Logger(__name__)
+
+# Clave de ``Session.info`` con las descripciones escritas en la transacción
+PENDIENTES = "catalogos_pendientes"
+
+
+class Catalogos:
+    """Descripciones por código de cada catálogo, con recarga ante cambios."""
+
+    def __init__(self, intervalo: float) -> None:
+        """Inicializa los catálogos vacíos, sin cargar."""
+        self.intervalo = intervalo
+        self.descripciones: dict[str, dict[str, str]] = {
+            campo: {} for campo in DIMENSIONES
+        }
+        self.version: tuple | None = None
+        self._revisado = float("-inf")
+
+    def refrescar(self, session: Session, *, forzar: bool = False) -> None:
+        """Recarga los catálogos si cambiaron desde la última carga."""
+        ahora = time.monotonic()
+        if not forzar and ahora - self._revisado < self.intervalo:
+            return
+        self._revisado = ahora
+        repository = CatalogoRepository(session)
+        version = repository.version()
+        if version == self.version:
+            return
+        self.descripciones = {
+            campo: repository.listar(modelo)
+            for campo, (modelo, _) in DIMENSIONES.items()
+        }
+        self.version = version
+        logger.info(
+            "Catálogos cargados: %s",
+            {campo: len(valores) for campo, valores in self.descripciones.items()},
+        )
+
+    def describir(self, session: Session, afiliado: Afiliado) -> AfiliadoPublico:
+        """Agrega al afiliado las descripciones de sus códigos."""
+        self.refrescar(session)
+        return AfiliadoPublico.desde(
+            afiliado,
+            {
+                campo: self.descripciones[campo].get(getattr(afiliado, codigo))
+                for campo, (_, codigo) in DIMENSIONES.items()
+            },
+        )
+
+    def registrar(self, session: Session, afiliado: AfiliadoPublico) -> None:
+        """Guarda las descripciones del SIS que no coinciden con las conocidas.
+
+        En el caso habitual todas coinciden y no se escribe nada. Las nuevas o
+        cambiadas se guardan en la transacción de la sesión y se aplican en
+        memoria al confirmarla; los demás procesos las ven al refrescar.
+        """
+        self.refrescar(session)
+        repository = CatalogoRepository(session)
+        for campo, (modelo, atributo) in DIMENSIONES.items():
+            codigo = getattr(afiliado, atributo)
+            descripcion = getattr(afiliado, campo)
+            if not codigo or not descripcion:
+                continue
+            if self.descripciones[campo].get(codigo) == descripcion:
+                continue
+            repository.guardar(modelo, codigo, descripcion)
+            session.info.setdefault(PENDIENTES, []).append((campo, codigo, descripcion))
+
+    def aplicar(self, pendientes: list[tuple[str, str, str]]) -> None:
+        """Aplica en memoria las descripciones ya confirmadas."""
+        for campo, codigo, descripcion in pendientes:
+            self.descripciones[campo][codigo] = descripcion
+
+
+@lru_cache(maxsize=1)
+def get_catalogos() -> Catalogos:
+    """Catálogos compartidos del proceso."""
+    return Catalogos(get_settings().catalogo_refresh_interval)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _aplicar_pendientes(session: Session) -> None:
+    """Lleva a memoria lo escrito en los catálogos al confirmar."""
+    if pendientes := session.info.pop(PENDIENTES, None):
+        get_catalogos().aplicar(pendientes)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _descartar_pendientes(session: Session) -> None:
+    """Descarta lo escrito en los catálogos si la transacción se revierte."""
+    session.info.pop(PENDIENTES, None)
+
+
+def precargar_catalogos() -> None:
+    """Carga los catálogos al iniciar para que la primera consulta no espere."""
+    try:
+        with get_database_config().get_session_context() as session:
+            get_catalogos().refrescar(session, forzar=True)
+    except Exception:
+        logger.warning("No se pudieron precargar los catálogos; se reintentará")
@@ -0,0 +1,374 @@
+"""Exportación por streaming de ``consulta`` y ``afiliado``.
+
+Las filas nunca se cargan completas en memoria: en PostgreSQL el CSV sale con
+``COPY ... TO STDOUT`` y los demás formatos se arman por lotes desde un
+cursor del lado del servidor (``stream_results``). La memoria usada depende
+del tamaño del lote, no del de la tabla. La exportación lee de la réplica de
+lectura si está configurada.
+"""
+
+import asyncio
+import contextlib
+import csv
+import importlib.util
+import io
+import queue
+import threading
+from collections.abc import AsyncIterator, Callable, Iterator
+from datetime import date, datetime, time, timedelta
+from enum import StrEnum
+from typing import Any, BinaryIO
+
+from pydantic_core import to_json
+from sqlalchemy import Connection, Engine, Select, select
+from sqlalchemy.sql.schema import Column
+from sqlmodel import col
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from app.database import get_database_config
+from app.models.afiliado import Afiliado
+from app.models.consulta import Consulta
+from tools.logger import Logger
+
+# Configurar logging
+logger = Logger(__name__)
+
+# Bytes que se acumulan antes de entregar un bloque al destino
+TAMANO_BLOQUE = 1 << 20
+
+
+class TablaExportable(StrEnum):
+    """Tablas que se pueden exportar."""
+
+    CONSULTA = "consulta"
+    AFILIADO = "afiliado"
+
+
+class FormatoExportacion(StrEnum):
+    """Formatos de exportación."""
+
+    CSV = "csv"
+    NDJSON = "ndjson"
+    PARQUET = "parquet"
+
+
+# Tabla -> (modelo, columna de fecha de los filtros desde/hasta)
+TABLAS: dict[TablaExportable, tuple[type, Any]] = {
+    TablaExportable.CONSULTA: (Consulta, Consulta.created_at),
+    TablaExportable.AFILIADO: (Afiliado, Afiliado.VerifiedAt),
+}
+
+TIPOS_CONTENIDO = {
+    FormatoExportacion.CSV: "text/csv; charset=utf-8",
+    FormatoExportacion.NDJSON: "application/x-ndjson",
+    FormatoExportacion.PARQUET: "application/vnd.apache.parquet",
+}
+
+
+def formato_disponible(formato: FormatoExportacion) -> bool:
+    """Parquet requiere ``pyarrow``, que es opcional."""
+    if formato == FormatoExportacion.PARQUET:
+        return importlib.util.find_spec("pyarrow") is not None
+    return True
+
+
+def consulta_exportacion(
+    tabla: TablaExportable, desde: date | None = None, hasta: date | None = None
+) -> Select:
+    """Todas las columnas de la tabla con la fecha en ``[desde, hasta]``."""
+    modelo, fecha = TABLAS[tabla]
+    statement = select(modelo.__table__).order_by(col(modelo.id))  # type: ignore
+    if desde is not None:
+        statement = statement.where(fecha >= datetime.combine(desde, time.min))
+    if hasta is not None:
+        statement = statement.where(
+            fecha < datetime.combine(hasta + timedelta(days=1), time.min)
+        )
+    return statement
+
+
+def nombre_archivo(
+    tabla: TablaExportable,
+    formato: FormatoExportacion,
+    desde: date | None = None,
+    hasta: date | None = None,
+) -> str:
+    """Nombre sugerido del archivo exportado."""
+    partes = [tabla.value]
+    if desde is not None:
+        partes.append(f"desde-{desde.isoformat()}")
+    if hasta is not None:
+        partes.append(f"hasta-{hasta.isoformat()}")
+    return f"{'_'.join(partes)}.{formato.value}"
+
+
+def exportar(  # noqa: PLR0913
+    destino: BinaryIO,
+    tabla: TablaExportable,
+    formato: FormatoExportacion,
+    desde: date | None = None,
+    hasta: date | None = None,
+    *,
+    lote: int = 10_000,
+    engine: Engine | None = None,
+) -> int:
+    """Escribe la exportación en ``destino`` y devuelve las filas escritas.
+
+    Args:
+        destino: Archivo binario de salida; se escribe por bloques
+        tabla: Tabla a exportar
+        formato: Formato de salida
+        desde: Primer día incluido, según la fecha de la tabla
+        hasta: Último día incluido
+        lote: Filas leídas del cursor por vez (NDJSON, Parquet)
+        engine: Motor a usar; por defecto la réplica o el primario
+
+    """
+    if engine is None:
+        config = get_database_config()
+        engine = config.replica_engine or config.engine
+    statement = consulta_exportacion(tabla, desde, hasta)
+    with engine.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            # Una exportación puede durar más que el statement_timeout de
+            # las consultas de la API, y mientras espera a un cliente lento la
+            # conexión queda ociosa dentro de la transacción del cursor
+            connection.exec_driver_sql("SET LOCAL statement_timeout = 0")
+            connection.exec_driver_sql(
+                "SET LOCAL idle_in_transaction_session_timeout = 0"
+            )
+            if formato == FormatoExportacion.CSV:
+                return _copiar_csv(connection, statement, destino)
+        escribir = {
+            FormatoExportacion.CSV: _escribir_csv,
+            FormatoExportacion.NDJSON: _escribir_ndjson,
+            FormatoExportacion.PARQUET: _escribir_parquet,
+        }[formato]
+        return escribir(connection, statement, destino, lote)
+
+
+def _copiar_csv(connection: Connection, statement: Select, destino: BinaryIO) -> int:
+    """CSV con ``COPY TO STDOUT``: PostgreSQL arma las filas, sin pasar por Python."""
+    compilado = statement.compile(dialect=connection.dialect)
+    cursor = connection.connection.cursor()
+    try:
+        sql = cursor.mogrify(str(compilado), compilado.params).decode()  # type: ignore
+        cursor.copy_expert(  # type: ignore
+            f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER)", destino
+        )
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+def _filas(
+    connection: Connection, statement: Select, lote: int
+) -> tuple[list[str], Iterator[list[tuple]]]:
+    """Columnas y lotes de filas leídos de un cursor del lado del servidor."""
+    result = connection.execution_options(
+        stream_results=True, max_row_buffer=lote
+    ).execute(statement)
+    lotes = (list(particion) for particion in result.partitions(lote))
+    return list(result.keys()), lotes
+
+
+def _escribir_csv(
+    connection: Connection, statement: Select, destino: BinaryIO, lote: int
+) -> int:
+    columnas, lotes = _filas(connection, statement, lote)
+    texto = io.TextIOWrapper(destino, encoding="utf-8", newline="")  # type: ignore
+    writer = csv.writer(texto)
+    writer.writerow(columnas)
+    total = 0
+    for filas in lotes:
+        writer.writerows(filas)
+        total += len(filas)
+    # Se separa el destino para que cerrar el envoltorio no lo cierre
+    texto.detach()
+    return total
+
+
+def _escribir_ndjson(
+    connection: Connection, statement: Select, destino: BinaryIO, lote: int
+) -> int:
+    columnas, lotes = _filas(connection, statement, lote)
+    total = 0
+    for filas in lotes:
+        destino.write(
+            b"".join(
+                to_json(dict(zip(columnas, fila, strict=True))) + b"\n"
+                for fila in filas
+            )
+        )
+        total += len(filas)
+    return total
+
+
+def _escribir_parquet(
+    connection: Connection, statement: Select, destino: BinaryIO, lote: int
+) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    columnas, lotes = _filas(connection, statement, lote)
+    # Esquema a partir de las columnas de la tabla, para que un lote con una
+    # columna toda nula no cambie el tipo
+    schema = pa.schema(
+        (c.name, _tipo_arrow(pa, c))
+        for c in statement.selected_columns
+        if isinstance(c, Column)
+    )
+    total = 0
+    with pq.ParquetWriter(destino, schema) as writer:
+        for filas in lotes:
+            datos = {
+                nombre: [fila[i] for fila in filas] for i, nombre in enumerate(columnas)
+            }
+            writer.write_table(pa.Table.from_pydict(datos, schema=schema))
+            total += len(filas)
+    return total
+
+
+def _tipo_arrow(pa: Any, columna: Column) -> Any:  # noqa: ANN401
+    """Tipo de Arrow de una columna de SQLAlchemy (texto si no se reconoce)."""
+    try:
+        python_type = columna.type.python_type
+    except NotImplementedError:
+        return pa.string()
+    if python_type is datetime:
+        zona = "UTC" if getattr(columna.type, "timezone", False) else None
+        return pa.timestamp("us", tz=zona)
+    return {
+        bool: pa.bool_(),
+        int: pa.int64(),
+        float: pa.float64(),
+        date: pa.date32(),
+    }.get(python_type, pa.string())
+
+
+class _Cola(io.RawIOBase):
+    """Destino que entrega los bloques a una cola acotada.
+
+    Si el consumidor no lee, ``write`` espera: la exportación avanza al ritmo
+    del cliente y nunca acumula más de ``maximo`` bloques.
+    """
+
+    def __init__(self, cancelado: threading.Event, maximo: int = 4) -> None:
+        self.cancelado = cancelado
+        self.cola: queue.Queue = queue.Queue(maxsize=maximo)
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, datos: Any) -> int:  # noqa: ANN401
+        bloque = bytes(datos)
+        if not self.entregar(bloque):
+            message = "Exportación cancelada"
+            raise ConnectionAbortedError(message)
+        return len(bloque)
+
+    def entregar(self, elemento: object) -> bool:
+        """Encola el elemento; False si el consumidor se fue antes."""
+        while not self.cancelado.is_set():
+            try:
+                self.cola.put(elemento, timeout=1)
+            except queue.Full:
+                continue
+            return True
+        # Por si quedó un hilo esperando en ``get``
+        with contextlib.suppress(queue.Full):
+            self.cola.put_nowait(elemento)
+        return False
+
+
+async def stream_exportacion(
+    exportar_en: Callable[[BinaryIO], int],
+) -> AsyncIterator[bytes]:
+    """Ejecuta ``exportar_en`` en un hilo y entrega sus bloques a medida que salen.
+
+    Si el cliente se desconecta, la exportación se cancela en el siguiente
+    bloque y libera la conexión a la base.
+    """
+    cancelado = threading.Event()
+    cola = _Cola(cancelado)
+    fin = object()
+
+    def producir() -> None:
+        resultado: object = fin
+        try:
+            salida = io.BufferedWriter(cola, TAMANO_BLOQUE)
+            filas = exportar_en(salida)  # type: ignore
+            # El escritor de Parquet puede cerrar el destino al terminar
+            if not salida.closed:
+                salida.flush()
+            logger.info("Exportación terminada: %d filas", filas)
+        except Exception as e:
+            if cancelado.is_set():
+                logger.warning("Exportación cancelada por el cliente")
+            else:
+                logger.exception("Error exportando")
+                resultado = e
+        cola.entregar(resultado)
+
+    threading.Thread(target=producir, name="exportacion", daemon=True).start()
+    try:
+        while True:
+            bloque = await asyncio.to_thread(cola.cola.get)
+            if bloque is fin:
+                return
+            if isinstance(bloque, Exception):
+                raise bloque
+            yield bloque
+    finally:
+        cancelado.set()
+
+
+class CuposExportacion:
+    """Cupos de exportaciones simultáneas de un proceso.
+
+    ``tomar`` y ``liberar`` no ceden el bucle de eventos, así que comprobar
+    si queda un cupo y ocuparlo es una sola operación.
+    """
+
+    def __init__(self, maximo: int) -> None:
+        """Inicializa los cupos, todos libres."""
+        self.maximo = maximo
+        self.en_uso = 0
+
+    def tomar(self) -> bool:
+        """Ocupa un cupo; False si no queda ninguno."""
+        if self.en_uso >= self.maximo:
+            return False
+        self.en_uso += 1
+        return True
+
+    def liberar(self) -> None:
+        """Devuelve un cupo ocupado con ``tomar``."""
+        self.en_uso -= 1
+
+
+class RespuestaExportacion(StreamingResponse):
+    """``StreamingResponse`` que devuelve el cupo de la exportación al terminar.
+
+    El cupo se libera al salir de la respuesta por cualquier vía: fin normal,
+    error o desconexión del cliente, incluso si esta ocurre antes de empezar
+    a transmitir y el generador del cuerpo nunca llega a ejecutarse.
+    """
+
+    def __init__(
+        self,
+        contenido: AsyncIterator[bytes],
+        cupos: CuposExportacion,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> None:
+        """Inicializa la respuesta con un cupo ya tomado de ``cupos``."""
+        super().__init__(contenido, **kwargs)
+        self.cupos = cupos
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Transmitir la respuesta y liberar el cupo pase lo que pase."""
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.cupos.liberar()
@@ -0,0 +1,162 @@
+import asyncio
+import contextlib
+import socket
+import time
+import urllib.parse
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from functools import lru_cache
+
+from app.database import DatabaseConfig, get_database_config
+from tools.config import get_settings
+from tools.logger import Logger
+
+# Configurar logging
+logger = Logger(__name__)
+
+
+@dataclass
+class EstadoComponente:
+    """Resultado del último chequeo de un componente."""
+
+    ok: bool = False
+    latencia_ms: float | None = None
+    detalle: str | None = None
+
+
+@dataclass
+class EstadoSalud:
+    """Instantánea del estado de salud cacheada por el monitor."""
+
+    database: EstadoComponente = field(default_factory=EstadoComponente)
+    sis: EstadoComponente = field(default_factory=EstadoComponente)
+    checked_at: datetime | None = None
+
+    def to_dict(self) -> dict:
+        """Representación serializable del estado."""
+        data = asdict(self)
+        data["checked_at"] = self.checked_at.isoformat() if self.checked_at else None
+        return data
+
+
+class HealthMonitor:
+    """Monitor de salud en segundo plano.
+
+    Ejecuta los chequeos (ping a PostgreSQL y alcance TCP del SIS) cada
+    ``interval`` segundos y guarda el resultado, de modo que los *probes*
+    solo leen la instantánea en memoria sin hacer I/O.
+    """
+
+    def __init__(
+        self,
+        db_config: DatabaseConfig,
+        soap_url: str | None,
+        interval: float = 10.0,
+        timeout: float = 2.0,
+    ) -> None:
+        """Inicializa el monitor."""
+        self.db_config = db_config
+        self.soap_url = soap_url
+        self.interval = interval
+        self.timeout = timeout
+        self.estado = EstadoSalud()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def is_ready(self) -> bool:
+        """Indica si la instancia puede recibir tráfico.
+
+        Solo depende de la base de datos: con el SIS caído todavía se
+        atienden las consultas servidas desde caché. Una instantánea más
+        antigua que tres intervalos se considera no confiable.
+        """
+        if self.estado.checked_at is None:
+            return False
+        antiguedad = (datetime.now(UTC) - self.estado.checked_at).total_seconds()
+        return self.estado.database.ok and antiguedad <= self.interval * 3
+
+    async def start(self) -> None:
+        """Lanza el ciclo periódico sin esperar el primer chequeo.
+
+        El arranque no se bloquea por una base de datos o un SIS lentos: hasta
+        que termina el primer chequeo la instancia simplemente no está lista.
+        """
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="health-monitor")
+
+    async def stop(self) -> None:
+        """Detiene el ciclo periódico."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        """Ciclo periódico de chequeos."""
+        while True:
+            try:
+                await self.check()
+            except Exception:
+                logger.exception("Error inesperado en el monitor de salud")
+            await asyncio.sleep(self.interval)
+
+    async def check(self) -> EstadoSalud:
+        """Ejecuta todos los chequeos en paralelo y actualiza la instantánea."""
+        database, sis = await asyncio.gather(
+            self._medir(self.db_config.ping),
+            self._medir(self._sis_alcanzable),
+        )
+        anterior = self.estado
+        self.estado = EstadoSalud(
+            database=database, sis=sis, checked_at=datetime.now(UTC)
+        )
+        # Solo se registran los cambios de estado para no generar ruido en logs
+        if anterior.database.ok != database.ok:
+            logger.warning("Base de datos disponible: %s", database.ok)
+        if anterior.sis.ok != sis.ok:
+            logger.warning("Servicio SIS alcanzable: %s", sis.ok)
+        return self.estado
+
+    async def _medir(self, chequeo: Callable[[], bool]) -> EstadoComponente:
+        """Ejecuta un chequeo bloqueante en un hilo con límite de tiempo."""
+        inicio = time.perf_counter()
+        try:
+            ok = await asyncio.wait_for(
+                asyncio.to_thread(chequeo), timeout=self.timeout
+            )
+        except TimeoutError:
+            return EstadoComponente(ok=False, detalle="timeout")
+        except Exception as e:
+            return EstadoComponente(ok=False, detalle=str(e))
+        latencia = round((time.perf_counter() - inicio) * 1_000, 2)
+        return EstadoComponente(ok=ok, latencia_ms=latencia)
+
+    def _sis_alcanzable(self) -> bool:
+        """Verifica que el host del SIS acepte conexiones TCP.
+
+        Es más barato que descargar el WSDL o invocar ``GetSession``.
+        """
+        if not self.soap_url:
+            return False
+        url = urllib.parse.urlsplit(self.soap_url)
+        if not url.hostname:
+            return False
+        port = url.port or (443 if url.scheme == "https" else 80)
+        with socket.create_connection((url.hostname, port), timeout=self.timeout):
+            return True
+
+
+@lru_cache(maxsize=1)
+def get_health_monitor() -> HealthMonitor:
+    """Obtener instancia singleton del monitor de salud."""
+    settings = get_settings()
+    return HealthMonitor(
+        db_config=get_database_config(),
+        soap_url=settings.soap_sis,
+        interval=settings.health_check_interval,
+        timeout=settings.health_check_timeout,
+    )
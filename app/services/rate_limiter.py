@@ -0,0 +1,208 @@
+import asyncio
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Protocol
+
+from sqlalchemy.engine import Engine
+from sqlmodel import text
+
+from app.database import get_engine
+from tools.config import get_settings
+from tools.logger import Logger
+
+# Configurar logging
+logger = Logger(__name__)
+
+
+class Bucket(Protocol):
+    """Interfaz común de los token buckets."""
+
+    async def acquire(self) -> None:
+        """Espera hasta obtener un token."""
+        ...
+
+
+class TokenBucket:
+    """Token bucket en memoria del proceso.
+
+    Repone ``rate`` tokens por segundo hasta un máximo de ``burst``.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """Inicializa el bucket lleno."""
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.actualizado = time.monotonic()
+
+    def try_acquire(self) -> float:
+        """Intenta tomar un token sin esperar.
+
+        Returns:
+            float: 0 si se obtuvo el token, o los segundos a esperar
+
+        """
+        ahora = time.monotonic()
+        self.tokens = min(
+            self.burst, self.tokens + (ahora - self.actualizado) * self.rate
+        )
+        self.actualizado = ahora
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self) -> None:
+        """Espera hasta obtener un token."""
+        while True:
+            espera = self.try_acquire()
+            if espera <= 0:
+                return
+            await asyncio.sleep(espera)
+
+
+class PostgresTokenBucket:
+    """Token bucket compartido entre réplicas, persistido en PostgreSQL.
+
+    La reposición y el consumo se hacen en una única sentencia atómica sobre
+    la fila ``nombre`` de la tabla ``sis_rate_limit``.
+    """
+
+    _ACQUIRE = text(
+        """
+        INSERT INTO sis_rate_limit (nombre, tokens, actualizado)
+        VALUES (:nombre, :burst - 1, clock_timestamp())
+        ON CONFLICT (nombre) DO UPDATE SET
+            tokens = LEAST(
+                :burst,
+                sis_rate_limit.tokens + :rate * EXTRACT(
+                    EPOCH FROM clock_timestamp() - sis_rate_limit.actualizado
+                )
+            ) - 1,
+            actualizado = clock_timestamp()
+        WHERE LEAST(
+            :burst,
+            sis_rate_limit.tokens + :rate * EXTRACT(
+                EPOCH FROM clock_timestamp() - sis_rate_limit.actualizado
+            )
+        ) >= 1
+        RETURNING tokens
+        """
+    )
+
+    def __init__(self, engine: Engine, nombre: str, rate: float, burst: int) -> None:
+        """Inicializa el bucket compartido."""
+        self.engine = engine
+        self.nombre = nombre
+        self.rate = rate
+        self.burst = burst
+
+    def try_acquire(self) -> float:
+        """Intenta tomar un token sin esperar.
+
+        Returns:
+            float: 0 si se obtuvo el token, o los segundos a esperar
+
+        """
+        with self.engine.begin() as connection:
+            fila = connection.execute(
+                self._ACQUIRE,
+                {"nombre": self.nombre, "rate": self.rate, "burst": self.burst},
+            ).first()
+        return 0.0 if fila is not None else 1 / self.rate
+
+    async def acquire(self) -> None:
+        """Espera hasta obtener un token.
+
+        Si la base de datos no responde se deja pasar la llamada: el límite
+        no debe convertirse en un punto de falla de las consultas.
+        """
+        while True:
+            try:
+                espera = await asyncio.to_thread(self.try_acquire)
+            except Exception:
+                logger.warning("Rate limit compartido no disponible", exc_info=True)
+                return
+            if espera <= 0:
+                return
+            await asyncio.sleep(espera)
+
+
+class FairQueue:
+    """Cola equitativa delante de un token bucket.
+
+    Cada clave (el ``usuario`` de la consulta) tiene su propia cola y los
+    tokens se reparten por turnos entre las claves con peticiones pendientes,
+    de modo que un lote grande de un solo usuario no acapara la capacidad.
+    """
+
+    def __init__(self, bucket: Bucket) -> None:
+        """Inicializa la cola."""
+        self.bucket = bucket
+        self._colas: dict[str, deque[asyncio.Future[None]]] = {}
+        self._turnos: deque[str] = deque()
+        self._dispatcher: asyncio.Task | None = None
+
+    @property
+    def pendientes(self) -> int:
+        """Cantidad de peticiones esperando un token."""
+        return sum(len(cola) for cola in self._colas.values())
+
+    async def acquire(self, clave: str) -> None:
+        """Espera el turno de ``clave`` y un token del bucket."""
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        cola = self._colas.get(clave)
+        if cola is None:
+            cola = self._colas[clave] = deque()
+            self._turnos.append(clave)
+        cola.append(future)
+
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._despachar())
+        await future
+
+    async def _despachar(self) -> None:
+        """Entrega cada token a la siguiente clave en la rotación."""
+        while self._turnos:
+            await self.bucket.acquire()
+            while self._turnos:
+                clave = self._turnos.popleft()
+                cola = self._colas[clave]
+                future = cola.popleft()
+                if cola:
+                    self._turnos.append(clave)
+                else:
+                    del self._colas[clave]
+                # Las peticiones canceladas ceden el token a la siguiente
+                if not future.done():
+                    future.set_result(None)
+                    break
+
+
+def crear_rate_limiter(usuario: str) -> FairQueue:
+    """Crea la cola equitativa con el presupuesto de una credencial del SIS.
+
+    ``SIS_RATE_LIMIT_BACKEND`` elige entre ``memory`` (por proceso) y
+    ``postgres`` (compartido entre réplicas por credencial).
+    """
+    settings = get_settings()
+    rate = settings.sis_rate_limit
+    burst = settings.sis_rate_burst
+
+    bucket: Bucket
+    if settings.sis_rate_limit_backend == "postgres":
+        bucket = PostgresTokenBucket(get_engine(), f"sis:{usuario}", rate, burst)
+    else:
+        bucket = TokenBucket(rate, burst)
+    return FairQueue(bucket)
+
+
+@lru_cache(maxsize=1)
+def get_sis_rate_limiter() -> FairQueue:
+    """Obtener la cola equitativa singleton de ``SOAP_USER``.
+
+    La usan las llamadas con credenciales del cliente (``/login``); las
+    consultas del servicio usan la cola de cada credencial del pool.
+    """
+    return crear_rate_limiter(get_settings().soap_user)
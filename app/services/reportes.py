@@ -0,0 +1,124 @@
+"""Reportes de uso armados con los resúmenes diarios de ``consulta``.
+
+Los resúmenes (``consulta_uso_diario`` y ``consulta_error_diario``) se
+actualizan por tramos de ``id`` a partir del avance guardado en
+``reporte_avance``: cada actualización suma solo las consultas nuevas, y los
+reportes leen solo los resúmenes, con un costo proporcional a los días y
+usuarios del periodo y no a las consultas registradas.
+"""
+
+from datetime import UTC, date, datetime, timedelta
+
+from sqlmodel import Session
+
+from app.database import get_database_config
+from app.models.reporte import ErrorFrecuente, ReporteUso, UsoDiario, UsoUsuario
+from app.repositories.reporte_repository import ReporteRepository
+from tools.config import get_settings
+from tools.logger import Logger
+
+# Configurar logging
+logger = Logger(__name__)
+
+
+def _tasa(parte: int, total: int) -> float:
+    return round(parte / total, 4) if total else 0.0
+
+
+def actualizar_tramo(session: Session, lote: int, margen: float) -> int:
+    """Suma a los resúmenes el siguiente tramo de consultas.
+
+    El tramo y el nuevo avance se confirman en la misma transacción, así que
+    una falla no deja consultas contadas dos veces ni sin contar.
+
+    Args:
+        session: Sesión del primario; la transacción la confirma el llamador
+        lote: Máximo de consultas del tramo
+        margen: Segundos de antigüedad mínima de las consultas que se suman
+
+    Returns:
+        Cuánto avanzó el ``id`` (0 si no había consultas nuevas)
+
+    """
+    repository = ReporteRepository(session)
+    avance = repository.bloquear_avance()
+    corte = datetime.now() - timedelta(seconds=margen)  # noqa: DTZ005
+    desde_id = avance.ultimo_id
+    avance.updated_at = datetime.now(UTC)
+    hasta_id = repository.siguiente_tramo(desde_id, lote, corte)
+    if hasta_id is None:
+        return 0
+    repository.acumular(desde_id, hasta_id)
+    avance.ultimo_id = hasta_id
+    return hasta_id - desde_id
+
+
+def actualizar_resumenes() -> int:
+    """Suma las consultas nuevas, un tramo por transacción, hasta ponerse al día.
+
+    Returns:
+        Cuánto avanzó el ``id`` en total
+
+    """
+    settings = get_settings()
+    db_config = get_database_config()
+    total = 0
+    while True:
+        with db_config.get_session_context() as session:
+            avanzado = actualizar_tramo(
+                session, settings.reportes_batch_size, settings.reportes_margen
+            )
+        if not avanzado:
+            break
+        total += avanzado
+    if total:
+        logger.info("Resúmenes de consultas actualizados (+%d ids)", total)
+    return total
+
+
+def armar_reporte(
+    session: Session, desde: date, hasta: date, usuario: str | None = None
+) -> ReporteUso:
+    """Arma el reporte de uso de ``[desde, hasta]`` leyendo solo los resúmenes."""
+    repository = ReporteRepository(session)
+    dias = [
+        UsoDiario(
+            dia=dia,
+            total=total,
+            locales=locales,
+            errores=errores,
+            tasa_cache=_tasa(locales, total),
+            tasa_error=_tasa(errores, total),
+        )
+        for dia, total, locales, errores in repository.uso_por_dia(
+            desde, hasta, usuario
+        )
+    ]
+    usuarios = [
+        UsoUsuario(
+            usuario=nombre,
+            total=total,
+            locales=locales,
+            errores=errores,
+            tasa_cache=_tasa(locales, total),
+            tasa_error=_tasa(errores, total),
+        )
+        for nombre, total, locales, errores in repository.uso_por_usuario(
+            desde, hasta, usuario
+        )
+    ]
+    total_periodo = sum(d.total for d in dias)
+    errores = [
+        ErrorFrecuente(
+            error_code=error_code, total=total, tasa=_tasa(total, total_periodo)
+        )
+        for error_code, total in repository.errores(desde, hasta, usuario)
+    ]
+    return ReporteUso(
+        desde=desde,
+        hasta=hasta,
+        actualizado_at=repository.actualizado_at(),
+        dias=dias,
+        usuarios=usuarios,
+        errores=errores,
+    )
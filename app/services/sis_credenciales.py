@@ -0,0 +1,142 @@
+import asyncio
+import itertools
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+from pydantic import SecretStr
+
+from tools.config import get_settings
+from tools.logger import Logger
+
+from .rate_limiter import FairQueue, crear_rate_limiter
+
+# Configurar logging
+logger = Logger(__name__)
+
+
+@dataclass
+class Credencial:
+    """Credencial del SIS con su token, su estado y su presupuesto de tráfico."""
+
+    usuario: str
+    clave: SecretStr
+    cola: FairQueue
+    token: str | None = None
+    token_expira: float = 0.0
+    # Llamadas en curso o esperando turno con esta credencial
+    en_curso: int = 0
+    fallos: int = 0
+    suspendida_hasta: float = 0.0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+    def suspendida(self, ahora: float) -> bool:
+        """Indica si la credencial está fuera del pool."""
+        return ahora < self.suspendida_hasta
+
+    def token_vigente(self, ahora: float) -> str | None:
+        """Token en caché si todavía no venció."""
+        return self.token if self.token and ahora < self.token_expira else None
+
+
+class PoolCredenciales:
+    """Reparte las consultas al SIS entre varias credenciales.
+
+    Cada credencial guarda su token de ``GetSession`` durante ``ttl_token``
+    segundos y tiene su propia cola de rate limit. Se elige siempre la de
+    menor carga (con turnos rotativos en los empates); una credencial que
+    devuelve ``INVALID_CREDENTIALS`` se suspende durante ``suspension``
+    segundos y luego se vuelve a probar.
+    """
+
+    def __init__(
+        self, credenciales: list[Credencial], ttl_token: float, suspension: float
+    ) -> None:
+        """Inicializa el pool."""
+        self.credenciales = credenciales
+        self.ttl_token = ttl_token
+        self.suspension = suspension
+        self._turno = itertools.count()
+
+    def elegir(
+        self, excluir: set[str] | frozenset[str] = frozenset()
+    ) -> Credencial | None:
+        """Credencial disponible con menor carga, o None si no queda ninguna."""
+        ahora = time.monotonic()
+        disponibles = [
+            credencial
+            for credencial in self.credenciales
+            if not credencial.suspendida(ahora) and credencial.usuario not in excluir
+        ]
+        if not disponibles:
+            return None
+        inicio = next(self._turno) % len(disponibles)
+        rotadas = disponibles[inicio:] + disponibles[:inicio]
+        return min(rotadas, key=lambda c: (c.en_curso, c.fallos))
+
+    @asynccontextmanager
+    async def reservar(self, credencial: Credencial) -> AsyncIterator[Credencial]:
+        """Cuenta la llamada en la carga de la credencial mientras dura."""
+        credencial.en_curso += 1
+        try:
+            yield credencial
+        finally:
+            credencial.en_curso -= 1
+
+    def guardar_token(self, credencial: Credencial, token: str) -> None:
+        """Guarda el token y marca la credencial como sana."""
+        credencial.token = token
+        credencial.token_expira = time.monotonic() + self.ttl_token
+        credencial.fallos = 0
+        credencial.suspendida_hasta = 0.0
+
+    def invalidar_token(self, credencial: Credencial) -> None:
+        """Descarta el token para pedir una sesión nueva en la siguiente llamada."""
+        credencial.token = None
+        credencial.fallos += 1
+
+    def suspender(self, credencial: Credencial) -> None:
+        """Saca la credencial del pool hasta que termine la suspensión."""
+        credencial.token = None
+        credencial.suspendida_hasta = time.monotonic() + self.suspension
+        logger.warning(
+            "Credencial SIS %s suspendida por %ss: credenciales inválidas",
+            credencial.usuario,
+            self.suspension,
+        )
+
+    def estado(self) -> list[dict[str, Any]]:
+        """Estado de cada credencial para ``/metrics`` (sin secretos)."""
+        ahora = time.monotonic()
+        return [
+            {
+                "usuario": credencial.usuario,
+                "en_curso": credencial.en_curso,
+                "pendientes": credencial.cola.pendientes,
+                "fallos": credencial.fallos,
+                "token_en_cache": credencial.token_vigente(ahora) is not None,
+                "suspendida_s": round(max(0.0, credencial.suspendida_hasta - ahora)),
+            }
+            for credencial in self.credenciales
+        ]
+
+
+@lru_cache(maxsize=1)
+def get_pool_credenciales() -> PoolCredenciales:
+    """Obtener el pool singleton de credenciales del SIS.
+
+    Se configura con ``SOAP_CREDENTIALS`` (``usuario:clave,...``); sin ese
+    valor el pool tiene solo ``SOAP_USER``/``SOAP_PASSWORD``.
+    """
+    settings = get_settings()
+    return PoolCredenciales(
+        [
+            Credencial(usuario=usuario, clave=clave, cola=crear_rate_limiter(usuario))
+            for usuario, clave in settings.sis_credentials.items()
+        ],
+        ttl_token=settings.sis_session_ttl,
+        suspension=settings.sis_credential_cooldown,
+    )
@@ -1,27 +1,77 @@
-import os
-from functools import lru_cache
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, Any
 
 from api_exception import APIException, BaseExceptionCode
 from fastapi import status
 from result import Err, Ok, Result
-from zeep import Client
-from zeep.exceptions import Fault
-from zeep.helpers import serialize_object
 
 from app.api.exceptions import CustomExceptionCode
 from app.api.requests import ConsultaAfiliadoRequest, CredencialesRequest
-from app.models.afiliado import Afiliado
+from app.deadline import LatenciaEWMA, PlazoInsuficienteError, restante
+from app.models.afiliado import AfiliadoPublico
+from tools.config import get_settings
 from tools.logger import Logger
 
+from .rate_limiter import FairQueue, get_sis_rate_limiter
+from .sis_credenciales import Credencial, get_pool_credenciales
+
+# zeep (y con él lxml y requests) se importa recién al crear el cliente SOAP
+# para no alargar el arranque de la aplicación
+if TYPE_CHECKING:
+    from zeep import Client
+    from zeep.transports import Transport
+
 # Configurar logging
 logger = Logger(__name__)
 
+# Clave de la cola equitativa para los GetSession: no se comparte con las
+# claves de las consultas (el ``usuario`` de cada una), así que un login no
+# toma ni roba el turno de un usuario real
+CLAVE_SESION = "__sesion__"
+
+
+def get_soap_transport() -> "Transport | None":
+    """Transporte SOAP según ``SIS_TRANSPORT_MODE``.
+
+    - ``live`` (por defecto): transporte estándar de zeep.
+    - ``record``: consulta al SIS y graba el tráfico anonimizado en
+      ``SIS_TRAFFIC_FILE``.
+    - ``replay``: responde con el tráfico grabado en ``SIS_TRAFFIC_FILE``, sin
+      red, a la velocidad ``SIS_REPLAY_SPEED`` (1 = la grabada, 0 = sin esperas).
+
+    Las operaciones contra el SIS real se cortan a los
+    ``SIS_OPERATION_TIMEOUT`` segundos.
+    """
+    from zeep.transports import Transport
+
+    from .sis_transport import RecordingTransport, ReplayTransport
+
+    settings = get_settings()
+    modo = settings.sis_transport_mode
+    archivo = settings.sis_traffic_file
+    if modo == "record":
+        logger.warning("Grabando tráfico del SIS en %s", archivo)
+        return RecordingTransport(
+            archivo, operation_timeout=settings.sis_operation_timeout
+        )
+    if modo == "replay":
+        logger.warning("Reproduciendo tráfico del SIS desde %s", archivo)
+        return ReplayTransport(archivo, velocidad=settings.sis_replay_speed)
+    return Transport(operation_timeout=settings.sis_operation_timeout)
+
 
 @lru_cache
-def get_soap_client() -> Client:
+def get_soap_client() -> "Client":
     """Crear cliente SOAP singleton para reutilizar la conexión."""
+    from zeep import Client
+
     try:
-        return Client(os.getenv("SOAP_SIS"))
+        return Client(get_settings().soap_sis, transport=get_soap_transport())
     except Exception as e:
         raise APIException(
             error_code=CustomExceptionCode.DISCONECTED_SIS_SERVICE,
@@ -30,22 +80,98 @@ def get_soap_client() -> Client:
         ) from e
 
 
+@lru_cache(maxsize=1)
+def get_soap_executor() -> ThreadPoolExecutor:
+    """Hilos para las llamadas SOAP, que son bloqueantes en zeep.
+
+    ``SIS_MAX_CONCURRENCY`` acota las llamadas simultáneas al SIS por proceso;
+    el event loop sigue atendiendo otras solicitudes mientras tanto.
+    """
+    return ThreadPoolExecutor(
+        max_workers=get_settings().sis_max_concurrency,
+        thread_name_prefix="sis-soap",
+    )
+
+
+@lru_cache(maxsize=1)
+def get_latencias_sis() -> dict[str, LatenciaEWMA]:
+    """Latencia típica de cada operación del SIS en este proceso."""
+    return {
+        "GetSession": LatenciaEWMA(),
+        "ConsultarAfiliadoFuaE": LatenciaEWMA(),
+    }
+
+
+def reiniciar_conexiones_soap() -> None:
+    """Cierra en un proceso hijo las conexiones HTTP heredadas del cliente SOAP.
+
+    El WSDL ya parseado se conserva; la sesión de ``requests`` vuelve a abrir
+    conexiones propias en la siguiente operación.
+    """
+    if get_soap_client.cache_info().currsize:
+        get_soap_client().transport.session.close()
+
+
 class SISService:
     """Clase para interactuar con el servicio SIS."""
 
     def __init__(self) -> None:
         """."""
         self.client = get_soap_client()
-        self._session_token = None
-        self._session_expires = None
+        self.rate_limiter = get_sis_rate_limiter()
+        self.credenciales = get_pool_credenciales()
+        self.latencias = get_latencias_sis()
+
+    async def _invocar(self, operacion: str, **kwargs: Any) -> Any:  # noqa: ANN401
+        """Ejecuta una operación SOAP en un hilo, dentro del plazo de la solicitud.
+
+        Si el tiempo restante no cubre la latencia típica de la operación no
+        se llama al SIS (``PlazoInsuficienteError``); si el plazo vence durante
+        la llamada se deja de esperarla (``TimeoutError``). La latencia se
+        mide aunque la solicitud ya no espere la respuesta.
+
+        Raises:
+            PlazoInsuficienteError: El plazo no alcanza para la operación
+            TimeoutError: El plazo venció durante la llamada
+
+        """
+        latencia = self.latencias[operacion]
+        disponible = restante()
+        if not latencia.alcanza(disponible):
+            message = f"Plazo insuficiente para {operacion}"
+            raise PlazoInsuficienteError(message)
+
+        inicio = time.perf_counter()
+
+        def registrar(llamada: asyncio.Future) -> None:
+            latencia.registrar(time.perf_counter() - inicio)
+            # Evita el aviso de excepción no recuperada si nadie la esperó
+            if not llamada.cancelled():
+                llamada.exception()
+
+        metodo = getattr(self.client.service, operacion)
+        llamada = asyncio.get_running_loop().run_in_executor(
+            get_soap_executor(), partial(metodo, **kwargs)
+        )
+        llamada.add_done_callback(registrar)
+        return await asyncio.wait_for(asyncio.shield(llamada), timeout=disponible)
+
+    async def _esperar_turno(self, cola: FairQueue, clave: str) -> None:
+        """Espera el rate limit sin exceder el plazo de la solicitud."""
+        await asyncio.wait_for(cola.acquire(clave), timeout=restante())
 
     async def get_session(
-        self, request: CredencialesRequest
+        self, request: CredencialesRequest, cola: FairQueue | None = None
     ) -> Result[str, tuple[BaseExceptionCode, int]]:
-        """Obtener token de sesión del SIS."""
+        """Obtener token de sesión del SIS.
+
+        ``cola`` es el rate limit de la credencial; por defecto se usa el de
+        ``SOAP_USER``.
+        """
         try:
-            response: str = self.client.service.GetSession(
-                strUsuario=request.usuario, strClave=request.clave
+            await self._esperar_turno(cola or self.rate_limiter, CLAVE_SESION)
+            response: str = await self._invocar(
+                "GetSession", strUsuario=request.usuario, strClave=request.clave
             )
             # TODO(davidreygu): Falta validar mas errores. Ver ticket #1
             error_messages = ["INVALIDO", "INCORRECTA"]
@@ -58,7 +184,6 @@ class SISService:
                 )
 
             if any(msg in response for msg in error_messages):
-                self._session_token = None
                 logger.info("Credenciales inválidas")
                 return Err(
                     (
@@ -69,6 +194,11 @@ class SISService:
 
             return Ok(response)
 
+        except (PlazoInsuficienteError, TimeoutError):
+            logger.warning("Plazo agotado antes de obtener la sesión del SIS")
+            return Err(
+                (CustomExceptionCode.DEADLINE_EXCEEDED, status.HTTP_504_GATEWAY_TIMEOUT)
+            )
         except Exception:
             logger.exception("Error en GetSession")
             return Err(
@@ -78,13 +208,118 @@ class SISService:
                 )
             )
 
+    async def get_service_session(self) -> Result[str, tuple[BaseExceptionCode, int]]:
+        """Obtener token de sesión de la credencial del pool con menor carga."""
+        async with self._sesion() as sesion:
+            match sesion:
+                case Ok((_, token)):
+                    return Ok(token)
+                case Err(error):
+                    return Err(error)
+
+    async def consultar_afiliado(
+        self, consulta: ConsultaAfiliadoRequest
+    ) -> Result[AfiliadoPublico, tuple[BaseExceptionCode, int, str | None]]:
+        """Consultar afiliado con una credencial del pool.
+
+        Usa el token en caché de la credencial con menor carga (``GetSession``
+        solo se invoca cuando no hay token vigente) y su propio rate limit.
+        """
+        async with self._sesion() as sesion:
+            match sesion:
+                case Ok((credencial, token)):
+                    resultado = await self.consultar_afiliado_fuae(
+                        token, consulta, cola=credencial.cola
+                    )
+                case Err((error_code, status_code)):
+                    return Err((error_code, status_code, None))
+        # Ante fallas del SIS se pide una sesión nueva por si el token expiró;
+        # un plazo agotado es del cliente, no de la credencial
+        match resultado:
+            case Err((CustomExceptionCode.DEADLINE_EXCEEDED, _, _)):
+                pass
+            case Err((_, status_code, _)) if (
+                status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR
+            ):
+                self.credenciales.invalidar_token(credencial)
+        return resultado
+
+    @asynccontextmanager
+    async def _sesion(
+        self,
+    ) -> AsyncIterator[Result[tuple[Credencial, str], tuple[BaseExceptionCode, int]]]:
+        """Elige una credencial y obtiene su token, salteando las inválidas.
+
+        La credencial queda reservada desde que se elige, antes de esperar su
+        ``GetSession``, y hasta salir del contexto: así las consultas que
+        esperan sesión cuentan en su carga y una ráfaga en frío se reparte
+        entre las credenciales.
+        """
+        descartadas: set[str] = set()
+        while (credencial := self.credenciales.elegir(descartadas)) is not None:
+            async with self.credenciales.reservar(credencial):
+                match await self._token(credencial):
+                    case Ok(token):
+                        yield Ok((credencial, token))
+                        return
+                    case Err((CustomExceptionCode.INVALID_CREDENTIALS, _)):
+                        descartadas.add(credencial.usuario)
+                    case Err(error):
+                        yield Err(error)
+                        return
+        logger.error("No hay credenciales SIS disponibles")
+        yield Err(
+            (
+                CustomExceptionCode.INVALID_CREDENTIALS,
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        )
+
+    async def _token(
+        self, credencial: Credencial
+    ) -> Result[str, tuple[BaseExceptionCode, int]]:
+        """Token vigente de la credencial, pidiendo una sesión si hace falta."""
+        # Un solo GetSession por credencial aunque lleguen consultas en paralelo
+        async with credencial.lock:
+            token = credencial.token_vigente(time.monotonic())
+            if token is not None:
+                return Ok(token)
+
+            resultado = await self.get_session(
+                CredencialesRequest(
+                    usuario=credencial.usuario,
+                    clave=credencial.clave.get_secret_value(),
+                ),
+                cola=credencial.cola,
+            )
+            match resultado:
+                case Ok(token):
+                    self.credenciales.guardar_token(credencial, token)
+                case Err((CustomExceptionCode.INVALID_CREDENTIALS, _)):
+                    self.credenciales.suspender(credencial)
+                case Err((CustomExceptionCode.DEADLINE_EXCEEDED, _)):
+                    pass
+                case Err(_):
+                    self.credenciales.invalidar_token(credencial)
+            return resultado
+
     async def consultar_afiliado_fuae(
-        self, autorizacion: str, consulta: ConsultaAfiliadoRequest
-    ) -> Result[Afiliado, tuple[BaseExceptionCode, int, str | None]]:
-        """Consultar afiliado FuaE."""
+        self,
+        autorizacion: str,
+        consulta: ConsultaAfiliadoRequest,
+        cola: FairQueue | None = None,
+    ) -> Result[AfiliadoPublico, tuple[BaseExceptionCode, int, str | None]]:
+        """Consultar afiliado FuaE con un token ya obtenido."""
+        from zeep.exceptions import Fault
+        from zeep.helpers import serialize_object
+
         try:
+            # Respetar el límite de tráfico saliente, con turnos por usuario
+            await self._esperar_turno(cola or self.rate_limiter, consulta.usuario)
+
             # Realizar la consulta
-            response = self.client.service.ConsultarAfiliadoFuaE(
+            response = await self._invocar(
+                "ConsultarAfiliadoFuaE",
                 intOpcion=consulta.opcion,
                 strAutorizacion=autorizacion,
                 strDni=consulta.dni,
@@ -95,12 +330,17 @@ class SISService:
                 strNroContrato=consulta.nro_contrato,
                 strCorrelativo=consulta.correlativo,
             )
-            response_data = Afiliado(**serialize_object(response))
-            # Convertir respuesta a modelo Pydantic
+            # Convertir respuesta a modelo tipado (fechas, códigos acotados)
+            response_data = AfiliadoPublico.desde_sis(serialize_object(response))
             if response_data.IdError != "0":
+                # Documento inexistente o inválido: error determinista que
+                # admite caché negativa, a diferencia de los demás IdError
+                no_encontrado = get_settings().sis_id_errores_no_encontrado
                 return Err(
                     (
-                        CustomExceptionCode.BAD_RESPONSE,
+                        CustomExceptionCode.AFILIADO_NO_ENCONTRADO
+                        if response_data.IdError in no_encontrado
+                        else CustomExceptionCode.BAD_RESPONSE,
                         status.HTTP_422_UNPROCESSABLE_ENTITY,
                         response_data.Resultado,
                     )
@@ -108,6 +348,22 @@ class SISService:
 
             return Ok(response_data)
 
+        except PlazoInsuficienteError as e:
+            return Err(
+                (
+                    CustomExceptionCode.DEADLINE_EXCEEDED,
+                    status.HTTP_504_GATEWAY_TIMEOUT,
+                    str(e),
+                )
+            )
+        except TimeoutError:
+            return Err(
+                (
+                    CustomExceptionCode.DEADLINE_EXCEEDED,
+                    status.HTTP_504_GATEWAY_TIMEOUT,
+                    "Plazo agotado esperando al SIS",
+                )
+            )
         except Fault as fault:
             return Err(
                 (
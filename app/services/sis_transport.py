@@ -0,0 +1,236 @@
+import hashlib
+import json
+import re
+import secrets
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any
+
+import requests
+from zeep.transports import Transport
+
+from tools.logger import Logger
+
+# Configurar logging
+logger = Logger(__name__)
+
+# Elementos SOAP con datos personales o secretos que se anonimizan al grabar
+CAMPOS_SENSIBLES = (
+    "strUsuario",
+    "strClave",
+    "strAutorizacion",
+    "strDni",
+    "strNroDocumento",
+    "GetSessionResult",
+    "NroDocumento",
+    "ApePaterno",
+    "ApeMaterno",
+    "Nombres",
+    "FecNacimiento",
+    "Contrato",
+    "NroContrato",
+    "IdNumReg",
+    "MsgConfidencial",
+)
+
+_PATRON_SENSIBLE = re.compile(
+    r"<((?:\w+:)?(" + "|".join(CAMPOS_SENSIBLES) + r"))(\s[^>]*)?>([^<]*)</\1>"
+)
+# Mensajes de error del SIS que no son datos personales y se conservan
+_MENSAJES_SIS = re.compile(r"INVALID|INCORRECT", re.IGNORECASE)
+_PATRON_DOCUMENTO = re.compile(r"<((?:\w+:)?strNroDocumento)(?:\s[^>]*)?>([^<]*)</\1>")
+_PATRON_TIPO = re.compile(r"<((?:\w+:)?strTipoDocumento)(?:\s[^>]*)?>([^<]*)</\1>")
+
+
+def _operacion(headers: dict[str, str], message: bytes | str) -> str:
+    """Nombre de la operación SOAP a partir de ``SOAPAction`` o del cuerpo."""
+    accion = headers.get("SOAPAction", "").strip('"')
+    if accion:
+        return accion.rstrip("/").rsplit("/", 1)[-1]
+    texto = message.decode() if isinstance(message, bytes) else message
+    encontrado = re.search(r"<(?:\w+:)?Body[^>]*>\s*<(?:\w+:)?(\w+)", texto)
+    return encontrado.group(1) if encontrado else "desconocida"
+
+
+class Anonimizador:
+    """Reemplaza datos sensibles por seudónimos deterministas.
+
+    El mismo valor produce el mismo seudónimo durante una grabación (se
+    conservan las repeticiones del tráfico), pero la sal es aleatoria y no se
+    guarda, así que los valores originales no se pueden recuperar.
+    """
+
+    def __init__(self, sal: bytes | None = None) -> None:
+        """Inicializa el anonimizador con una sal propia."""
+        self.sal = sal or secrets.token_bytes(16)
+
+    def seudonimo(self, valor: str) -> str:
+        """Seudónimo del mismo largo; los dígitos siguen siendo dígitos."""
+        resumen = hashlib.sha256(self.sal + valor.encode()).hexdigest()
+        digitos = str(int(resumen, 16))
+        return "".join(
+            digitos[i % len(digitos)]
+            if caracter.isdigit()
+            else resumen[i % len(resumen)].upper()
+            if caracter.isalpha()
+            else caracter
+            for i, caracter in enumerate(valor)
+        )
+
+    def anonimizar(self, xml: str) -> str:
+        """Anonimiza el contenido de los elementos sensibles de un sobre SOAP."""
+
+        def reemplazar(coincidencia: re.Match) -> str:
+            etiqueta, _, atributos, valor = coincidencia.groups()
+            if not valor.strip() or _MENSAJES_SIS.search(valor):
+                return coincidencia.group(0)
+            nuevo = self.seudonimo(valor)
+            return f"<{etiqueta}{atributos or ''}>{nuevo}</{etiqueta}>"
+
+        return _PATRON_SENSIBLE.sub(reemplazar, xml)
+
+
+class RecordingTransport(Transport):
+    """Transporte zeep que graba el tráfico del SIS en un archivo NDJSON.
+
+    Guarda los documentos WSDL/XSD descargados y, por cada operación, los
+    sobres de solicitud y respuesta anonimizados con su latencia y el
+    instante relativo al inicio de la grabación.
+    """
+
+    def __init__(self, archivo: Path, **kwargs: Any) -> None:  # noqa: ANN401
+        """Inicializa el transporte y abre el archivo en modo *append*."""
+        super().__init__(**kwargs)
+        self.archivo = Path(archivo)
+        self.anonimizador = Anonimizador()
+        self._inicio = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _escribir(self, registro: dict[str, Any]) -> None:
+        linea = json.dumps(registro, ensure_ascii=False)
+        with self._lock, self.archivo.open("a", encoding="utf-8") as archivo:
+            archivo.write(linea + "\n")
+
+    def _load_remote_data(self, url: str) -> bytes:
+        contenido = super()._load_remote_data(url)
+        self._escribir(
+            {"tipo": "documento", "url": url, "contenido": contenido.decode()}
+        )
+        return contenido
+
+    def post(
+        self, address: str, message: bytes | str, headers: dict[str, str]
+    ) -> requests.Response:
+        """Envía la operación y graba la solicitud y la respuesta."""
+        inicio = time.monotonic()
+        response = super().post(address, message, headers)
+        latencia = (time.monotonic() - inicio) * 1_000
+        solicitud = message.decode() if isinstance(message, bytes) else message
+        self._escribir(
+            {
+                "tipo": "operacion",
+                "operacion": _operacion(headers, message),
+                "offset_ms": round((inicio - self._inicio) * 1_000, 3),
+                "latencia_ms": round(latencia, 3),
+                "status": response.status_code,
+                "content_type": response.headers.get("Content-Type", "text/xml"),
+                "solicitud": self.anonimizador.anonimizar(solicitud),
+                "respuesta": self.anonimizador.anonimizar(
+                    response.content.decode(response.encoding or "utf-8")
+                ),
+            }
+        )
+        return response
+
+
+class ReplayTransport(Transport):
+    """Transporte zeep que responde con tráfico grabado, sin red.
+
+    Las respuestas de cada operación se sirven en el orden grabado (de forma
+    cíclica) tras esperar la latencia registrada dividida por ``velocidad``;
+    con ``velocidad=0`` se responde sin esperar. En ``ConsultarAfiliadoFuaE``
+    se restituye el documento consultado en la respuesta anonimizada para que
+    la caché local se comporte como con el SIS real.
+    """
+
+    def __init__(
+        self,
+        archivo: Path,
+        velocidad: float = 1.0,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> None:
+        """Carga la grabación."""
+        super().__init__(**kwargs)
+        self.velocidad = velocidad
+        self.documentos: dict[str, bytes] = {}
+        self.operaciones: dict[str, deque[dict[str, Any]]] = defaultdict(deque)
+        self._lock = threading.Lock()
+        with Path(archivo).open(encoding="utf-8") as lineas:
+            for linea in lineas:
+                if not linea.strip():
+                    continue
+                registro = json.loads(linea)
+                if registro["tipo"] == "documento":
+                    self.documentos[registro["url"]] = registro["contenido"].encode()
+                else:
+                    self.operaciones[registro["operacion"]].append(registro)
+        logger.info(
+            "Tráfico SIS cargado: %s",
+            {nombre: len(cola) for nombre, cola in self.operaciones.items()},
+        )
+
+    def _load_remote_data(self, url: str) -> bytes:
+        if url in self.documentos:
+            return self.documentos[url]
+        message = f"Documento no grabado: {url}"
+        raise requests.ConnectionError(message)
+
+    def _siguiente(self, operacion: str) -> dict[str, Any]:
+        with self._lock:
+            cola = self.operaciones.get(operacion)
+            if not cola:
+                message = f"Operación no grabada: {operacion}"
+                raise requests.ConnectionError(message)
+            registro = cola[0]
+            cola.rotate(-1)
+            return registro
+
+    def post(
+        self, address: str, message: bytes | str, headers: dict[str, str]
+    ) -> requests.Response:
+        """Devuelve la siguiente respuesta grabada para la operación."""
+        registro = self._siguiente(_operacion(headers, message))
+        if self.velocidad > 0:
+            time.sleep(registro["latencia_ms"] / 1_000 / self.velocidad)
+
+        contenido = registro["respuesta"]
+        if registro["operacion"] == "ConsultarAfiliadoFuaE":
+            contenido = self._restituir_documento(message, contenido)
+
+        response = requests.Response()
+        response.status_code = registro["status"]
+        response.headers["Content-Type"] = registro["content_type"]
+        response._content = contenido.encode()  # noqa: SLF001
+        response.encoding = "utf-8"
+        response.url = address
+        return response
+
+    @staticmethod
+    def _restituir_documento(message: bytes | str, respuesta: str) -> str:
+        """Coloca el tipo y número de documento de la solicitud en la respuesta."""
+        texto = message.decode() if isinstance(message, bytes) else message
+        for patron, campo in (
+            (_PATRON_DOCUMENTO, "NroDocumento"),
+            (_PATRON_TIPO, "TipoDocumento"),
+        ):
+            encontrado = patron.search(texto)
+            if encontrado:
+                valor = encontrado.group(2)
+                respuesta = re.sub(
+                    rf"(<(?:\w+:)?{campo}(?:\s[^>]*)?>)[^<]*(</(?:\w+:)?{campo}>)",
+                    lambda m, valor=valor: f"{m.group(1)}{valor}{m.group(2)}",
+                    respuesta,
+                )
+        return respuesta
@@ -0,0 +1,103 @@
+"""Presupuesto de arranque: tiempo de importación de ``app.main``.
+
+Importa el módulo en un proceso nuevo con ``python -X importtime`` (sin caché
+de módulos del proceso actual) y reporta el tiempo total y los módulos más
+costosos. Los tests aplican ``PRESUPUESTO_MS`` y ``MODULOS_DIFERIDOS``. Uso::
+
+    uv run python -m benchmarks.arranque --repeticiones 5 --top 15
+"""
+
+import os
+import re
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+from pydantic_settings import BaseSettings, CliApp, SettingsConfigDict
+
+# Tiempo máximo de importación de app.main, holgado para runners de CI lentos
+PRESUPUESTO_MS = 3_000
+
+# Módulos pesados que no deben cargarse al importar la aplicación: zeep (y
+# lxml) se importan al crear el cliente SOAP y google-cloud-logging solo con
+# LogType.GOOGLE_CLOUD
+MODULOS_DIFERIDOS = ("zeep", "lxml", "google.auth", "google.cloud")
+
+_LINEA = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+@dataclass
+class Importacion:
+    """Tiempos de importación de un módulo, en microsegundos."""
+
+    modulo: str
+    propio_us: int
+    acumulado_us: int
+    profundidad: int
+
+
+class ArranqueArgs(BaseSettings):
+    """Argumentos del benchmark."""
+
+    model_config = SettingsConfigDict(cli_prog_name="python -m benchmarks.arranque")
+
+    modulo: str = "app.main"
+    repeticiones: int = 5
+    top: int = 15
+
+
+def medir_importacion(modulo: str = "app.main") -> list[Importacion]:
+    """Importa ``modulo`` en un proceso nuevo y devuelve los tiempos por módulo."""
+    proceso = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        env={**os.environ, "PYTHONPATH": str(Path.cwd())},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    importaciones = []
+    for linea in proceso.stderr.splitlines():
+        encontrado = _LINEA.match(linea)
+        if encontrado:
+            propio, acumulado, sangria, nombre = encontrado.groups()
+            importaciones.append(
+                Importacion(nombre, int(propio), int(acumulado), len(sangria) // 2)
+            )
+    return importaciones
+
+
+def total_ms(importaciones: list[Importacion]) -> float:
+    """Tiempo total de importación (suma de los módulos de primer nivel)."""
+    return sum(i.acumulado_us for i in importaciones if i.profundidad == 0) / 1_000
+
+
+def cargados(importaciones: list[Importacion], prefijos: tuple[str, ...]) -> list[str]:
+    """Módulos importados que son o están dentro de alguno de ``prefijos``."""
+    return [
+        i.modulo
+        for i in importaciones
+        if any(i.modulo == p or i.modulo.startswith(p + ".") for p in prefijos)
+    ]
+
+
+def main() -> None:
+    """Ejecuta el benchmark e imprime el tiempo de importación."""
+    args = CliApp.run(ArranqueArgs)
+    corridas = [medir_importacion(args.modulo) for _ in range(args.repeticiones)]
+    tiempos = [total_ms(corrida) for corrida in corridas]
+    print(
+        f"import {args.modulo}: mediana {statistics.median(tiempos):.1f} ms, "
+        f"mínimo {min(tiempos):.1f} ms (presupuesto {PRESUPUESTO_MS} ms)"
+    )
+    print(f"\nMódulos con más tiempo propio (última corrida, top {args.top}):")
+    for importacion in sorted(corridas[-1], key=lambda i: -i.propio_us)[: args.top]:
+        print(f"{importacion.propio_us / 1_000:8.1f} ms  {importacion.modulo}")
+    diferidos = cargados(corridas[-1], MODULOS_DIFERIDOS)
+    if diferidos:
+        print(f"\nMódulos que deberían cargarse en diferido: {', '.join(diferidos)}")
+
+
+if __name__ == "__main__":
+    main()
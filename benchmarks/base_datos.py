@@ -0,0 +1,62 @@
+"""Base de datos PostgreSQL desechable para benchmarks.
+
+Crea una base con nombre único en el servidor indicado por ``DB_HOST``,
+``DB_PORT``, ``DB_USER`` y ``DB_PASSWORD``, aplica las migraciones y la elimina
+al terminar. Para un servidor efímero local::
+
+    docker compose -f compose.bench.yml up -d
+"""
+
+import os
+import secrets
+import subprocess
+import sys
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import sql
+
+
+def _conectar_admin() -> "psycopg2.extensions.connection":
+    conexion = psycopg2.connect(
+        host=os.getenv("DB_HOST", "localhost"),
+        port=os.getenv("DB_PORT", "5432"),
+        user=os.getenv("DB_USER", "postgres"),
+        password=os.getenv("DB_PASSWORD", ""),
+        dbname=os.getenv("DB_ADMIN_NAME", "postgres"),
+    )
+    conexion.autocommit = True
+    return conexion
+
+
+@contextmanager
+def base_desechable(prefijo: str = "sis_bench") -> Iterator[dict[str, str]]:
+    """Crea y migra una base temporal; devuelve las variables ``DB_*`` a usar."""
+    nombre = f"{prefijo}_{secrets.token_hex(4)}"
+    admin = _conectar_admin()
+    with admin.cursor() as cursor:
+        cursor.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(nombre)))
+    entorno = {
+        "DB_HOST": os.getenv("DB_HOST", "localhost"),
+        "DB_PORT": os.getenv("DB_PORT", "5432"),
+        "DB_USER": os.getenv("DB_USER", "postgres"),
+        "DB_PASSWORD": os.getenv("DB_PASSWORD", ""),
+        "DB_NAME": nombre,
+    }
+    try:
+        subprocess.run(
+            [sys.executable, "-m", "alembic", "upgrade", "head"],
+            env={**os.environ, **entorno},
+            check=True,
+            capture_output=True,
+        )
+        yield entorno
+    finally:
+        with admin.cursor() as cursor:
+            cursor.execute(
+                sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE)").format(
+                    sql.Identifier(nombre)
+                )
+            )
+        admin.close()
@@ -0,0 +1,379 @@
+"""Pruebas de carga de punta a punta sobre ``POST /consultar_afiliado``.
+
+Levanta el SIS simulado (``benchmarks.sis_mock``), crea una base PostgreSQL
+desechable (``benchmarks.base_datos``), arranca la aplicación con uvicorn y
+ejecuta los escenarios. Reporta throughput y latencias p50/p95/p99 y compara
+contra ``benchmarks/baselines.json``; sale con código 1 si hay regresiones.
+Uso::
+
+    uv run nox -s bench
+    uv run python -m benchmarks.carga --escenarios cache_hit,sis_caido
+    uv run python -m benchmarks.carga --actualizar_baseline true
+    uv run python -m benchmarks.carga --trafico sis_traffic.ndjson --velocidad 5
+"""
+
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import httpx
+from pydantic import Field
+from pydantic_settings import BaseSettings, CliApp, SettingsConfigDict
+
+from .base_datos import base_desechable
+from .sis_mock import ServidorSIS
+
+BASELINES = Path(__file__).parent / "baselines.json"
+
+# Límites de entrada y salida holgados: se mide el camino de la consulta,
+# no los limitadores (que tienen sus propias pruebas)
+ENTORNO_APP = {
+    "INBOUND_CLIENT_RATE": "100000",
+    "INBOUND_CLIENT_BURST": "100000",
+    "INBOUND_GLOBAL_RATE": "100000",
+    "INBOUND_GLOBAL_BURST": "100000",
+    "INBOUND_MAX_IN_FLIGHT": "1000",
+    "SIS_RATE_LIMIT": "100000",
+    "SIS_RATE_BURST": "100000",
+    "DB_ECHO": "false",
+    "SOAP_USER": "bench",
+    "SOAP_PASSWORD": "bench",
+}
+
+
+@dataclass(frozen=True)
+class Escenario:
+    """Carga a generar y comportamiento del SIS simulado."""
+
+    descripcion: str
+    solicitudes: int
+    concurrencia: int
+    documentos: int
+    precalentar: bool = False
+    latencia_ms: float = 80.0
+    tasa_fault: float = 0.0
+    tasa_id_error: float = 0.0
+    caido: bool = False
+
+
+ESCENARIOS: dict[str, Escenario] = {
+    "cache_hit": Escenario(
+        "Pocos documentos ya consultados hoy: se responden desde la caché",
+        solicitudes=600,
+        concurrencia=20,
+        documentos=20,
+        precalentar=True,
+    ),
+    "cache_miss": Escenario(
+        "Cada solicitud es un documento nuevo: todas llegan al SIS",
+        solicitudes=300,
+        concurrencia=20,
+        documentos=300,
+    ),
+    "batch": Escenario(
+        "Lote con repeticiones y 5 % de errores del SIS, alta concurrencia",
+        solicitudes=400,
+        concurrencia=50,
+        documentos=200,
+        tasa_id_error=0.05,
+    ),
+    "sis_caido": Escenario(
+        "El SIS responde 503: mide qué tan rápido fallan las consultas",
+        solicitudes=200,
+        concurrencia=20,
+        documentos=200,
+        latencia_ms=20.0,
+        caido=True,
+    ),
+}
+
+
+@dataclass
+class Resultado:
+    """Métricas de un escenario."""
+
+    escenario: str
+    solicitudes: int
+    duracion_s: float
+    rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    codigos: dict[str, int]
+    llamadas_sis: dict[str, int]
+
+    def resumen(self) -> str:
+        """Línea legible para la consola."""
+        return (
+            f"{self.escenario:<12} {self.rps:8.1f} req/s  "
+            f"p50 {self.p50_ms:7.1f} ms  p95 {self.p95_ms:7.1f} ms  "
+            f"p99 {self.p99_ms:7.1f} ms  códigos {self.codigos}  "
+            f"SIS {self.llamadas_sis}"
+        )
+
+
+class CargaArgs(BaseSettings):
+    """Argumentos de las pruebas de carga."""
+
+    model_config = SettingsConfigDict(
+        env_prefix="BENCH_", cli_prog_name="python -m benchmarks.carga"
+    )
+
+    escenarios: list[str] = Field(default_factory=lambda: list(ESCENARIOS))
+    escala: float = Field(1.0, gt=0, description="Multiplica las solicitudes")
+    tolerancia: float = Field(0.3, ge=0, description="Regresión tolerada")
+    actualizar_baseline: bool = False
+    baseline: Path = BASELINES
+    salida: Path | None = Field(None, description="JSON con los resultados")
+    trafico: Path | None = Field(
+        None, description="Tráfico SIS grabado (SIS_TRANSPORT_MODE=record)"
+    )
+    velocidad: float = Field(1.0, ge=0, description="Aceleración del tráfico")
+
+
+def percentiles(latencias: list[float]) -> tuple[float, float, float]:
+    """p50, p95 y p99 de una lista de latencias."""
+    if len(latencias) < 2:  # noqa: PLR2004
+        valor = latencias[0] if latencias else 0.0
+        return valor, valor, valor
+    cortes = statistics.quantiles(latencias, n=100, method="inclusive")
+    return cortes[49], cortes[94], cortes[98]
+
+
+def comparar(
+    resultado: Resultado, baseline: dict[str, float], tolerancia: float
+) -> list[str]:
+    """Regresiones de un resultado frente a su baseline."""
+    regresiones = []
+    if resultado.p95_ms > baseline["p95_ms"] * (1 + tolerancia):
+        regresiones.append(
+            f"{resultado.escenario}: p95 {resultado.p95_ms:.1f} ms "
+            f"> baseline {baseline['p95_ms']:.1f} ms"
+        )
+    if resultado.rps < baseline["rps"] * (1 - tolerancia):
+        regresiones.append(
+            f"{resultado.escenario}: {resultado.rps:.1f} req/s "
+            f"< baseline {baseline['rps']:.1f} req/s"
+        )
+    return regresiones
+
+
+def _puerto_libre() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def servidor_app(entorno: dict[str, str]) -> Iterator[str]:
+    """Arranca la aplicación con uvicorn y devuelve su URL base."""
+    puerto = _puerto_libre()
+    log = tempfile.NamedTemporaryFile(  # noqa: SIM115
+        prefix="sis-bench-", suffix=".log", delete=False
+    )
+    proceso = subprocess.Popen(  # noqa: S603
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(puerto),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        env={**os.environ, **entorno},
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    url = f"http://127.0.0.1:{puerto}"
+    try:
+        limite = time.monotonic() + 30
+        while True:
+            if proceso.poll() is not None or time.monotonic() > limite:
+                message = f"La aplicación no arrancó; ver {log.name}"
+                raise RuntimeError(message)
+            try:
+                if httpx.get(f"{url}/livez").is_success:
+                    break
+            except httpx.TransportError:
+                time.sleep(0.2)
+        yield url
+    finally:
+        proceso.terminate()
+        proceso.wait(timeout=10)
+        log.close()
+
+
+def entorno_sis(args: CargaArgs, sis: ServidorSIS) -> dict[str, str]:
+    """Variables para que la app use el SIS simulado o el tráfico grabado.
+
+    Con ``--trafico`` las respuestas salen de la grabación (a ``--velocidad``)
+    y las opciones de error del SIS simulado no aplican.
+    """
+    if args.trafico is None:
+        return {"SOAP_SIS": sis.wsdl}
+    with args.trafico.open(encoding="utf-8") as lineas:
+        wsdl = next(
+            registro["url"]
+            for registro in map(json.loads, filter(str.strip, lineas))
+            if registro["tipo"] == "documento"
+        )
+    return {
+        "SOAP_SIS": wsdl,
+        "SIS_TRANSPORT_MODE": "replay",
+        "SIS_TRAFFIC_FILE": str(args.trafico.resolve()),
+        "SIS_REPLAY_SPEED": str(args.velocidad),
+    }
+
+
+def _payload(nro_documento: str) -> dict[str, str | int]:
+    return {
+        "opcion": 1,
+        "dni": "46118717",
+        "tipo_documento": "1",
+        "nro_documento": nro_documento,
+        "usuario": "bench",
+    }
+
+
+async def ejecutar_escenario(  # noqa: PLR0913
+    cliente: httpx.AsyncClient,
+    nombre: str,
+    escenario: Escenario,
+    sis: ServidorSIS,
+    *,
+    base_documento: int,
+    escala: float = 1.0,
+) -> Resultado:
+    """Ejecuta un escenario y mide cada solicitud."""
+    documentos = [f"{base_documento + i:08d}" for i in range(escenario.documentos)]
+    sis.config.latencia_ms = escenario.latencia_ms
+    sis.config.tasa_fault = escenario.tasa_fault
+    sis.config.tasa_id_error = escenario.tasa_id_error
+    sis.config.caido = False
+
+    if escenario.precalentar:
+        for documento in documentos:
+            await cliente.post("/consultar_afiliado", json=_payload(documento))
+
+    sis.config.caido = escenario.caido
+    sis.config.llamadas.clear()
+    total = max(1, int(escenario.solicitudes * escala))
+    pendientes = [documentos[i % len(documentos)] for i in range(total)]
+    latencias: list[float] = []
+    codigos: Counter[str] = Counter()
+
+    async def trabajador() -> None:
+        while pendientes:
+            documento = pendientes.pop()
+            inicio = time.perf_counter()
+            respuesta = await cliente.post(
+                "/consultar_afiliado", json=_payload(documento)
+            )
+            latencias.append((time.perf_counter() - inicio) * 1_000)
+            codigos[str(respuesta.status_code)] += 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajador() for _ in range(escenario.concurrencia)))
+    duracion = time.perf_counter() - inicio
+
+    p50, p95, p99 = percentiles(latencias)
+    return Resultado(
+        escenario=nombre,
+        solicitudes=total,
+        duracion_s=round(duracion, 3),
+        rps=round(total / duracion, 2),
+        p50_ms=round(p50, 2),
+        p95_ms=round(p95, 2),
+        p99_ms=round(p99, 2),
+        codigos=dict(sorted(codigos.items())),
+        llamadas_sis=dict(sis.config.llamadas),
+    )
+
+
+async def ejecutar(args: CargaArgs, url: str, sis: ServidorSIS) -> list[Resultado]:
+    """Ejecuta los escenarios pedidos, cada uno con documentos propios."""
+    resultados = []
+    limites = httpx.Limits(max_connections=200, max_keepalive_connections=200)
+    async with httpx.AsyncClient(base_url=url, timeout=60, limits=limites) as cliente:
+        for indice, nombre in enumerate(args.escenarios):
+            resultado = await ejecutar_escenario(
+                cliente,
+                nombre,
+                ESCENARIOS[nombre],
+                sis,
+                base_documento=70_000_000 + indice * 100_000,
+                escala=args.escala,
+            )
+            print(resultado.resumen())
+            resultados.append(resultado)
+    return resultados
+
+
+def main() -> None:
+    """Punto de entrada de las pruebas de carga."""
+    args = CliApp.run(CargaArgs)
+    desconocidos = set(args.escenarios) - set(ESCENARIOS)
+    if desconocidos:
+        message = f"Escenarios desconocidos: {', '.join(sorted(desconocidos))}"
+        raise SystemExit(message)
+
+    sis = ServidorSIS().iniciar()
+    try:
+        with (
+            base_desechable() as entorno_db,
+            servidor_app(
+                {**ENTORNO_APP, **entorno_db, **entorno_sis(args, sis)}
+            ) as url,
+        ):
+            resultados = asyncio.run(ejecutar(args, url, sis))
+    finally:
+        sis.detener()
+
+    if args.salida:
+        args.salida.write_text(
+            json.dumps([asdict(r) for r in resultados], indent=2) + "\n"
+        )
+
+    baselines = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    if args.actualizar_baseline:
+        for resultado in resultados:
+            baselines[resultado.escenario] = {
+                "rps": resultado.rps,
+                "p50_ms": resultado.p50_ms,
+                "p95_ms": resultado.p95_ms,
+                "p99_ms": resultado.p99_ms,
+            }
+        args.baseline.write_text(json.dumps(baselines, indent=2) + "\n")
+        print(f"Baseline actualizado en {args.baseline}")
+        return
+
+    regresiones = [
+        regresion
+        for resultado in resultados
+        if resultado.escenario in baselines
+        for regresion in comparar(
+            resultado, baselines[resultado.escenario], args.tolerancia
+        )
+    ]
+    for regresion in regresiones:
+        print(f"REGRESIÓN {regresion}")
+    if regresiones:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Microbenchmark de serialización de ``ResponseModel[AfiliadoPublico]``.
+
+Compara el camino por defecto de FastAPI (``ResponseModel`` validado, más
+``serialize_response`` contra ``response_model`` y ``JSONResponse``) con
+``respuesta_json``. Uso::
+
+    uv run python -m benchmarks.serializacion --iteraciones 20000
+"""
+
+import asyncio
+import time
+from collections.abc import Callable
+from datetime import date, datetime
+
+from api_exception import ResponseModel
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from pydantic_settings import BaseSettings, CliApp, SettingsConfigDict
+
+from app.api.responses import respuesta_json
+from app.models.afiliado import AfiliadoPublico
+
+MENSAJE = "Consulta realizada correctamente"
+
+
+class BenchArgs(BaseSettings):
+    """Argumentos del benchmark."""
+
+    model_config = SettingsConfigDict(
+        cli_prog_name="python -m benchmarks.serializacion"
+    )
+
+    iteraciones: int = 20_000
+    repeticiones: int = 5
+
+
+def afiliado_de_ejemplo() -> AfiliadoPublico:
+    """AfiliadoPublico con todos los campos del SIS poblados."""
+    return AfiliadoPublico.desde_sis(
+        {
+            "IdError": "0",
+            "Resultado": "OK",
+            "TipoDocumento": "1",
+            "NroDocumento": "46118717",
+            "ApePaterno": "QUISPE",
+            "ApeMaterno": "MAMANI",
+            "Nombres": "JUAN CARLOS",
+            "FecAfiliacion": "20150312",
+            "EESS": "00006218",
+            "DescEESS": "HOSPITAL DE HUAYCAN",
+            "EESSUbigeo": "150103",
+            "DescEESSUbigeo": "LIMA - LIMA - ATE",
+            "Regimen": "1",
+            "TipoSeguro": "2",
+            "DescTipoSeguro": "SIS GRATUITO",
+            "Contrato": "E-2-00006218-000123456",
+            "FecCaducidad": "20261231",
+            "Estado": "ACTIVO",
+            "Tabla": "1",
+            "IdNumReg": "123456",
+            "Genero": "1",
+            "FecNacimiento": "19900105",
+            "IdUbigeo": "150103",
+            "Disa": "15",
+            "TipoFormato": "E",
+            "NroContrato": "000123456",
+            "Correlativo": "1",
+            "IdPlan": "2",
+            "IdGrupoPoblacional": "5",
+            "MsgConfidencial": None,
+        }
+    )
+
+
+def preparar_afiliado() -> AfiliadoPublico:
+    """AfiliadoPublico como queda después de guardarlo."""
+    afiliado = afiliado_de_ejemplo()
+    afiliado.id = 1
+    afiliado.CreatedAt = datetime(2025, 3, 1, 8, 15, 2)  # noqa: DTZ001
+    afiliado.VerifiedAt = datetime(2025, 3, 1, 8, 15, 2)  # noqa: DTZ001
+    assert afiliado.FecAfiliacion == date(2015, 3, 12)  # noqa: S101
+    return afiliado
+
+
+def camino_fastapi(afiliado: AfiliadoPublico) -> Callable[[], bytes]:
+    """Serialización equivalente a la que hace FastAPI con ``response_model``."""
+    campo = create_model_field(
+        name="Response", type_=ResponseModel[AfiliadoPublico], mode="serialization"
+    )
+    loop = asyncio.new_event_loop()
+
+    def serializar() -> bytes:
+        contenido = ResponseModel[AfiliadoPublico](data=afiliado, message=MENSAJE)
+        datos = loop.run_until_complete(
+            serialize_response(
+                field=campo, response_content=contenido, is_coroutine=True
+            )
+        )
+        return JSONResponse(datos).body
+
+    return serializar
+
+
+def camino_rapido(afiliado: AfiliadoPublico) -> Callable[[], bytes]:
+    """Serialización directa con ``respuesta_json``."""
+
+    def serializar() -> bytes:
+        return respuesta_json(AfiliadoPublico, afiliado, MENSAJE).body
+
+    return serializar
+
+
+def medir(funcion: Callable[[], bytes], iteraciones: int, repeticiones: int) -> float:
+    """Mejor tiempo por respuesta en microsegundos."""
+    mejores = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for _ in range(iteraciones):
+            funcion()
+        mejores.append((time.perf_counter() - inicio) / iteraciones * 1e6)
+    return min(mejores)
+
+
+def main() -> None:
+    """Ejecuta el benchmark e imprime µs por respuesta."""
+    args = CliApp.run(BenchArgs)
+    afiliado = preparar_afiliado()
+    antes, despues = camino_fastapi(afiliado), camino_rapido(afiliado)
+    if antes() != despues():
+        message = "Los dos caminos no producen el mismo JSON"
+        raise SystemExit(message)
+
+    us_antes = medir(antes, args.iteraciones, args.repeticiones)
+    us_despues = medir(despues, args.iteraciones, args.repeticiones)
+    print(f"fastapi (response_model): {us_antes:8.2f} µs/respuesta")
+    print(f"respuesta_json:           {us_despues:8.2f} µs/respuesta")
+    print(f"mejora:                   {us_antes / us_despues:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""Servidor SOAP local que imita al SIS para benchmarks y pruebas.
+
+Publica un WSDL compatible con ``GetSession`` y ``ConsultarAfiliadoFuaE`` y
+responde con latencia configurable e inyección de errores. Uso::
+
+    uv run python -m benchmarks.sis_mock --puerto 8081 --latencia_ms 80
+    SOAP_SIS=http://127.0.0.1:8081/Service.asmx?wsdl
+"""
+
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.etree import ElementTree as ET
+from xml.sax.saxutils import escape
+
+from pydantic_settings import BaseSettings, CliApp, SettingsConfigDict
+
+NS = "http://sis.gob.pe/"
+
+CAMPOS_AFILIADO = (
+    "IdError",
+    "Resultado",
+    "TipoDocumento",
+    "NroDocumento",
+    "ApePaterno",
+    "ApeMaterno",
+    "Nombres",
+    "FecAfiliacion",
+    "EESS",
+    "DescEESS",
+    "EESSUbigeo",
+    "DescEESSUbigeo",
+    "Regimen",
+    "TipoSeguro",
+    "DescTipoSeguro",
+    "Contrato",
+    "FecCaducidad",
+    "Estado",
+    "Tabla",
+    "IdNumReg",
+    "Genero",
+    "FecNacimiento",
+    "IdUbigeo",
+    "Disa",
+    "TipoFormato",
+    "NroContrato",
+    "Correlativo",
+    "IdPlan",
+    "IdGrupoPoblacional",
+    "MsgConfidencial",
+)
+
+PARAMETROS_CONSULTA = (
+    "strAutorizacion",
+    "strDni",
+    "strTipoDocumento",
+    "strNroDocumento",
+    "strDisa",
+    "strTipoFormato",
+    "strNroContrato",
+    "strCorrelativo",
+)
+
+
+def _elementos(nombres: tuple[str, ...]) -> str:
+    return "".join(
+        f'<s:element minOccurs="0" maxOccurs="1" name="{nombre}" type="s:string"/>'
+        for nombre in nombres
+    )
+
+
+def _operacion(nombre: str) -> str:
+    return (
+        f'<wsdl:operation name="{nombre}">'
+        f'<soap:operation soapAction="{NS}{nombre}" style="document"/>'
+        '<wsdl:input><soap:body use="literal"/></wsdl:input>'
+        '<wsdl:output><soap:body use="literal"/></wsdl:output>'
+        "</wsdl:operation>"
+    )
+
+
+def generar_wsdl(direccion: str) -> str:
+    """WSDL document/literal con la misma forma que el servicio del SIS."""
+    return f"""<?xml version="1.0" encoding="utf-8"?>
+<wsdl:definitions xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+    xmlns:s="http://www.w3.org/2001/XMLSchema"
+    xmlns:tns="{NS}" targetNamespace="{NS}"
+    xmlns:wsdl="http://schemas.xmlsoap.org/wsdl/">
+<wsdl:types>
+<s:schema elementFormDefault="qualified" targetNamespace="{NS}">
+<s:element name="GetSession"><s:complexType><s:sequence>
+{_elementos(("strUsuario", "strClave"))}
+</s:sequence></s:complexType></s:element>
+<s:element name="GetSessionResponse"><s:complexType><s:sequence>
+{_elementos(("GetSessionResult",))}
+</s:sequence></s:complexType></s:element>
+<s:element name="ConsultarAfiliadoFuaE"><s:complexType><s:sequence>
+<s:element minOccurs="1" maxOccurs="1" name="intOpcion" type="s:int"/>
+{_elementos(PARAMETROS_CONSULTA)}
+</s:sequence></s:complexType></s:element>
+<s:element name="ConsultarAfiliadoFuaEResponse"><s:complexType><s:sequence>
+<s:element minOccurs="0" maxOccurs="1" name="ConsultarAfiliadoFuaEResult"
+    type="tns:RespuestaAfiliado"/>
+</s:sequence></s:complexType></s:element>
+<s:complexType name="RespuestaAfiliado"><s:sequence>
+{_elementos(CAMPOS_AFILIADO)}
+</s:sequence></s:complexType>
+</s:schema>
+</wsdl:types>
+<wsdl:message name="GetSessionSoapIn">
+<wsdl:part name="parameters" element="tns:GetSession"/></wsdl:message>
+<wsdl:message name="GetSessionSoapOut">
+<wsdl:part name="parameters" element="tns:GetSessionResponse"/></wsdl:message>
+<wsdl:message name="ConsultarAfiliadoFuaESoapIn">
+<wsdl:part name="parameters" element="tns:ConsultarAfiliadoFuaE"/></wsdl:message>
+<wsdl:message name="ConsultarAfiliadoFuaESoapOut">
+<wsdl:part name="parameters" element="tns:ConsultarAfiliadoFuaEResponse"/>
+</wsdl:message>
+<wsdl:portType name="ServiceSoap">
+<wsdl:operation name="GetSession">
+<wsdl:input message="tns:GetSessionSoapIn"/>
+<wsdl:output message="tns:GetSessionSoapOut"/></wsdl:operation>
+<wsdl:operation name="ConsultarAfiliadoFuaE">
+<wsdl:input message="tns:ConsultarAfiliadoFuaESoapIn"/>
+<wsdl:output message="tns:ConsultarAfiliadoFuaESoapOut"/></wsdl:operation>
+</wsdl:portType>
+<wsdl:binding name="ServiceSoap" type="tns:ServiceSoap">
+<soap:binding transport="http://schemas.xmlsoap.org/soap/http"/>
+{_operacion("GetSession")}
+{_operacion("ConsultarAfiliadoFuaE")}
+</wsdl:binding>
+<wsdl:service name="Service">
+<wsdl:port name="ServiceSoap" binding="tns:ServiceSoap">
+<soap:address location="{escape(direccion)}"/></wsdl:port>
+</wsdl:service>
+</wsdl:definitions>"""
+
+
+def _sobre(cuerpo: str) -> str:
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+        f"<soap:Body>{cuerpo}</soap:Body></soap:Envelope>"
+    )
+
+
+def _fault(mensaje: str) -> str:
+    return _sobre(
+        "<soap:Fault><faultcode>soap:Server</faultcode>"
+        f"<faultstring>{escape(mensaje)}</faultstring></soap:Fault>"
+    )
+
+
+def datos_afiliado(nro_documento: str, tipo_documento: str = "1") -> dict[str, str]:
+    """Ficha determinista para un documento (misma entrada, mismo contenido)."""
+    semilla = int(re.sub(r"\D", "", nro_documento) or 0)
+    return {
+        "IdError": "0",
+        "Resultado": "OK",
+        "TipoDocumento": tipo_documento,
+        "NroDocumento": nro_documento,
+        "ApePaterno": f"PATERNO{semilla % 97}",
+        "ApeMaterno": f"MATERNO{semilla % 89}",
+        "Nombres": f"NOMBRE{semilla % 83}",
+        "FecAfiliacion": "20150312",
+        "EESS": "00006218",
+        "DescEESS": "HOSPITAL DE HUAYCAN",
+        "EESSUbigeo": "150103",
+        "DescEESSUbigeo": "LIMA - LIMA - ATE",
+        "Regimen": "1",
+        "TipoSeguro": "2",
+        "DescTipoSeguro": "SIS GRATUITO",
+        "Contrato": f"E-2-00006218-{semilla % 1_000_000:09d}",
+        "FecCaducidad": "20301231",
+        "Estado": "ACTIVO",
+        "Tabla": "1",
+        "IdNumReg": str(semilla % 1_000_000),
+        "Genero": str(semilla % 2 + 1),
+        "FecNacimiento": "19900105",
+        "IdUbigeo": "150103",
+        "Disa": "15",
+        "TipoFormato": "E",
+        "NroContrato": f"{semilla % 1_000_000:09d}",
+        "Correlativo": "1",
+        "IdPlan": "2",
+        "IdGrupoPoblacional": "5",
+    }
+
+
+@dataclass
+class ConfigSIS:
+    """Comportamiento del SIS simulado; se puede cambiar en caliente."""
+
+    latencia_ms: float = 80.0
+    jitter_ms: float = 20.0
+    tasa_fault: float = 0.0
+    tasa_id_error: float = 0.0
+    caido: bool = False
+    llamadas: Counter = field(default_factory=Counter)
+
+    def esperar(self) -> None:
+        """Simula la latencia de red y de procesamiento del SIS."""
+        latencia = random.gauss(self.latencia_ms, self.jitter_ms)
+        time.sleep(max(0.0, latencia) / 1_000)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "ServidorSIS"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        """Silencia el log por solicitud."""
+
+    def do_GET(self) -> None:
+        self._responder(200, generar_wsdl(self.server.direccion), "text/xml")
+
+    def do_POST(self) -> None:
+        config = self.server.config
+        cuerpo = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        accion = self.headers.get("SOAPAction", "").strip('"').removeprefix(NS)
+        config.llamadas[accion] += 1
+        config.esperar()
+
+        if config.caido:
+            self._responder(503, "Service Unavailable", "text/plain")
+            return
+        if random.random() < config.tasa_fault:  # noqa: S311
+            self._responder(500, _fault("Error interno del SIS"), "text/xml")
+            return
+
+        parametros = {
+            elemento.tag.rpartition("}")[2]: elemento.text or ""
+            for elemento in ET.fromstring(cuerpo).iter()  # noqa: S314
+        }
+        if accion == "GetSession":
+            token = f"TOKEN-{parametros.get('strUsuario', '')}"
+            respuesta = (
+                f'<GetSessionResponse xmlns="{NS}">'
+                f"<GetSessionResult>{escape(token)}</GetSessionResult>"
+                "</GetSessionResponse>"
+            )
+        elif accion == "ConsultarAfiliadoFuaE":
+            datos = datos_afiliado(
+                parametros.get("strNroDocumento", ""),
+                parametros.get("strTipoDocumento", "1"),
+            )
+            if random.random() < config.tasa_id_error:  # noqa: S311
+                datos = {"IdError": "14", "Resultado": "No se encontraron datos"}
+            campos = "".join(
+                f"<{nombre}>{escape(valor)}</{nombre}>"
+                for nombre, valor in datos.items()
+            )
+            respuesta = (
+                f'<ConsultarAfiliadoFuaEResponse xmlns="{NS}">'
+                f"<ConsultarAfiliadoFuaEResult>{campos}</ConsultarAfiliadoFuaEResult>"
+                "</ConsultarAfiliadoFuaEResponse>"
+            )
+        else:
+            self._responder(500, _fault(f"Acción desconocida: {accion}"), "text/xml")
+            return
+        self._responder(200, _sobre(respuesta), "text/xml")
+
+    def _responder(self, codigo: int, contenido: str, tipo: str) -> None:
+        datos = contenido.encode()
+        self.send_response(codigo)
+        self.send_header("Content-Type", f"{tipo}; charset=utf-8")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+
+class ServidorSIS(ThreadingHTTPServer):
+    """Servidor HTTP del SIS simulado."""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", puerto: int = 0) -> None:
+        """Crea el servidor; con ``puerto=0`` se elige uno libre."""
+        super().__init__((host, puerto), _Handler)
+        self.config = ConfigSIS()
+        self.direccion = f"http://{host}:{self.server_address[1]}/Service.asmx"
+        self._hilo: threading.Thread | None = None
+
+    @property
+    def wsdl(self) -> str:
+        """URL del WSDL para ``SOAP_SIS``."""
+        return f"{self.direccion}?wsdl"
+
+    def iniciar(self) -> "ServidorSIS":
+        """Atiende solicitudes en un hilo en segundo plano."""
+        self._hilo = threading.Thread(target=self.serve_forever, daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self) -> None:
+        """Detiene el servidor y libera el puerto."""
+        self.shutdown()
+        self.server_close()
+
+
+class MockArgs(BaseSettings):
+    """Argumentos para ejecutar el SIS simulado de forma independiente."""
+
+    model_config = SettingsConfigDict(
+        env_prefix="SIS_MOCK_", cli_prog_name="python -m benchmarks.sis_mock"
+    )
+
+    host: str = "127.0.0.1"
+    puerto: int = 8081
+    latencia_ms: float = 80.0
+    jitter_ms: float = 20.0
+    tasa_fault: float = 0.0
+    tasa_id_error: float = 0.0
+
+
+def main() -> None:
+    """Ejecuta el SIS simulado hasta recibir Ctrl+C."""
+    args = CliApp.run(MockArgs)
+    servidor = ServidorSIS(args.host, args.puerto)
+    servidor.config.latencia_ms = args.latencia_ms
+    servidor.config.jitter_ms = args.jitter_ms
+    servidor.config.tasa_fault = args.tasa_fault
+    servidor.config.tasa_id_error = args.tasa_id_error
+    print(f"SOAP_SIS={servidor.wsdl}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -96,3 +96,24 @@ def test(session: nox.Session) -> None:
     session.run(*command)
 
     session.log("✅ Testing completed successfully.")
+
+
+@nox.session(python=False)
+def bench(session: nox.Session) -> None:
+    """Run the end-to-end load tests against the local SIS and Postgres stand-ins.
+
+    Requires a reachable PostgreSQL server (``DB_HOST``, ``DB_USER``, ...);
+    ``compose.bench.yml`` starts a disposable one. Extra arguments are passed
+    to ``benchmarks.carga``.
+
+    Args:
+        session (nox.Session): The Nox session object.
+
+    Examples:
+        >>> uv run nox -s bench
+        >>> uv run nox -s bench -- --escenarios cache_hit --escala 0.5
+
+    """
+    session.run("uv", "run", "python", "-m", "benchmarks.carga", *session.posargs)
+
+    session.log("✅ Benchmarks completed successfully.")
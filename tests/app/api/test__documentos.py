@@ -0,0 +1,86 @@
+import pytest
+from pydantic import ValidationError
+
+from app.api.documentos import normalizar_documento
+from app.api.requests import ConsultaAfiliadoRequest, SuscripcionRequest
+
+
+class TestNormalizarDocumento:
+    """Test class for normalizar_documento."""
+
+    @pytest.mark.parametrize(
+        ("tipo", "numero", "esperado"),
+        [
+            ("1", " 46118717 ", "46118717"),
+            ("1", "1234567", "01234567"),
+            ("d", "46.118.717", "46118717"),
+            ("2", "123456", "000123456"),
+            ("2", "ab-123456", "AB123456"),
+            ("3", " x1234567 ", "X1234567"),
+            ("9", "abc 123", "ABC123"),
+        ],
+    )
+    def test_forma_canonica(self, tipo: str, numero: str, esperado: str) -> None:
+        """Las variantes de un mismo documento comparten la forma canónica."""
+        assert normalizar_documento(tipo, numero) == esperado
+
+    @pytest.mark.parametrize(
+        ("tipo", "numero"),
+        [
+            ("1", "123456789"),
+            ("1", "123456"),
+            ("1", "1"),
+            ("1", "4611871A"),
+            ("1", "00000000"),
+            ("1", ""),
+            ("2", "1234567890123"),
+            ("3", "1234"),
+            ("9", "A" * 21),
+            ("9", "123/456"),
+        ],
+    )
+    def test_invalidos(self, tipo: str, numero: str) -> None:
+        """Los números imposibles para el tipo se rechazan."""
+        with pytest.raises(ValueError, match="inválido"):
+            normalizar_documento(tipo, numero)
+
+
+class TestConsultaAfiliadoRequest:
+    """Test class for ConsultaAfiliadoRequest normalization."""
+
+    def test_normaliza(self) -> None:
+        """Tipo y número quedan canónicos antes de la caché y del SIS."""
+        consulta = ConsultaAfiliadoRequest(
+            opcion=1,
+            dni="46118717",
+            tipo_documento=" d ",
+            nro_documento="1234567 ",
+            usuario="u",
+        )
+        assert consulta.tipo_documento == "D"
+        assert consulta.nro_documento == "01234567"
+
+    def test_rechaza(self) -> None:
+        """Un documento inválido no llega a construirse."""
+        with pytest.raises(ValidationError, match="DNI inválido"):
+            ConsultaAfiliadoRequest(
+                opcion=1,
+                dni="46118717",
+                tipo_documento="1",
+                nro_documento="123456789",
+                usuario="u",
+            )
+
+    def test_suscripcion_normaliza(self) -> None:
+        """La suscripción usa la misma forma canónica que las consultas."""
+        suscripcion = SuscripcionRequest(numero_documento=" 46.118.717", canal="sse")
+        assert suscripcion.numero_documento == "46118717"
+        carne = SuscripcionRequest(
+            numero_documento="12345", tipo_documento="2", canal="sse"
+        )
+        assert carne.numero_documento == "000012345"
+
+    def test_suscripcion_rechaza(self) -> None:
+        """Un documento inválido para el tipo no se puede suscribir."""
+        with pytest.raises(ValidationError, match="DNI inválido"):
+            SuscripcionRequest(numero_documento="A1234567", canal="sse")
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from app.api.http_cache import (
+    cabeceras_cache,
+    coincide_etag,
+    etag,
+    segundos_hasta_vencer,
+)
+
+
+class TestHttpCache:
+    """Test class for HTTP cache helpers."""
+
+    def test_coincide_etag(self) -> None:
+        """Compara If-None-Match con listas, ETags débiles y comodín."""
+        actual = etag("abc")
+        assert coincide_etag('"abc"', actual)
+        assert coincide_etag('"x", W/"abc"', actual)
+        assert coincide_etag("*", actual)
+        assert coincide_etag(actual, actual)
+        assert not coincide_etag('"x"', actual)
+        assert not coincide_etag(None, actual)
+
+    def test_cabeceras(self) -> None:
+        """ETag débil, Last-Modified y una frescura privada hasta el fin del día."""
+        cabeceras = cabeceras_cache("abc", datetime(2025, 1, 1, 8, 0, 0))  # noqa: DTZ001
+        assert cabeceras["ETag"] == 'W/"abc"'
+        assert cabeceras["Last-Modified"].endswith("GMT")
+        assert cabeceras["Cache-Control"].startswith("private, max-age=")
+        assert cabeceras["Cache-Control"].endswith(", must-revalidate")
+
+    def test_sin_validadores(self) -> None:
+        """Sin hash ni verificación solo se envía Cache-Control."""
+        assert set(cabeceras_cache(None, None)) == {"Cache-Control"}
+
+    def test_vencimiento(self) -> None:
+        """La caché vence antes de 24 horas."""
+        assert 0 <= segundos_hasta_vencer() <= 24 * 60 * 60
@@ -0,0 +1,145 @@
+import asyncio
+
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+from starlette.types import Message, Receive, Scope, Send
+
+from app.api.middleware import (
+    DeadlineMiddleware,
+    LoadSheddingMiddleware,
+    MetricasCarga,
+)
+from app.deadline import restante
+
+
+def crear_cliente(**kwargs: float) -> tuple[TestClient, MetricasCarga]:
+    """Crea una aplicación mínima protegida por el middleware."""
+    app = FastAPI()
+    metricas = MetricasCarga()
+
+    @app.get("/ping")
+    async def ping() -> dict:
+        return {"ok": True}
+
+    @app.get("/eventos/1")
+    async def eventos() -> dict:
+        return {"ok": True}
+
+    @app.get("/livez")
+    async def livez() -> dict:
+        return {"status": "alive"}
+
+    app.add_middleware(
+        LoadSheddingMiddleware,
+        metricas=metricas,
+        exempt_paths=frozenset({"/livez"}),
+        stream_prefixes=("/eventos/",),
+        **kwargs,
+    )
+    return TestClient(app), metricas
+
+
+class TestLoadSheddingMiddleware:
+    """Test class for LoadSheddingMiddleware."""
+
+    def test_client_limit(self) -> None:
+        """Supera el límite por cliente y recibe 429 con Retry-After."""
+        client, metricas = crear_cliente(client_rate=0.01, client_burst=2)
+        codigos = [client.get("/ping").status_code for _ in range(3)]
+        assert codigos == [200, 200, 429]
+
+        response = client.get("/ping")
+        assert response.headers["Retry-After"]
+        assert response.json()["error_code"] == "LOAD-429"
+        assert metricas.rechazadas_cliente == 2  # noqa: PLR2004
+        assert metricas.aceptadas == 2  # noqa: PLR2004
+
+    def test_global_limit(self) -> None:
+        """El límite global responde 503."""
+        client, metricas = crear_cliente(global_rate=0.01, global_burst=1)
+        assert client.get("/ping").status_code == status.HTTP_200_OK
+        assert client.get("/ping").status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert metricas.rechazadas_global == 1
+
+    def test_queue_time_shedding(self) -> None:
+        """Sin cupos disponibles la solicitud se descarta tras la espera."""
+        client, metricas = crear_cliente(max_in_flight=0, max_queue_time=0.01)
+        response = client.get("/ping")
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.json()["error_code"] == "LOAD-503"
+        assert metricas.descartadas_cola == 1
+
+    def test_exempt_paths(self) -> None:
+        """Los probes no se limitan."""
+        client, _ = crear_cliente(client_rate=0.01, client_burst=1)
+        codigos = {client.get("/livez").status_code for _ in range(5)}
+        assert codigos == {status.HTTP_200_OK}
+
+    def test_stream_prefixes(self) -> None:
+        """Los streams no ocupan cupos pero sí respetan el límite por cliente."""
+        client, metricas = crear_cliente(
+            max_in_flight=0, max_queue_time=0.01, client_rate=0.01, client_burst=1
+        )
+        assert client.get("/eventos/1").status_code == status.HTTP_200_OK
+        assert client.get("/eventos/1").status_code == (
+            status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        assert metricas.descartadas_cola == 0
+
+
+def crear_cliente_plazo(**kwargs: float) -> TestClient:
+    """Crea una aplicación mínima que informa el plazo restante."""
+    app = FastAPI()
+
+    @app.get("/plazo")
+    async def ver_plazo() -> dict:
+        return {"restante": restante()}
+
+    app.add_middleware(DeadlineMiddleware, **kwargs)
+    return TestClient(app)
+
+
+class TestDeadlineMiddleware:
+    """Test class for DeadlineMiddleware."""
+
+    def test_plazo_por_defecto(self) -> None:
+        """Sin cabecera se usa el plazo por defecto."""
+        client = crear_cliente_plazo(por_defecto=5)
+        assert 4 < client.get("/plazo").json()["restante"] <= 5  # noqa: PLR2004
+
+    def test_cabecera_acotada_al_maximo(self) -> None:
+        """La cabecera fija el plazo, sin superar el máximo."""
+        client = crear_cliente_plazo(por_defecto=5, maximo=10)
+        restante_1 = client.get("/plazo", headers={"X-Request-Timeout": "1"})
+        restante_60 = client.get("/plazo", headers={"X-Request-Timeout": "60"})
+        assert restante_1.json()["restante"] <= 1
+        assert 9 < restante_60.json()["restante"] <= 10  # noqa: PLR2004
+
+    def test_cabecera_invalida_y_sin_plazo(self) -> None:
+        """Una cabecera inválida se ignora; sin por defecto no hay plazo."""
+        client = crear_cliente_plazo()
+        response = client.get("/plazo", headers={"X-Request-Timeout": "abc"})
+        assert response.json()["restante"] is None
+
+    def test_desconexion_cancela(self) -> None:
+        """Si el cliente se desconecta se cancela el trabajo en curso."""
+        cancelada = asyncio.Event()
+
+        async def lenta(scope: Scope, receive: Receive, send: Send) -> None:  # noqa: ARG001
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelada.set()
+                raise
+
+        async def receive() -> Message:
+            await asyncio.sleep(0.01)
+            return {"type": "http.disconnect"}
+
+        async def send(message: Message) -> None:
+            raise AssertionError(message)
+
+        middleware = DeadlineMiddleware(lenta, por_defecto=30)
+        scope = {"type": "http", "path": "/lenta", "headers": []}
+        asyncio.run(asyncio.wait_for(middleware(scope, receive, send), timeout=2))
+        assert cancelada.is_set()
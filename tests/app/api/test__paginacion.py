@@ -0,0 +1,32 @@
+import pytest
+
+from app.api.paginacion import codificar_cursor, decodificar_cursor
+
+
+class TestCursor:
+    """Test class for codificar_cursor y decodificar_cursor."""
+
+    def test_ida_y_vuelta(self) -> None:
+        """El cursor conserva los valores de orden."""
+        cursor = codificar_cursor("QUISPE MAMANI JUAN", 42)
+        assert "=" not in cursor
+        assert decodificar_cursor(cursor, str, int) == ["QUISPE MAMANI JUAN", 42]
+
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            "no-es-base64!",
+            "e30",
+            codificar_cursor(1),
+            codificar_cursor(42, "QUISPE"),
+            codificar_cursor("QUISPE", "42"),
+            codificar_cursor("QUISPE", 4.2),
+            codificar_cursor("QUISPE", True),  # noqa: FBT003
+            codificar_cursor(None, 42),
+            codificar_cursor(["QUISPE"], 42),
+        ],
+    )
+    def test_invalido(self, cursor: str) -> None:
+        """Los cursores mal formados, de otra forma o con otros tipos se rechazan."""
+        with pytest.raises(ValueError, match="Cursor inválido"):
+            decodificar_cursor(cursor, str, int)
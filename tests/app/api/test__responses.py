@@ -0,0 +1,44 @@
+import json
+from datetime import datetime
+
+from api_exception import ResponseModel
+from fastapi.encoders import jsonable_encoder
+
+from app.api.responses import respuesta_json
+from app.models.afiliado import AfiliadoPublico
+from app.models.afiliado_historial import AfiliadoHistorial
+
+
+class TestRespuestaJson:
+    """Test class for the direct JSON response path."""
+
+    def test_mismo_contrato(self) -> None:
+        """Produce el mismo JSON que el camino de ``response_model``."""
+        afiliado = AfiliadoPublico.desde_sis(
+            {
+                "NroDocumento": "46118717",
+                "FecAfiliacion": "20150312",
+                "DescEESS": "HOSPITAL DE HUAYCAN",
+            }
+        )
+        afiliado.CreatedAt = datetime(2025, 3, 1, 8, 15, 2)  # noqa: DTZ001
+        esperado = jsonable_encoder(
+            ResponseModel[AfiliadoPublico](data=afiliado, message="ok")
+        )
+
+        respuesta = respuesta_json(
+            AfiliadoPublico, afiliado, "ok", headers={"ETag": '"x"'}
+        )
+
+        assert json.loads(respuesta.body) == esperado
+        assert respuesta.media_type == "application/json"
+        assert respuesta.headers["ETag"] == '"x"'
+
+    def test_lista(self) -> None:
+        """Serializa listas de modelos."""
+        historial = [AfiliadoHistorial(numero_documento="1", completo=True)]
+
+        respuesta = respuesta_json(list[AfiliadoHistorial], historial, "ok")
+
+        data = json.loads(respuesta.body)["data"]
+        assert data[0]["numero_documento"] == "1"
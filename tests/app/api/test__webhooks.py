@@ -0,0 +1,105 @@
+import socket
+
+import pytest
+from pydantic import HttpUrl, ValidationError
+
+from app.api import webhooks
+from app.api.requests import SuscripcionRequest
+from app.api.webhooks import resolver, validar_url
+from tools.config import get_settings
+
+
+@pytest.fixture(autouse=True)
+def _settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("WEBHOOK_ALLOWED_HOSTS", "hooks.interno")
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+def _dns(monkeypatch: pytest.MonkeyPatch, *direcciones: str) -> None:
+    """Hace que todo host resuelva a las direcciones indicadas."""
+
+    def getaddrinfo(_host: str, puerto: int, **__: object) -> list:
+        return [
+            (socket.AF_INET6 if ":" in d else socket.AF_INET, 1, 6, "", (d, puerto))
+            for d in direcciones
+        ]
+
+    monkeypatch.setattr(webhooks.socket, "getaddrinfo", getaddrinfo)
+
+
+class TestValidarUrl:
+    """Test class for validar_url."""
+
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "https://cliente.example/hook",
+            "https://93.184.216.34/hook",
+            "https://hooks.interno/hook",
+        ],
+    )
+    def test_acepta(self, url: str) -> None:
+        """Se aceptan hosts públicos y los permitidos explícitamente."""
+        assert str(validar_url(HttpUrl(url))) == url
+
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "http://cliente.example/hook",
+            "https://localhost/hook",
+            "https://127.0.0.1/hook",
+            "https://10.0.0.5/hook",
+            "https://192.168.1.10/hook",
+            "https://169.254.169.254/latest/meta-data",
+            "https://[::1]/hook",
+            "https://[::ffff:127.0.0.1]/hook",
+            "https://[fe80::1]/hook",
+        ],
+    )
+    def test_rechaza(self, url: str) -> None:
+        """Se rechazan http y las direcciones internas literales."""
+        with pytest.raises(ValueError, match=r"https|interna"):
+            validar_url(HttpUrl(url))
+
+    def test_suscripcion(self) -> None:
+        """La suscripción rechaza el webhook interno con un error de validación."""
+        with pytest.raises(ValidationError, match="dirección interna"):
+            SuscripcionRequest(
+                numero_documento="46118717", webhook_url="https://127.0.0.1/hook"
+            )
+
+
+class TestResolver:
+    """Test class for resolver."""
+
+    def test_publico(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Un host con direcciones públicas devuelve esas direcciones."""
+        _dns(monkeypatch, "93.184.216.34", "93.184.216.34")
+        assert [str(d) for d in resolver("cliente.example", 443)] == ["93.184.216.34"]
+
+    @pytest.mark.parametrize("interna", ["10.1.2.3", "127.0.0.1", "fd00::1"])
+    def test_alguna_interna(
+        self, monkeypatch: pytest.MonkeyPatch, interna: str
+    ) -> None:
+        """Basta una dirección interna para rechazar el host."""
+        _dns(monkeypatch, "93.184.216.34", interna)
+        with pytest.raises(ValueError, match="dirección interna"):
+            resolver("cliente.example", 443)
+
+    def test_host_permitido(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Los hosts de WEBHOOK_ALLOWED_HOSTS pueden resolver a redes privadas."""
+        _dns(monkeypatch, "10.1.2.3")
+        assert [str(d) for d in resolver("hooks.interno", 443)] == ["10.1.2.3"]
+
+    def test_no_resuelve(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Un host que no resuelve se rechaza."""
+
+        def getaddrinfo(*_: object, **__: object) -> list:
+            message = "Name or service not known"
+            raise socket.gaierror(message)
+
+        monkeypatch.setattr(webhooks.socket, "getaddrinfo", getaddrinfo)
+        with pytest.raises(ValueError, match="No se pudo resolver"):
+            resolver("no-existe.example", 443)
@@ -0,0 +1,194 @@
+import asyncio
+from typing import Any
+
+import pytest
+from fastapi import status
+from result import Err
+
+from app.api.exceptions import CustomExceptionCode
+from app.jobs import consultas
+from app.jobs.consultas import _procesar_item, espera_reintento, procesar_lote
+from app.models.consulta_job import ConsultaJobItem, EstadoItem
+from tools.config import Settings
+
+CONSULTA = {
+    "opcion": 1,
+    "dni": "46118717",
+    "tipo_documento": "1",
+    "nro_documento": "12345678",
+    "usuario": "tester",
+}
+
+
+class FakeRepository:
+    """Repositorio falso que registra cómo terminó cada consulta."""
+
+    def __init__(self, _session: object = None) -> None:
+        """Inicializa los registros."""
+        self.finalizados: list[tuple[EstadoItem, dict[str, Any]]] = []
+        self.reintentos: list[float] = []
+        self.reclamo: dict[str, Any] = {}
+        self.items: list[ConsultaJobItem] = []
+        # Ids de las consultas que otro worker reclamó
+        self.ajenas: set[int | None] = set()
+
+    def descartar_agotadas(self, max_intentos: int) -> int:
+        """Registra el máximo de intentos usado."""
+        self.reclamo["descartar"] = max_intentos
+        return 0
+
+    def reclamar(self, limite: int, lease: float, max_intentos: int) -> list:
+        """Devuelve las consultas preparadas."""
+        self.reclamo.update(limite=limite, lease=lease, max_intentos=max_intentos)
+        return self.items
+
+    def renovar(self, item: ConsultaJobItem, lease: float) -> bool:  # noqa: ARG002
+        """Renueva el lease si la consulta sigue siendo propia."""
+        return item.id not in self.ajenas
+
+    def finalizar(
+        self,
+        item: ConsultaJobItem,
+        estado: EstadoItem,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> bool:
+        """Registra el resultado final."""
+        self.finalizados.append((estado, kwargs))
+        return item.id not in self.ajenas
+
+    def reintentar(
+        self,
+        item: ConsultaJobItem,  # noqa: ARG002
+        espera: float,
+        error_description: str | None,  # noqa: ARG002
+    ) -> bool:
+        """Registra el reintento."""
+        self.reintentos.append(espera)
+        return True
+
+
+class FakeAfiliadoService:
+    """AfiliadoService que siempre responde el error indicado."""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    def __init__(self, db_session: object) -> None:
+        """Ignora la sesión."""
+
+    async def consultar_afiliado(self, token: str | None, consulta: object) -> Err:  # noqa: ARG002
+        """Simula la consulta."""
+        return Err(
+            (CustomExceptionCode.DISCONECTED_SIS_SERVICE, self.status_code, "caído")
+        )
+
+
+class FakeDatabaseConfig:
+    """Configuración de base de datos con sesiones que no hacen nada."""
+
+    class Sesion:
+        """Sesión sin conexión."""
+
+        def close(self) -> None:
+            """No hace nada."""
+
+        def commit(self) -> None:
+            """No hace nada."""
+
+        def rollback(self) -> None:
+            """No hace nada."""
+
+    def get_session(self) -> "FakeDatabaseConfig.Sesion":
+        """Devuelve una sesión sin conexión."""
+        return self.Sesion()
+
+
+class TestEsperaReintento:
+    """Test class for espera_reintento."""
+
+    def test_exponencial_con_tope(self) -> None:
+        """La espera se duplica en cada intento hasta el tope."""
+        assert [espera_reintento(n, 5) for n in (1, 2, 3)] == [5, 10, 20]
+        assert espera_reintento(20, 5) == 600  # noqa: PLR2004
+
+
+class TestProcesarItem:
+    """Test class for _procesar_item."""
+
+    @pytest.fixture(autouse=True)
+    def _servicios(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(consultas, "AfiliadoService", FakeAfiliadoService)
+        monkeypatch.setattr(consultas, "get_database_config", FakeDatabaseConfig)
+
+    def _procesar(self, intentos: int) -> FakeRepository:
+        repository = FakeRepository()
+        item = ConsultaJobItem(job_id=None, posicion=0, consulta=CONSULTA)  # type: ignore
+        item.intentos = intentos
+        settings = Settings(jobs_max_attempts=3, jobs_retry_backoff=5)
+        asyncio.run(_procesar_item(repository, item, settings))  # type: ignore
+        return repository
+
+    def test_error_transitorio_se_reintenta(self) -> None:
+        """Un 5xx vuelve la consulta a la cola con espera exponencial."""
+        repository = self._procesar(intentos=2)
+        assert repository.reintentos == [10]
+        assert repository.finalizados == []
+
+    def test_intentos_agotados(self) -> None:
+        """Sin intentos restantes la consulta termina con error."""
+        repository = self._procesar(intentos=3)
+        assert repository.reintentos == []
+        ((estado, datos),) = repository.finalizados
+        assert estado == EstadoItem.ERROR
+        assert datos["error_code"] == "API-503"
+
+    def test_error_del_cliente_no_se_reintenta(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Los errores 4xx son definitivos."""
+        monkeypatch.setattr(
+            FakeAfiliadoService, "status_code", status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+        repository = self._procesar(intentos=1)
+        assert [estado for estado, _ in repository.finalizados] == [EstadoItem.ERROR]
+
+
+class TestProcesarLote:
+    """Test class for procesar_lote."""
+
+    @pytest.fixture
+    def repository(self, monkeypatch: pytest.MonkeyPatch) -> FakeRepository:
+        """Repositorio falso con dos consultas reclamadas que terminan en 422."""
+        repository = FakeRepository()
+        monkeypatch.setattr(consultas, "AfiliadoService", FakeAfiliadoService)
+        monkeypatch.setattr(consultas, "get_database_config", FakeDatabaseConfig)
+        monkeypatch.setattr(consultas, "ConsultaJobRepository", lambda _: repository)
+        monkeypatch.setattr(
+            FakeAfiliadoService, "status_code", status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+        for item_id in (1, 2):
+            item = ConsultaJobItem(job_id=None, posicion=0, consulta=CONSULTA)  # type: ignore
+            item.id = item_id
+            item.intentos = 1
+            repository.items.append(item)
+        return repository
+
+    def test_reclama_sin_intentos_agotados(self, repository: FakeRepository) -> None:
+        """El reclamo y el descarte usan el máximo de intentos configurado."""
+        settings = Settings(
+            jobs_batch_size=7, jobs_lease_seconds=30, jobs_max_attempts=4
+        )
+        assert asyncio.run(procesar_lote(settings)) == 2  # noqa: PLR2004
+        assert repository.reclamo == {
+            "descartar": 4,
+            "limite": 7,
+            "lease": 30,
+            "max_intentos": 4,
+        }
+
+    def test_salta_las_consultas_de_otro_worker(
+        self, repository: FakeRepository
+    ) -> None:
+        """Una consulta cuyo lease no se pudo renovar no se procesa."""
+        repository.ajenas = {1}
+        asyncio.run(procesar_lote(Settings()))
+        assert len(repository.finalizados) == 1
@@ -0,0 +1,219 @@
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import json
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import httpx
+import pytest
+
+from app.jobs import notificaciones
+from app.jobs.notificaciones import (
+    CABECERA_FIRMA,
+    _entregar,
+    _registrar_resultado,
+    armar_envio,
+    evento_sse,
+    stream_sse,
+)
+from app.models.suscripcion import Notificacion, Suscripcion
+from tools.config import Settings
+
+EVENTO = {"numero_documento": "12345678", "cambios": {"Estado": "INACTIVO"}}
+
+
+def _notificacion(id_: int, intentos: int = 1) -> Notificacion:
+    return Notificacion(
+        id=id_,
+        suscripcion_id=uuid.uuid4(),
+        canal="webhook",
+        evento=EVENTO,
+        intentos=intentos,
+    )
+
+
+class FakeRepository:
+    """Repositorio falso que registra el resultado de cada entrega."""
+
+    def __init__(self) -> None:
+        """Inicializa los registros."""
+        self.enviadas: list[int] = []
+        self.reintentos: dict[int, float] = {}
+        self.descartadas: list[int] = []
+
+    def marcar_enviadas(self, ids: list[int]) -> None:
+        """Registra las entregas exitosas."""
+        self.enviadas += ids
+
+    def reintentar(self, ids: list[int], espera: float, error: str) -> None:  # noqa: ARG002
+        """Registra los reintentos."""
+        self.reintentos.update(dict.fromkeys(ids, espera))
+
+    def descartar(self, ids: list[int], error: str) -> None:  # noqa: ARG002
+        """Registra las entregas descartadas."""
+        self.descartadas += ids
+
+
+class TestArmarEnvio:
+    """Test class for armar_envio."""
+
+    def test_lote_firmado(self) -> None:
+        """Los eventos de la suscripción van juntos y firmados con HMAC."""
+        suscripcion = Suscripcion(
+            numero_documento="12345678",
+            webhook_url="http://cliente/hook",
+            secreto="0123456789abcdef",
+        )
+        cuerpo, cabeceras = armar_envio(
+            suscripcion, [_notificacion(1), _notificacion(2)]
+        )
+        datos = json.loads(cuerpo)
+        assert [evento["id"] for evento in datos["eventos"]] == [1, 2]
+        esperada = hmac.new(b"0123456789abcdef", cuerpo, hashlib.sha256).hexdigest()
+        assert cabeceras[CABECERA_FIRMA] == f"sha256={esperada}"
+
+    def test_sin_secreto(self) -> None:
+        """Sin secreto no se agrega la firma."""
+        suscripcion = Suscripcion(numero_documento="1", webhook_url="http://c")
+        _, cabeceras = armar_envio(suscripcion, [_notificacion(1)])
+        assert CABECERA_FIRMA not in cabeceras
+
+
+class TestRegistrarResultado:
+    """Test class for _registrar_resultado."""
+
+    settings = Settings(webhook_max_attempts=3, webhook_retry_backoff=10)
+
+    def test_exito(self) -> None:
+        """Una entrega exitosa marca todo el lote como enviado."""
+        repository = FakeRepository()
+        _registrar_resultado(
+            repository,  # type: ignore
+            [_notificacion(1), _notificacion(2)],
+            None,
+            self.settings,
+        )
+        assert repository.enviadas == [1, 2]
+
+    def test_fallo(self) -> None:
+        """Una falla reintenta con espera exponencial hasta agotar intentos."""
+        repository = FakeRepository()
+        _registrar_resultado(
+            repository,  # type: ignore
+            [_notificacion(1, intentos=2), _notificacion(2, intentos=3)],
+            "HTTP 500",
+            self.settings,
+        )
+        assert repository.reintentos == {1: 20}
+        assert repository.descartadas == [2]
+
+
+class TestEventoSse:
+    """Test class for evento_sse."""
+
+    def test_formato(self) -> None:
+        """El evento lleva id (para Last-Event-ID), tipo y datos JSON."""
+        lineas = evento_sse(_notificacion(7)).split("\n")
+        assert lineas[:2] == ["id: 7", "event: afiliado"]
+        assert json.loads(lineas[2].removeprefix("data: "))["id"] == 7  # noqa: PLR2004
+        assert lineas[3:] == ["", ""]
+
+
+class TestEntregar:
+    """Test class for _entregar."""
+
+    def _entregar(self, url: str) -> tuple[str | None, list[httpx.Request]]:
+        enviadas: list[httpx.Request] = []
+
+        def responder(request: httpx.Request) -> httpx.Response:
+            enviadas.append(request)
+            return httpx.Response(204)
+
+        async def entregar() -> str | None:
+            transport = httpx.MockTransport(responder)
+            async with httpx.AsyncClient(transport=transport) as cliente:
+                suscripcion = Suscripcion(numero_documento="1", webhook_url=url)
+                return await _entregar(cliente, suscripcion, [_notificacion(1)])
+
+        return asyncio.run(entregar()), enviadas
+
+    def test_conecta_a_la_direccion_validada(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """La conexión va a la IP resuelta, con el host en Host y en el SNI."""
+        monkeypatch.setattr(
+            notificaciones,
+            "resolver",
+            lambda *_: [ipaddress.ip_address("93.184.216.34")],
+        )
+        error, (request,) = self._entregar("https://cliente.example:8443/hook")
+        assert error is None
+        assert str(request.url) == "https://93.184.216.34:8443/hook"
+        assert request.headers["Host"] == "cliente.example:8443"
+        assert request.extensions["sni_hostname"] == "cliente.example"
+
+    def test_destino_interno(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Si el host pasó a resolver a una dirección interna no se envía."""
+
+        def resolver(host: str, _puerto: int) -> list:
+            message = f"{host} resuelve a una dirección interna"
+            raise ValueError(message)
+
+        monkeypatch.setattr(notificaciones, "resolver", resolver)
+        error, enviadas = self._entregar("https://cliente.example/hook")
+        assert error is not None
+        assert error.startswith("Destino rechazado")
+        assert enviadas == []
+
+    def test_http(self) -> None:
+        """Una suscripción antigua con URL http no recibe entregas."""
+        error, enviadas = self._entregar("http://cliente.example/hook")
+        assert error is not None
+        assert "https" in error
+        assert enviadas == []
+
+
+class TestStreamSse:
+    """Test class for stream_sse."""
+
+    def test_marca_despues_de_enviar(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Los eventos se marcan enviados recién después de entregarlos."""
+        repository = FakeRepository()
+        pendientes = [[_notificacion(1), _notificacion(2)], []]
+
+        class Repositorio:
+            def __init__(self, _session: object) -> None:
+                pass
+
+            def pendientes_sse(self, *_: object) -> list[Notificacion]:
+                return pendientes.pop(0) if pendientes else []
+
+            def marcar_enviadas(self, ids: list[int]) -> None:
+                repository.marcar_enviadas(ids)
+
+        class DatabaseConfig:
+            @contextmanager
+            def get_session_context(self) -> Iterator[None]:
+                yield None
+
+        monkeypatch.setattr(notificaciones, "SuscripcionRepository", Repositorio)
+        monkeypatch.setattr(notificaciones, "get_database_config", DatabaseConfig)
+
+        async def desconectado() -> bool:
+            return False
+
+        async def leer() -> None:
+            stream = stream_sse(uuid.uuid4(), None, desconectado)
+            assert (await anext(stream)).startswith("id: 1")
+            assert repository.enviadas == []
+            assert (await anext(stream)).startswith("id: 2")
+            assert repository.enviadas == []
+            # Al pedir el siguiente, los dos anteriores ya se enviaron
+            await asyncio.wait_for(anext(stream), 0.1)
+
+        with pytest.raises(TimeoutError):
+            asyncio.run(leer())
+        assert repository.enviadas == [1, 2]
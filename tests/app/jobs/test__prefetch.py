@@ -0,0 +1,58 @@
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+from app.jobs.prefetch import Checkpoint, PrefetchArgs, leer_documentos
+
+
+class TestLeerDocumentos:
+    """Test class for leer_documentos."""
+
+    def test_csv(self, tmp_path: Path) -> None:
+        """Lee documentos desde CSV con tipo por defecto."""
+        archivo = tmp_path / "citas.csv"
+        archivo.write_text(
+            "nro_documento,tipo_documento\n 12345678 ,\n87654321,3\n",
+            encoding="utf-8",
+        )
+        args = PrefetchArgs(archivo=archivo, dni="46118717")
+        consultas = list(leer_documentos(args))
+        assert [c.nro_documento for c in consultas] == ["12345678", "87654321"]
+        assert [c.tipo_documento for c in consultas] == ["1", "3"]
+        assert all(c.usuario == "prefetch" for c in consultas)
+
+    def test_ndjson(self, tmp_path: Path) -> None:
+        """Lee documentos desde NDJSON ignorando líneas vacías."""
+        archivo = tmp_path / "citas.ndjson"
+        archivo.write_text(
+            '{"nro_documento": "12345678", "opcion": 2}\n\n', encoding="utf-8"
+        )
+        args = PrefetchArgs(archivo=archivo, dni="46118717")
+        (consulta,) = leer_documentos(args)
+        assert consulta.opcion == 2  # noqa: PLR2004
+
+    def test_descarta_invalidos(self, tmp_path: Path) -> None:
+        """Las filas con documentos inválidos se omiten sin detener la lectura."""
+        archivo = tmp_path / "citas.csv"
+        archivo.write_text(
+            "nro_documento,tipo_documento\n123456789,1\n1234567,\n", encoding="utf-8"
+        )
+        args = PrefetchArgs(archivo=archivo, dni="46118717")
+        assert [c.nro_documento for c in leer_documentos(args)] == ["01234567"]
+
+    def test_requiere_un_origen(self) -> None:
+        """Exige exactamente un origen de documentos."""
+        with pytest.raises(ValidationError):
+            PrefetchArgs(dni="46118717")
+
+
+class TestCheckpoint:
+    """Test class for Checkpoint."""
+
+    def test_reanudar(self, tmp_path: Path) -> None:
+        """El avance se conserva entre ejecuciones."""
+        path = tmp_path / "avance.txt"
+        Checkpoint(path).marcar("1:12345678")
+        assert "1:12345678" in Checkpoint(path)
+        assert "1:87654321" not in Checkpoint(path)
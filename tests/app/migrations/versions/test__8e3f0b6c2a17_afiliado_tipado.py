@@ -0,0 +1,127 @@
+import importlib.util
+import os
+from collections.abc import Generator
+from datetime import date
+from pathlib import Path
+from types import ModuleType, SimpleNamespace
+
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import Connection, create_engine, text
+
+from app.models.afiliado import parsear_fecha
+
+MIGRACION = (
+    Path(__file__).parents[4]
+    / "app/migrations/versions/8e3f0b6c2a17_afiliado_tipado.py"
+)
+
+# Valores de FecCaducidad guardados como texto antes de la migración
+FECHAS = [
+    "20250131",
+    " 20250131 ",
+    "31/01/2025 10:30",
+    "2025-01-31T00:00:00",
+    "20231399",
+    "31/02/2023",
+    "2023-02-30",
+    "00000101",
+    "sin fecha",
+]
+
+
+def _cargar_migracion() -> ModuleType:
+    spec = importlib.util.spec_from_file_location("afiliado_tipado", MIGRACION)
+    assert spec is not None
+    assert spec.loader is not None
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+@pytest.fixture
+def migracion() -> ModuleType:
+    """Módulo de la migración 8e3f0b6c2a17."""
+    return _cargar_migracion()
+
+
+@pytest.fixture
+def connection(migracion: ModuleType) -> Generator[Connection]:
+    """Conexión a ``TEST_DATABASE_URL`` con ``afiliado`` aún sin tipar.
+
+    La tabla se crea en un esquema propio dentro de una transacción que se
+    deshace al terminar.
+    """
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL no está configurada")
+    engine = create_engine(url)
+    columnas = ", ".join(
+        f'"{columna}" VARCHAR' for columna in [*migracion.LONGITUDES, *migracion.FECHAS]
+    )
+    with engine.connect() as connection, connection.begin() as transaction:
+        connection.execute(text("CREATE SCHEMA prueba_migracion"))
+        connection.execute(text("SET LOCAL search_path TO prueba_migracion"))
+        connection.execute(
+            text(f"CREATE TABLE afiliado (id SERIAL PRIMARY KEY, {columnas})")
+        )
+        for fecha in FECHAS:
+            connection.execute(
+                text('INSERT INTO afiliado ("FecCaducidad") VALUES (:fecha)'),
+                {"fecha": fecha},
+            )
+        try:
+            with Operations.context(MigrationContext.configure(connection)):
+                yield connection
+        finally:
+            transaction.rollback()
+    engine.dispose()
+
+
+class TestAfiliadoTipado:
+    """Test class for the afiliado type migration (requires TEST_DATABASE_URL)."""
+
+    def test_fechas_inexistentes_se_cuentan(
+        self, migracion: ModuleType, connection: Connection
+    ) -> None:
+        """Las fechas con forma válida pero inexistentes cuentan como pérdida."""
+        connection.execute(text(migracion.FUNCION_FECHA))
+        assert migracion._contar_perdidas() == {"FecCaducidad": 5}  # noqa: SLF001
+
+    def test_sin_permiso_se_detiene(
+        self,
+        migracion: ModuleType,
+        connection: Connection,  # noqa: ARG002
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Sin ``permitir_perdida`` la migración se detiene antes de alterar."""
+        monkeypatch.setattr(
+            migracion,
+            "context",
+            SimpleNamespace(get_x_argument=lambda **_: {}),
+        )
+        with pytest.raises(RuntimeError, match="5 valores"):
+            migracion.upgrade()
+
+    def test_fechas_inexistentes_quedan_nulas(
+        self,
+        migracion: ModuleType,
+        connection: Connection,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """La migración no aborta y convierte igual que ``parsear_fecha``."""
+        monkeypatch.setattr(
+            migracion,
+            "context",
+            SimpleNamespace(get_x_argument=lambda **_: {"permitir_perdida": "1"}),
+        )
+        migracion.upgrade()
+
+        fechas = list(
+            connection.execute(
+                text('SELECT "FecCaducidad" FROM afiliado ORDER BY id')
+            ).scalars()
+        )
+        assert fechas == [parsear_fecha(fecha) for fecha in FECHAS]
+        assert fechas[:4] == [date(2025, 1, 31)] * 4
@@ -0,0 +1,107 @@
+from datetime import date
+
+import pytest
+
+from app.models.afiliado import Afiliado, AfiliadoPublico, parsear_fecha
+
+
+class TestParsearFecha:
+    """Test class for parsear_fecha."""
+
+    @pytest.mark.parametrize(
+        "valor",
+        [
+            "20250131",
+            " 20250131 ",
+            "31/01/2025",
+            "31/01/2025 10:30",
+            "2025-01-31",
+            "2025-01-31T00:00:00",
+        ],
+    )
+    def test_formatos(self, valor: str) -> None:
+        """Acepta los formatos de fecha del SIS."""
+        assert parsear_fecha(valor) == date(2025, 1, 31)
+
+    @pytest.mark.parametrize(
+        "valor",
+        [None, "", "  ", "sin fecha", "2025131", "20231399", "31/02/2023", "00000101"],
+    )
+    def test_invalidas(self, valor: str | None) -> None:
+        """Las fechas vacías, desconocidas o inexistentes se guardan como NULL."""
+        assert parsear_fecha(valor) is None
+
+
+class TestAfiliadoDesdeSis:
+    """Test class for Afiliado.desde_sis."""
+
+    def test_conversion(self) -> None:
+        """Convierte fechas, limpia y recorta textos e ignora campos extra."""
+        afiliado = Afiliado.desde_sis(
+            {
+                "IdError": "0",
+                "NroDocumento": " 12345678 ",
+                "FecCaducidad": "31/12/2025",
+                "Genero": "1",
+                "ApePaterno": "A" * 150,
+                "MsgConfidencial": "",
+                "CampoNuevo": "x",
+            }
+        )
+        assert afiliado.NroDocumento == "12345678"
+        assert afiliado.FecCaducidad == date(2025, 12, 31)
+        assert afiliado.ApePaterno == "A" * 100
+        assert afiliado.MsgConfidencial is None
+        assert "CampoNuevo" not in afiliado.model_dump()
+
+
+class TestAfiliadoHash:
+    """Test class for Afiliado.calcular_hash."""
+
+    def test_hash_estable(self) -> None:
+        """El mismo contenido produce el mismo hash aunque varíen espacios."""
+        a = Afiliado.desde_sis({"NroDocumento": "12345678", "Estado": "ACTIVO"})
+        b = Afiliado.desde_sis({"NroDocumento": " 12345678", "Estado": "ACTIVO "})
+        assert a.ContentHash is not None
+        assert a.ContentHash == b.ContentHash
+
+    def test_hash_cambia(self) -> None:
+        """Un cambio de contenido cambia el hash."""
+        a = Afiliado.desde_sis({"NroDocumento": "12345678", "Estado": "ACTIVO"})
+        b = Afiliado.desde_sis({"NroDocumento": "12345678", "Estado": "INACTIVO"})
+        assert a.ContentHash != b.ContentHash
+
+    def test_hash_ignora_metadatos(self) -> None:
+        """Los metadatos locales no forman parte del hash."""
+        a = Afiliado.desde_sis({"NroDocumento": "12345678"})
+        hash_original = a.calcular_hash({})
+        a.id = 10
+        assert a.calcular_hash({}) == hash_original
+
+    def test_hash_incluye_descripciones(self) -> None:
+        """Las descripciones no se guardan en la fila pero sí cuentan en el hash."""
+        a = Afiliado.desde_sis({"EESS": "1", "DescEESS": "HOSPITAL A"})
+        b = Afiliado.desde_sis({"EESS": "1", "DescEESS": "HOSPITAL B"})
+        assert a.ContentHash != b.ContentHash
+        assert "DescEESS" not in a.model_dump()
+
+
+class TestAfiliadoPublico:
+    """Test class for AfiliadoPublico."""
+
+    def test_registro_y_descripciones(self) -> None:
+        """Separa la fila del afiliado de las descripciones de los catálogos."""
+        publico = AfiliadoPublico.desde_sis(
+            {"NroDocumento": "12345678", "EESS": "1", "DescEESS": " HOSPITAL "}
+        )
+        assert publico.descripciones() == {
+            "DescEESS": "HOSPITAL",
+            "DescEESSUbigeo": None,
+            "DescTipoSeguro": None,
+        }
+        registro = publico.registro()
+        assert registro.EESS == "1"
+        assert registro.ContentHash == publico.ContentHash
+        # El upsert no debe pisar los metadatos locales
+        assert "id" not in registro.model_fields_set
+        assert "CreatedAt" not in registro.model_fields_set
@@ -0,0 +1,56 @@
+from app.models.consulta_job import (
+    ConsultaJob,
+    ConsultaJobEstado,
+    ConsultaJobItem,
+    EstadoItem,
+)
+
+
+def _items(job: ConsultaJob, *estados: EstadoItem) -> list[ConsultaJobItem]:
+    return [
+        ConsultaJobItem(
+            job_id=job.id,
+            posicion=posicion,
+            consulta={"nro_documento": f"0000000{posicion}"},
+            estado=estado,
+        )
+        for posicion, estado in enumerate(estados)
+    ]
+
+
+class TestConsultaJobEstado:
+    """Test class for ConsultaJobEstado."""
+
+    def test_pendiente(self) -> None:
+        """Un job recién encolado está pendiente."""
+        job = ConsultaJob(total=2)
+        estado = ConsultaJobEstado.desde_items(
+            job, _items(job, EstadoItem.PENDIENTE, EstadoItem.PENDIENTE)
+        )
+        assert estado.estado == EstadoItem.PENDIENTE
+        assert estado.pendientes == 2  # noqa: PLR2004
+        assert [r.nro_documento for r in estado.resultados] == [
+            "00000000",
+            "00000001",
+        ]
+
+    def test_en_proceso(self) -> None:
+        """Mientras alguna consulta no terminó el job sigue en proceso."""
+        job = ConsultaJob(total=3)
+        estado = ConsultaJobEstado.desde_items(
+            job, _items(job, EstadoItem.OK, EstadoItem.ERROR, EstadoItem.PENDIENTE)
+        )
+        assert estado.estado == EstadoItem.EN_PROCESO
+        assert (estado.completadas, estado.con_error, estado.pendientes) == (1, 1, 1)
+
+    def test_terminado(self) -> None:
+        """Al terminar, el job queda con error si alguna consulta falló."""
+        job = ConsultaJob(total=2)
+        ok = ConsultaJobEstado.desde_items(
+            job, _items(job, EstadoItem.OK, EstadoItem.OK)
+        )
+        error = ConsultaJobEstado.desde_items(
+            job, _items(job, EstadoItem.OK, EstadoItem.ERROR)
+        )
+        assert ok.estado == EstadoItem.OK
+        assert error.estado == EstadoItem.ERROR
@@ -0,0 +1,62 @@
+from app.models.afiliado import CAMPOS_LOCALES, Afiliado
+from app.repositories.afiliado_historial_repository import (
+    AfiliadoHistorialRepository,
+)
+
+
+class FakeSession:
+    """Sesión falsa que solo acumula los objetos agregados."""
+
+    def __init__(self) -> None:
+        """Inicializa la lista de objetos."""
+        self.agregados: list[object] = []
+
+    def add(self, objeto: object) -> None:
+        """Registra el objeto agregado."""
+        self.agregados.append(objeto)
+
+
+class TestAfiliadoHistorialRepository:
+    """Test class for AfiliadoHistorialRepository."""
+
+    def setup_method(self) -> None:
+        """Crea el repositorio sobre una sesión falsa."""
+        self.session = FakeSession()
+        self.repository = AfiliadoHistorialRepository(self.session)  # type: ignore
+
+    def test_version_completa(self) -> None:
+        """Sin versión anterior se guarda la ficha completa sin valores vacíos."""
+        afiliado = Afiliado.desde_sis({"NroDocumento": "12345678", "Estado": "A"})
+        historial = self.repository.registrar(afiliado)
+        assert historial is not None
+        assert historial.completo
+        assert historial.cambios == {"NroDocumento": "12345678", "Estado": "A"}
+        assert historial.content_hash == afiliado.ContentHash
+        assert self.session.agregados == [historial]
+
+    def test_delta(self) -> None:
+        """Con versión anterior solo se guardan los campos que cambiaron."""
+        anterior = Afiliado.desde_sis(
+            {"NroDocumento": "12345678", "Estado": "A", "FecCaducidad": "20250101"}
+        )
+        nuevo = Afiliado.desde_sis(
+            {"NroDocumento": "12345678", "Estado": "A", "FecCaducidad": "20260101"}
+        )
+        historial = self.repository.registrar(
+            nuevo, anterior.model_dump(mode="json", exclude=CAMPOS_LOCALES)
+        )
+        assert historial is not None
+        assert not historial.completo
+        assert historial.cambios == {"FecCaducidad": "2026-01-01"}
+
+    def test_sin_cambios(self) -> None:
+        """Si solo cambió una descripción de catálogo no se agrega versión."""
+        datos = {"NroDocumento": "12345678", "EESS": "0001", "DescEESS": "POSTA"}
+        anterior = Afiliado.desde_sis(datos)
+        nuevo = Afiliado.desde_sis({**datos, "DescEESS": "CENTRO DE SALUD"})
+        assert nuevo.ContentHash != anterior.ContentHash
+        historial = self.repository.registrar(
+            nuevo, anterior.model_dump(mode="json", exclude=CAMPOS_LOCALES)
+        )
+        assert historial is None
+        assert self.session.agregados == []
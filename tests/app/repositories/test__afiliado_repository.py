@@ -0,0 +1,158 @@
+from collections.abc import Generator
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.models.afiliado import Afiliado
+from app.models.afiliado_historial import AfiliadoHistorial
+from app.models.suscripcion import CanalSuscripcion, Notificacion, Suscripcion
+from app.repositories.afiliado_repository import AfiliadoRepository
+
+DATOS = {
+    "NroDocumento": "12345678",
+    "ApePaterno": "QUISPE",
+    "Nombres": "JUAN",
+    "Estado": "A",
+    "FecCaducidad": "20250101",
+}
+
+
+@pytest.fixture
+def session() -> Generator[Session]:
+    """Sesión sobre una base en memoria con las tablas del *upsert*."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(
+        engine,
+        tables=[
+            Afiliado.__table__,  # type: ignore
+            AfiliadoHistorial.__table__,  # type: ignore
+            Suscripcion.__table__,  # type: ignore
+            Notificacion.__table__,  # type: ignore
+        ],
+    )
+    with Session(engine) as session:
+        yield session
+
+
+def _guardar(session: Session, datos: dict) -> Afiliado:
+    afiliado = AfiliadoRepository(session).guardar_o_actualizar(
+        Afiliado.desde_sis(datos)
+    )
+    session.commit()
+    return afiliado
+
+
+def _historial(session: Session) -> list[AfiliadoHistorial]:
+    statement = select(AfiliadoHistorial).order_by(AfiliadoHistorial.id)  # type: ignore
+    return list(session.exec(statement).all())
+
+
+class TestGuardarOActualizar:
+    """Test class for AfiliadoRepository.guardar_o_actualizar."""
+
+    def test_hash_igual_solo_actualiza_verificacion(self, session: Session) -> None:
+        """Con el mismo hash la única escritura es ``VerifiedAt``."""
+        guardado = _guardar(session, DATOS)
+        verificado = guardado.VerifiedAt
+        sentencias: list[str] = []
+
+        def registrar(*args: object) -> None:
+            sentencias.append(str(args[2]))
+
+        event.listen(session.get_bind(), "before_cursor_execute", registrar)
+        try:
+            actualizado = _guardar(session, DATOS)
+        finally:
+            event.remove(session.get_bind(), "before_cursor_execute", registrar)
+
+        escrituras = [s for s in sentencias if not s.lstrip().startswith("SELECT")]
+        assert len(escrituras) == 1
+        assert escrituras[0].startswith('UPDATE afiliado SET "VerifiedAt"=?')
+        assert actualizado.id == guardado.id
+        assert actualizado.VerifiedAt is not None
+        assert verificado is not None
+        assert actualizado.VerifiedAt >= verificado
+        assert len(_historial(session)) == 1
+
+    def test_hash_distinto_reescribe_la_fila(self, session: Session) -> None:
+        """Con otro hash se reescriben los campos y se guarda el nuevo hash."""
+        guardado = _guardar(session, DATOS)
+        hash_anterior = guardado.ContentHash
+        nuevo = Afiliado.desde_sis({**DATOS, "FecCaducidad": "20260101"})
+
+        actualizado = _guardar(session, {**DATOS, "FecCaducidad": "20260101"})
+
+        assert actualizado.id == guardado.id
+        assert actualizado.ContentHash == nuevo.ContentHash != hash_anterior
+        fila = session.exec(select(Afiliado)).one()
+        assert fila.FecCaducidad is not None
+        assert fila.FecCaducidad.isoformat() == "2026-01-01"
+        assert fila.ContentHash == nuevo.ContentHash
+
+
+class TestHistorialDelUpsert:
+    """Test class for the history written by guardar_o_actualizar."""
+
+    def test_alta_guarda_la_ficha_completa(self, session: Session) -> None:
+        """El primer guardado registra la versión completa."""
+        guardado = _guardar(session, DATOS)
+        (version,) = _historial(session)
+        assert version.completo
+        assert version.numero_documento == "12345678"
+        assert version.content_hash == guardado.ContentHash
+        assert version.cambios == {
+            "NroDocumento": "12345678",
+            "ApePaterno": "QUISPE",
+            "Nombres": "JUAN",
+            "Estado": "A",
+            "FecCaducidad": "2025-01-01",
+        }
+
+    def test_cambio_guarda_solo_el_delta(self, session: Session) -> None:
+        """Un cambio registra solo los campos que cambiaron, con el nuevo hash."""
+        _guardar(session, DATOS)
+        actualizado = _guardar(
+            session, {**DATOS, "Estado": "B", "FecCaducidad": "20260101"}
+        )
+        _, version = _historial(session)
+        assert not version.completo
+        assert version.content_hash == actualizado.ContentHash
+        assert version.cambios == {"Estado": "B", "FecCaducidad": "2026-01-01"}
+
+    def test_sin_cambios_no_registra_version(self, session: Session) -> None:
+        """Volver a guardar el mismo contenido no agrega versiones."""
+        _guardar(session, DATOS)
+        _guardar(session, DATOS)
+        _guardar(session, DATOS)
+        assert len(_historial(session)) == 1
+
+    def test_campo_vaciado(self, session: Session) -> None:
+        """Un campo que el SIS deja de enviar queda como nulo en el delta."""
+        _guardar(session, DATOS)
+        sin_nombres = {k: v for k, v in DATOS.items() if k != "Nombres"}
+        _guardar(session, {**sin_nombres, "Nombres": None})
+        _, version = _historial(session)
+        assert version.cambios == {"Nombres": None}
+
+
+class TestCambioDeDescripcion:
+    """Test class for upserts where only a catalog description changed."""
+
+    def test_sin_version_ni_notificacion(self, session: Session) -> None:
+        """Se guarda el nuevo hash, pero sin versión vacía ni evento."""
+        session.add(
+            Suscripcion(numero_documento="12345678", canal=CanalSuscripcion.SSE)
+        )
+        session.commit()
+        _guardar(session, {**DATOS, "EESS": "0001", "DescEESS": "POSTA"})
+        nuevo = Afiliado.desde_sis({**DATOS, "EESS": "0001", "DescEESS": "CENTRO"})
+
+        actualizado = _guardar(session, {**DATOS, "EESS": "0001", "DescEESS": "CENTRO"})
+
+        assert actualizado.ContentHash == nuevo.ContentHash
+        assert len(_historial(session)) == 1
+        assert len(session.exec(select(Notificacion)).all()) == 1
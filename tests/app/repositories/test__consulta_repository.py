@@ -0,0 +1,77 @@
+from collections.abc import Generator
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.models.consulta import Consulta
+from app.repositories.consulta_repository import ConsultaRepository
+
+TTLS = {"API-404": 900}
+
+
+@pytest.fixture
+def session() -> Generator[Session]:
+    """Sesión sobre una base en memoria con la tabla ``consulta``."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine, tables=[Consulta.__table__])  # type: ignore
+    with Session(engine) as session:
+        yield session
+
+
+def _consulta(
+    session: Session,
+    error_code: str | None,
+    hace: float = 0,
+    *,
+    es_local: bool = False,
+) -> Consulta:
+    consulta = Consulta(
+        numero_documento="12345678",
+        usuario="ana",
+        es_local=es_local,
+        error_code=error_code,
+        error_description=f"Error {error_code}",
+        created_at=datetime.now() - timedelta(seconds=hace),  # noqa: DTZ005
+    )
+    session.add(consulta)
+    session.commit()
+    return consulta
+
+
+class TestBuscarErrorReciente:
+    """Test class for ConsultaRepository.buscar_error_reciente."""
+
+    def test_error_vigente(self, session: Session) -> None:
+        """Encuentra el error más reciente dentro de su vigencia."""
+        _consulta(session, "API-404", hace=600)
+        reciente = _consulta(session, "API-404", hace=60)
+        error = ConsultaRepository(session).buscar_error_reciente("12345678", TTLS)
+        assert error is not None
+        assert error.id == reciente.id
+
+    def test_error_vencido(self, session: Session) -> None:
+        """Un error más antiguo que su TTL ya no se repite."""
+        _consulta(session, "API-404", hace=1000)
+        assert (
+            ConsultaRepository(session).buscar_error_reciente("12345678", TTLS) is None
+        )
+
+    def test_codigo_no_cacheable(self, session: Session) -> None:
+        """Solo cuentan los códigos con TTL configurado."""
+        _consulta(session, "API-422", hace=60)
+        _consulta(session, "API-504", hace=60)
+        assert (
+            ConsultaRepository(session).buscar_error_reciente("12345678", TTLS) is None
+        )
+
+    def test_respuesta_repetida_no_renueva(self, session: Session) -> None:
+        """Un error servido desde la caché no extiende la vigencia del original."""
+        _consulta(session, "API-404", hace=1000)
+        _consulta(session, "API-404", hace=10, es_local=True)
+        assert (
+            ConsultaRepository(session).buscar_error_reciente("12345678", TTLS) is None
+        )
@@ -0,0 +1,235 @@
+import asyncio
+from collections.abc import Generator
+from datetime import timedelta
+
+import pytest
+from result import Err, Ok
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, col, create_engine, select
+
+from app.api.exceptions import CustomExceptionCode
+from app.api.paginacion import codificar_cursor
+from app.api.requests import ConsultaAfiliadoRequest
+from app.models.afiliado import Afiliado
+from app.models.consulta import Consulta
+from app.services import afiliado_service
+from app.services.afiliado_service import AfiliadoService, get_ttls_negativos
+from tools.config import get_settings
+
+
+@pytest.fixture
+def service(monkeypatch: pytest.MonkeyPatch) -> Generator[AfiliadoService]:
+    """Servicio con algunos afiliados en una base en memoria, sin SIS."""
+    monkeypatch.setattr(afiliado_service, "SISService", lambda: None)
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine, tables=[Afiliado.__table__])  # type: ignore
+    with Session(engine) as session:
+        for nro, paterno, materno, nombres in [
+            ("00000001", "QUISPE", "MAMANI", "JUAN CARLOS"),
+            ("00000002", "QUISPE", "HUAMAN", "MARIA"),
+            ("00000003", "MAMANI", "QUISPE", "ROSA"),
+            ("00000004", "TORRES", None, "JUAN"),
+            ("00000005", "QUI%PE", "LOPEZ", "ANA"),
+        ]:
+            session.add(
+                Afiliado(
+                    NroDocumento=nro,
+                    ApePaterno=paterno,
+                    ApeMaterno=materno,
+                    Nombres=nombres,
+                )
+            )
+        session.commit()
+        yield AfiliadoService(session)
+
+
+def _buscar(service: AfiliadoService, *args: object) -> list[str | None]:
+    busqueda = asyncio.run(service.buscar_por_nombre(*args)).unwrap()  # type: ignore
+    return [resumen.NroDocumento for resumen in busqueda.resultados]
+
+
+class TestTtlsNegativos:
+    """Test class for get_ttls_negativos."""
+
+    def teardown_method(self) -> None:
+        """Limpia la caché de configuración entre pruebas."""
+        get_settings.cache_clear()
+        get_ttls_negativos.cache_clear()
+
+    def test_por_defecto(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Por defecto se cachean los documentos no encontrados 15 minutos."""
+        monkeypatch.delenv("NEGATIVE_CACHE_TTLS", raising=False)
+        get_settings.cache_clear()
+        get_ttls_negativos.cache_clear()
+        assert get_ttls_negativos() == {"API-404": 900}
+
+    def test_fallas_de_transporte_no_se_cachean(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Los faults, errores de conexión y otros IdError se ignoran."""
+        monkeypatch.setenv(
+            "NEGATIVE_CACHE_TTLS", "API-404=60,API-422=60, API-504=60,API-503=60"
+        )
+        get_settings.cache_clear()
+        get_ttls_negativos.cache_clear()
+        assert get_ttls_negativos() == {"API-404": 60}
+
+
+class TestBuscarPorNombre:
+    """Test class for AfiliadoService.buscar_por_nombre."""
+
+    def test_todos_los_terminos(self, service: AfiliadoService) -> None:
+        """Cada palabra debe aparecer en el nombre, sin importar mayúsculas."""
+        assert _buscar(service, "quispe mamani") == ["00000003", "00000001"]
+        assert _buscar(service, "juan") == ["00000001", "00000004"]
+
+    def test_comodines_literales(self, service: AfiliadoService) -> None:
+        """Los comodines de LIKE del texto se buscan literalmente."""
+        assert _buscar(service, "qui%pe") == ["00000005"]
+
+    def test_paginacion(self, service: AfiliadoService) -> None:
+        """El cursor ``siguiente`` continúa donde terminó la página."""
+        primera = asyncio.run(service.buscar_por_nombre("quispe", 2)).unwrap()
+        assert len(primera.resultados) == 2  # noqa: PLR2004
+        assert primera.siguiente is not None
+        segunda = asyncio.run(
+            service.buscar_por_nombre("quispe", 2, primera.siguiente)
+        ).unwrap()
+        assert len(segunda.resultados) == 1
+        assert segunda.siguiente is None
+        vistos = {r.NroDocumento for r in [*primera.resultados, *segunda.resultados]}
+        assert vistos == {"00000001", "00000002", "00000003"}
+
+    @pytest.mark.parametrize(
+        ("texto", "despues"),
+        [
+            ("de la", None),
+            ("quispe", "no-es-un-cursor"),
+            ("quispe", codificar_cursor(42, "QUISPE")),
+        ],
+    )
+    def test_invalida(
+        self, service: AfiliadoService, texto: str, despues: str | None
+    ) -> None:
+        """Sin términos útiles o con un cursor inválido responde BUS-422."""
+        match asyncio.run(service.buscar_por_nombre(texto, 20, despues)):
+            case Err((error_code, status_code, _)):
+                assert error_code == CustomExceptionCode.BUSQUEDA_INVALIDA
+                assert status_code == 422  # noqa: PLR2004
+            case Ok(_):
+                pytest.fail("La búsqueda debía rechazarse")
+
+
+class FakeSIS:
+    """SIS falso que siempre responde el mismo error y cuenta las llamadas."""
+
+    def __init__(
+        self, error_code: CustomExceptionCode, session: Session | None = None
+    ) -> None:
+        """Inicializa el error a responder."""
+        self.error_code = error_code
+        self.session = session
+        self.llamadas = 0
+        self.en_transaccion: list[bool] = []
+
+    async def consultar_afiliado(self, _consulta: ConsultaAfiliadoRequest) -> Err:
+        """Responde el error como lo haría el SIS."""
+        self.llamadas += 1
+        if self.session is not None:
+            self.en_transaccion.append(self.session.in_transaction())
+        return Err((self.error_code, 422, "No se encontraron datos"))
+
+
+@pytest.fixture
+def session(monkeypatch: pytest.MonkeyPatch) -> Generator[Session]:
+    """Sesión sobre una base en memoria con afiliados y consultas."""
+    monkeypatch.setattr(afiliado_service, "SISService", lambda: None)
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(
+        engine,
+        tables=[Afiliado.__table__, Consulta.__table__],  # type: ignore
+    )
+    with Session(engine) as session:
+        yield session
+
+
+CONSULTA = ConsultaAfiliadoRequest(
+    opcion=1,
+    dni="12345678",
+    tipo_documento="1",
+    nro_documento="87654321",
+    usuario="ana",
+)
+
+
+def _consultar(session: Session, sis: FakeSIS) -> tuple[object, int, str | None]:
+    service = AfiliadoService(session)
+    service.sis_service = sis  # type: ignore
+    service.ttls_negativos = {"API-404": 900}
+    match asyncio.run(service.consultar_afiliado(None, CONSULTA)):
+        case Err(error):
+            return error
+        case Ok(_):
+            pytest.fail("La consulta debía fallar")
+
+
+def _envejecer(session: Session, segundos: float) -> None:
+    """Mueve hacia atrás la fecha de todas las consultas registradas."""
+    for consulta in session.exec(select(Consulta)):
+        consulta.created_at -= timedelta(seconds=segundos)
+        session.add(consulta)
+    session.commit()
+
+
+class TestCacheNegativa:
+    """Test class for the negative cache of AfiliadoService.consultar_afiliado."""
+
+    def test_repite_documento_no_encontrado(self, session: Session) -> None:
+        """Un API-404 reciente se repite sin volver a llamar al SIS."""
+        sis = FakeSIS(CustomExceptionCode.AFILIADO_NO_ENCONTRADO)
+        primero = _consultar(session, sis)
+        repetido = _consultar(session, sis)
+
+        assert sis.llamadas == 1
+        assert repetido == primero
+        assert repetido == (
+            CustomExceptionCode.AFILIADO_NO_ENCONTRADO,
+            422,
+            "No se encontraron datos",
+        )
+        locales = session.exec(select(Consulta.es_local).order_by(col(Consulta.id)))
+        assert list(locales) == [False, True]
+
+    def test_otros_errores_no_se_cachean(self, session: Session) -> None:
+        """Un API-422 genérico puede ser transitorio: se vuelve a consultar."""
+        sis = FakeSIS(CustomExceptionCode.BAD_RESPONSE)
+        _consultar(session, sis)
+        _consultar(session, sis)
+        assert sis.llamadas == 2  # noqa: PLR2004
+
+    def test_repetir_no_extiende_la_vigencia(self, session: Session) -> None:
+        """La vigencia cuenta desde la respuesta real del SIS."""
+        sis = FakeSIS(CustomExceptionCode.AFILIADO_NO_ENCONTRADO)
+        _consultar(session, sis)
+        _envejecer(session, 800)
+        _consultar(session, sis)
+        assert sis.llamadas == 1
+
+        # El original ya tiene 1000 s y la repetición 200 s
+        _envejecer(session, 200)
+        _consultar(session, sis)
+        assert sis.llamadas == 2  # noqa: PLR2004
+
+
+class TestTransaccionDuranteSIS:
+    """Test class for the database transaction while waiting for the SIS."""
+
+    def test_sin_transaccion_abierta(self, session: Session) -> None:
+        """Las lecturas de caché se confirman antes de llamar al SIS."""
+        sis = FakeSIS(CustomExceptionCode.BAD_RESPONSE, session)
+        _consultar(session, sis)
+        assert sis.en_transaccion == [False]
@@ -0,0 +1,94 @@
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, create_engine
+
+from app.database import DatabaseConfig
+from app.models.afiliado import Afiliado, AfiliadoPublico
+from app.models.catalogo import Eess, TipoSeguro, Ubigeo
+from app.repositories.catalogo_repository import CatalogoRepository
+from app.services import catalogos
+from app.services.catalogos import Catalogos
+
+
+@pytest.fixture
+def config() -> DatabaseConfig:
+    """Configuración con los catálogos en una base en memoria."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(
+        engine, tables=[Eess.__table__, Ubigeo.__table__, TipoSeguro.__table__]
+    )
+    config = DatabaseConfig()
+    config._engine = engine  # noqa: SLF001
+    return config
+
+
+@pytest.fixture
+def catalogo(monkeypatch: pytest.MonkeyPatch) -> Catalogos:
+    """Catálogos del proceso, reemplazados por unos vacíos."""
+    instancia = Catalogos(intervalo=3600)
+    monkeypatch.setattr(catalogos, "get_catalogos", lambda: instancia)
+    return instancia
+
+
+def _publico(descripcion: str) -> AfiliadoPublico:
+    return AfiliadoPublico.desde_sis(
+        {"EESS": "00006218", "DescEESS": descripcion, "TipoSeguro": "2"}
+    )
+
+
+class TestCatalogos:
+    """Test class for Catalogos."""
+
+    def test_registrar_y_describir(
+        self, config: DatabaseConfig, catalogo: Catalogos
+    ) -> None:
+        """Las descripciones nuevas se guardan y se aplican al confirmar."""
+        with config.get_session() as session:
+            catalogo.registrar(session, _publico("HOSPITAL DE HUAYCAN"))
+            assert catalogo.descripciones["DescEESS"] == {}
+            session.commit()
+        assert catalogo.descripciones["DescEESS"] == {"00006218": "HOSPITAL DE HUAYCAN"}
+
+        with config.get_session() as session:
+            publico = catalogo.describir(session, Afiliado(EESS="00006218"))
+        assert publico.DescEESS == "HOSPITAL DE HUAYCAN"
+        assert publico.DescTipoSeguro is None
+
+    def test_sin_cambios_no_escribe(
+        self, config: DatabaseConfig, catalogo: Catalogos
+    ) -> None:
+        """Una descripción ya conocida no vuelve a escribirse."""
+        catalogo.refrescar(config.get_session(), forzar=True)
+        catalogo.aplicar([("DescEESS", "00006218", "HOSPITAL DE HUAYCAN")])
+        with config.get_session() as session:
+            catalogo.registrar(session, _publico("HOSPITAL DE HUAYCAN"))
+            assert not session.info.get(catalogos.PENDIENTES)
+
+    def test_rollback_descarta(
+        self, config: DatabaseConfig, catalogo: Catalogos
+    ) -> None:
+        """Lo escrito en una transacción revertida no llega a memoria."""
+        with config.get_session() as session:
+            catalogo.registrar(session, _publico("HOSPITAL"))
+            session.rollback()
+        assert catalogo.descripciones["DescEESS"] == {}
+
+    def test_refrescar_ante_cambios(
+        self, config: DatabaseConfig, catalogo: Catalogos
+    ) -> None:
+        """Recarga cuando otro proceso modificó un catálogo."""
+        with config.get_session() as session:
+            catalogo.refrescar(session, forzar=True)
+            CatalogoRepository(session).guardar(Eess, "1", "HOSPITAL A")
+            session.commit()
+            catalogo.refrescar(session)
+            assert catalogo.descripciones["DescEESS"] == {}
+            catalogo.refrescar(session, forzar=True)
+        assert catalogo.descripciones["DescEESS"] == {"1": "HOSPITAL A"}
+
+        with config.get_session() as session:
+            CatalogoRepository(session).guardar(Eess, "1", "HOSPITAL B")
+            session.commit()
+            assert CatalogoRepository(session).listar(Eess) == {"1": "HOSPITAL B"}
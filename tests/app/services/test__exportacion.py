@@ -0,0 +1,263 @@
+import asyncio
+import csv
+import io
+import json
+import os
+import threading
+import time
+from collections.abc import AsyncIterator, Generator
+from datetime import date, datetime
+from typing import BinaryIO
+
+import pytest
+from sqlalchemy import Engine, text
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.models.consulta import Consulta
+from app.services.exportacion import (
+    CuposExportacion,
+    FormatoExportacion,
+    RespuestaExportacion,
+    TablaExportable,
+    exportar,
+    nombre_archivo,
+    stream_exportacion,
+)
+
+
+@pytest.fixture
+def engine() -> Engine:
+    """Crea una base en memoria con consultas de tres días."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine, tables=[Consulta.__table__])  # type: ignore
+    with Session(engine) as session:
+        for dia in (1, 2, 3):
+            session.add(
+                Consulta(
+                    numero_documento=f"0000000{dia}",
+                    usuario="ana",
+                    es_local=dia == 2,  # noqa: PLR2004
+                    created_at=datetime(2025, 3, dia, 23, 59),  # noqa: DTZ001
+                )
+            )
+        session.commit()
+    return engine
+
+
+def _exportar(engine: Engine, formato: FormatoExportacion, **filtros: date) -> bytes:
+    destino = io.BytesIO()
+    exportar(
+        destino, TablaExportable.CONSULTA, formato, engine=engine, lote=2, **filtros
+    )
+    return destino.getvalue()
+
+
+class TestExportar:
+    """Test class for exportar."""
+
+    def test_csv(self, engine: Engine) -> None:
+        """CSV con encabezado y todas las columnas de la tabla."""
+        filas = list(
+            csv.reader(io.StringIO(_exportar(engine, FormatoExportacion.CSV).decode()))
+        )
+        assert filas[0] == list(Consulta.model_fields)
+        assert [fila[1] for fila in filas[1:]] == ["00000001", "00000002", "00000003"]
+
+    def test_ndjson_con_periodo(self, engine: Engine) -> None:
+        """Los días de ``desde`` y ``hasta`` se incluyen completos."""
+        contenido = _exportar(
+            engine,
+            FormatoExportacion.NDJSON,
+            desde=date(2025, 3, 2),
+            hasta=date(2025, 3, 3),
+        )
+        filas = [json.loads(linea) for linea in contenido.splitlines()]
+        assert [f["numero_documento"] for f in filas] == ["00000002", "00000003"]
+        assert filas[0]["es_local"] is True
+        assert filas[0]["created_at"] == "2025-03-02T23:59:00"
+
+    def test_parquet(self, engine: Engine) -> None:
+        """Parquet con el esquema de la tabla, si pyarrow está instalado."""
+        pq = pytest.importorskip("pyarrow.parquet")
+        contenido = _exportar(engine, FormatoExportacion.PARQUET)
+        tabla = pq.read_table(io.BytesIO(contenido))
+        assert tabla.num_rows == 3  # noqa: PLR2004
+        assert tabla.column_names == list(Consulta.model_fields)
+
+    def test_nombre_archivo(self) -> None:
+        """El nombre sugerido refleja la tabla, el periodo y el formato."""
+        assert (
+            nombre_archivo(
+                TablaExportable.AFILIADO, FormatoExportacion.NDJSON, date(2025, 1, 1)
+            )
+            == "afiliado_desde-2025-01-01.ndjson"
+        )
+
+
+class _DestinoLento(io.BytesIO):
+    """Destino que tarda en aceptar cada bloque, como un cliente lento."""
+
+    def __init__(self, espera: float) -> None:
+        super().__init__()
+        self.espera = espera
+
+    def write(self, datos: object) -> int:  # type: ignore[override]
+        time.sleep(self.espera)
+        return super().write(datos)  # type: ignore
+
+
+@pytest.fixture
+def engine_postgres() -> Generator[Engine]:
+    """Motor de ``TEST_DATABASE_URL`` con consultas en un esquema temporal.
+
+    Las sesiones se abren con un ``idle_in_transaction_session_timeout`` de
+    300 ms, como el de los perfiles pero más corto.
+    """
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL no está configurada")
+    esquema = "prueba_exportacion"
+    engine = create_engine(
+        url,
+        connect_args={"options": "-c idle_in_transaction_session_timeout=300"},
+        execution_options={"schema_translate_map": {None: esquema}},
+    )
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {esquema} CASCADE"))
+        connection.execute(text(f"CREATE SCHEMA {esquema}"))
+    SQLModel.metadata.create_all(engine, tables=[Consulta.__table__])  # type: ignore
+    with Session(engine) as session:
+        for numero in range(3):
+            session.add(Consulta(numero_documento=f"0000000{numero}", usuario="ana"))
+        session.commit()
+    try:
+        yield engine
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text(f"DROP SCHEMA {esquema} CASCADE"))
+        engine.dispose()
+
+
+class TestExportarPostgres:
+    """Test class for exportar on PostgreSQL (requires TEST_DATABASE_URL)."""
+
+    def test_cliente_lento(self, engine_postgres: Engine) -> None:
+        """Un cliente más lento que el timeout de inactividad no corta el cursor."""
+        destino = _DestinoLento(espera=0.6)
+        filas = exportar(
+            destino,
+            TablaExportable.CONSULTA,
+            FormatoExportacion.NDJSON,
+            engine=engine_postgres,
+            lote=1,
+        )
+        assert filas == 3  # noqa: PLR2004
+        assert len(destino.getvalue().splitlines()) == 3  # noqa: PLR2004
+
+
+class TestStreamExportacion:
+    """Test class for stream_exportacion."""
+
+    def test_entrega_bloques(self) -> None:
+        """Los bloques escritos en el hilo llegan completos y en orden."""
+
+        def exportar_en(destino: BinaryIO) -> int:
+            destino.writelines(f"{numero}\n".encode() for numero in range(3))
+            return 3
+
+        async def leer() -> bytes:
+            return b"".join([b async for b in stream_exportacion(exportar_en)])
+
+        assert asyncio.run(leer()) == b"0\n1\n2\n"
+
+    def test_cancelacion(self) -> None:
+        """Si el consumidor deja de leer, la exportación se detiene."""
+        terminado = threading.Event()
+
+        def exportar_en(destino: BinaryIO) -> int:
+            try:
+                destino.writelines(bytes(1 << 20) for _ in range(100))
+            finally:
+                terminado.set()
+            return 100
+
+        async def leer_uno() -> None:
+            stream = stream_exportacion(exportar_en)
+            await anext(stream)
+            await stream.aclose()
+
+        asyncio.run(leer_uno())
+        assert terminado.wait(timeout=5)
+
+    def test_error(self) -> None:
+        """Un error de la exportación se propaga al consumidor."""
+
+        def exportar_en(_destino: BinaryIO) -> int:
+            message = "falló la base"
+            raise RuntimeError(message)
+
+        async def leer() -> None:
+            async for _ in stream_exportacion(exportar_en):
+                pass
+
+        with pytest.raises(RuntimeError, match="falló la base"):
+            asyncio.run(leer())
+
+
+class TestCuposExportacion:
+    """Test class for CuposExportacion and RespuestaExportacion."""
+
+    def test_sin_cupos(self) -> None:
+        """Con todos los cupos ocupados ``tomar`` no espera: devuelve False."""
+        cupos = CuposExportacion(1)
+        assert cupos.tomar()
+        assert not cupos.tomar()
+        cupos.liberar()
+        assert cupos.tomar()
+
+    def test_libera_al_terminar(self) -> None:
+        """Una respuesta transmitida completa devuelve su cupo."""
+        cupos = CuposExportacion(1)
+        assert cupos.tomar()
+        enviados: list[dict] = []
+
+        async def cuerpo() -> AsyncIterator[bytes]:
+            yield b"datos"
+
+        async def send(mensaje: dict) -> None:
+            enviados.append(mensaje)
+
+        async def receive() -> dict:
+            await asyncio.sleep(10)
+            return {"type": "http.disconnect"}
+
+        respuesta = RespuestaExportacion(cuerpo(), cupos)
+        asyncio.run(respuesta({"type": "http"}, receive, send))  # type: ignore
+        assert enviados[1]["body"] == b"datos"
+        assert cupos.en_uso == 0
+
+    def test_libera_si_el_cliente_se_va_antes(self) -> None:
+        """Si el cliente se va antes del primer bloque, el cupo también vuelve."""
+        cupos = CuposExportacion(1)
+        assert cupos.tomar()
+        iniciado = False
+
+        async def cuerpo() -> AsyncIterator[bytes]:
+            nonlocal iniciado
+            iniciado = True
+            yield b"datos"
+
+        async def send(_mensaje: dict) -> None:
+            raise OSError
+
+        async def receive() -> dict:
+            return {"type": "http.disconnect"}
+
+        respuesta = RespuestaExportacion(cuerpo(), cupos)
+        with pytest.raises(OSError):  # noqa: PT011
+            asyncio.run(respuesta({"type": "http"}, receive, send))  # type: ignore
+        assert not iniciado
+        assert cupos.en_uso == 0
@@ -0,0 +1,65 @@
+import asyncio
+
+from app.services.health_service import HealthMonitor
+
+
+class FakeDatabaseConfig:
+    """Configuración de base de datos falsa para el monitor."""
+
+    def __init__(self, *, ok: bool) -> None:
+        """Inicializa el resultado del ping."""
+        self.ok = ok
+        self.pings = 0
+
+    def ping(self) -> bool:
+        """Simula un ping."""
+        self.pings += 1
+        return self.ok
+
+
+class TestHealthMonitor:
+    """Test class for HealthMonitor."""
+
+    def test_not_ready_before_first_check(self) -> None:
+        """Sin chequeos previos la instancia no está lista."""
+        monitor = HealthMonitor(FakeDatabaseConfig(ok=True), soap_url=None)  # type: ignore
+        assert not monitor.is_ready
+
+    def test_ready_depends_on_database(self) -> None:
+        """La disponibilidad solo depende de la base de datos."""
+        monitor = HealthMonitor(FakeDatabaseConfig(ok=True), soap_url=None)  # type: ignore
+        estado = asyncio.run(monitor.check())
+        assert monitor.is_ready
+        assert estado.database.ok
+        assert not estado.sis.ok
+
+    def test_database_down(self) -> None:
+        """Con la base de datos caída la instancia no está lista."""
+        monitor = HealthMonitor(FakeDatabaseConfig(ok=False), soap_url=None)  # type: ignore
+        asyncio.run(monitor.check())
+        assert not monitor.is_ready
+
+    def test_probes_read_cached_state(self) -> None:
+        """Leer el estado no ejecuta nuevos chequeos."""
+        db_config = FakeDatabaseConfig(ok=True)
+        monitor = HealthMonitor(db_config, soap_url=None)  # type: ignore
+        asyncio.run(monitor.check())
+        for _ in range(10):
+            assert monitor.is_ready
+        assert db_config.pings == 1
+
+    def test_start_does_not_wait_for_checks(self) -> None:
+        """``start`` no espera el primer chequeo; este corre en segundo plano."""
+
+        async def escenario() -> tuple[bool, bool]:
+            monitor = HealthMonitor(FakeDatabaseConfig(ok=True), soap_url=None)  # type: ignore
+            await monitor.start()
+            antes = monitor.is_ready
+            await asyncio.sleep(0.1)
+            despues = monitor.is_ready
+            await monitor.stop()
+            return antes, despues
+
+        antes, despues = asyncio.run(escenario())
+        assert not antes
+        assert despues
@@ -0,0 +1,61 @@
+import asyncio
+
+from app.services.rate_limiter import FairQueue, TokenBucket
+
+
+class FakeBucket:
+    """Bucket que siempre entrega un token."""
+
+    async def acquire(self) -> None:
+        """Entrega el token inmediatamente."""
+
+
+class TestTokenBucket:
+    """Test class for TokenBucket."""
+
+    def test_burst(self) -> None:
+        """Permite una ráfaga de ``burst`` tokens y luego pide esperar."""
+        bucket = TokenBucket(rate=1, burst=3)
+        assert [bucket.try_acquire() for _ in range(3)] == [0, 0, 0]
+        assert bucket.try_acquire() > 0
+
+    def test_refill(self) -> None:
+        """Repone tokens con el paso del tiempo."""
+        bucket = TokenBucket(rate=10, burst=1)
+        assert bucket.try_acquire() == 0
+        bucket.actualizado -= 0.1
+        assert bucket.try_acquire() == 0
+
+
+class TestFairQueue:
+    """Test class for FairQueue."""
+
+    def test_round_robin(self) -> None:
+        """Un lote de un usuario no bloquea a los demás."""
+        orden: list[str] = []
+
+        async def pedir(queue: FairQueue, clave: str) -> None:
+            await queue.acquire(clave)
+            orden.append(clave)
+
+        async def run() -> None:
+            queue = FairQueue(FakeBucket())
+            await asyncio.gather(
+                *(pedir(queue, clave) for clave in ["lote", "lote", "lote", "otro"])
+            )
+            assert queue.pendientes == 0
+
+        asyncio.run(run())
+        assert orden == ["lote", "otro", "lote", "lote"]
+
+    def test_cancelled_waiter_is_skipped(self) -> None:
+        """Una petición cancelada no consume su turno."""
+
+        async def run() -> None:
+            queue = FairQueue(TokenBucket(rate=1000, burst=1))
+            cancelada = asyncio.create_task(queue.acquire("a"))
+            await asyncio.sleep(0)
+            cancelada.cancel()
+            await asyncio.wait_for(queue.acquire("b"), timeout=1)
+
+        asyncio.run(run())
@@ -0,0 +1,135 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.models.consulta import Consulta
+from app.models.reporte import ConsultaErrorDiario, ConsultaUsoDiario, ReporteAvance
+from app.services.reportes import actualizar_tramo, armar_reporte
+
+AYER = datetime(2026, 3, 1, 10, 0)  # noqa: DTZ001
+HOY = datetime(2026, 3, 2, 9, 30)  # noqa: DTZ001
+
+
+@pytest.fixture
+def session() -> Session:
+    """Sesión sobre una base en memoria con las tablas de los reportes."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(
+        engine,
+        tables=[
+            Consulta.__table__,  # type: ignore
+            ConsultaUsoDiario.__table__,  # type: ignore
+            ConsultaErrorDiario.__table__,  # type: ignore
+            ReporteAvance.__table__,  # type: ignore
+        ],
+    )
+    return Session(engine)
+
+
+def _consulta(
+    usuario: str,
+    created_at: datetime,
+    *,
+    es_local: bool = False,
+    error_code: str | None = None,
+) -> Consulta:
+    return Consulta(
+        numero_documento="46118717",
+        usuario=usuario,
+        es_local=es_local,
+        error_code=error_code,
+        created_at=created_at,
+    )
+
+
+def _actualizar(session: Session, lote: int = 100) -> None:
+    while actualizar_tramo(session, lote, margen=0):
+        session.commit()
+    session.commit()
+
+
+class TestActualizarTramo:
+    """Test class for actualizar_tramo."""
+
+    def test_incremental(self, session: Session) -> None:
+        """Cada actualización suma solo las consultas nuevas."""
+        session.add_all(
+            [
+                _consulta("ana", AYER),
+                _consulta("ana", AYER, es_local=True),
+                _consulta("luis", HOY, error_code="API-422"),
+            ]
+        )
+        session.commit()
+        _actualizar(session, lote=2)
+
+        session.add_all(
+            [
+                _consulta("ana", AYER, error_code="API-422"),
+                _consulta("luis", HOY, error_code="API-422"),
+            ]
+        )
+        session.commit()
+        _actualizar(session)
+
+        uso = session.exec(
+            select(ConsultaUsoDiario).order_by(ConsultaUsoDiario.dia)
+        ).all()
+        assert [(u.dia, u.usuario, u.total, u.locales, u.errores) for u in uso] == [
+            (AYER.date(), "ana", 3, 1, 1),
+            (HOY.date(), "luis", 2, 0, 2),
+        ]
+        errores = session.exec(select(ConsultaErrorDiario.total)).all()
+        assert sorted(errores) == [1, 2]
+
+    def test_respeta_margen(self, session: Session) -> None:
+        """Las consultas más recientes que el margen esperan a la siguiente."""
+        reciente = datetime.now()  # noqa: DTZ005
+        session.add_all(
+            [
+                _consulta("ana", reciente - timedelta(minutes=5)),
+                _consulta("ana", reciente),
+            ]
+        )
+        session.commit()
+        assert actualizar_tramo(session, 100, margen=60) == 1
+        session.commit()
+        assert actualizar_tramo(session, 100, margen=60) == 0
+
+
+class TestArmarReporte:
+    """Test class for armar_reporte."""
+
+    def test_tasas(self, session: Session) -> None:
+        """Calcula uso de caché y errores por día, usuario y código."""
+        session.add_all(
+            [
+                _consulta("ana", AYER, es_local=True),
+                _consulta("ana", HOY),
+                _consulta("luis", HOY, error_code="API-422"),
+                _consulta("luis", HOY, es_local=True),
+            ]
+        )
+        session.commit()
+        _actualizar(session)
+
+        reporte = armar_reporte(session, AYER.date(), HOY.date())
+        assert [(d.dia, d.total, d.tasa_cache) for d in reporte.dias] == [
+            (AYER.date(), 1, 1.0),
+            (HOY.date(), 3, 0.3333),
+        ]
+        assert [(u.usuario, u.tasa_error) for u in reporte.usuarios] == [
+            ("ana", 0.0),
+            ("luis", 0.5),
+        ]
+        assert [(e.error_code, e.tasa) for e in reporte.errores] == [("API-422", 0.25)]
+        assert reporte.actualizado_at is not None
+
+        solo_ana = armar_reporte(session, HOY.date(), HOY.date(), "ana")
+        assert [u.usuario for u in solo_ana.usuarios] == ["ana"]
+        assert solo_ana.errores == []
+        assert armar_reporte(session, date(2020, 1, 1), date(2020, 1, 2)).dias == []
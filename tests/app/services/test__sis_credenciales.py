@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+from fastapi import status
+from pydantic import SecretStr
+from result import Err, Ok, Result
+
+from app.api.exceptions import CustomExceptionCode
+from app.api.requests import ConsultaAfiliadoRequest, CredencialesRequest
+from app.models.afiliado import AfiliadoPublico
+from app.services.rate_limiter import FairQueue, TokenBucket
+from app.services.sis_credenciales import Credencial, PoolCredenciales
+from app.services.sis_service import SISService
+
+
+def _pool(*usuarios: str) -> PoolCredenciales:
+    return PoolCredenciales(
+        [
+            Credencial(
+                usuario=usuario,
+                clave=SecretStr("clave"),
+                cola=FairQueue(TokenBucket(rate=100, burst=100)),
+            )
+            for usuario in usuarios
+        ],
+        ttl_token=300,
+        suspension=900,
+    )
+
+
+class FakeSISService(SISService):
+    """SISService sin cliente SOAP; ``GetSession`` falla para ``mala``."""
+
+    def __init__(self, pool: PoolCredenciales, demora: float = 0) -> None:
+        """Inicializa el servicio con el pool indicado."""
+        self.credenciales = pool
+        self.demora = demora
+        self.sesiones: list[str] = []
+        self.consultas: list[str] = []
+
+    async def get_session(
+        self,
+        request: CredencialesRequest,
+        cola: FairQueue | None = None,  # noqa: ARG002
+    ) -> Result[str, tuple]:
+        """Simula ``GetSession``."""
+        self.sesiones.append(request.usuario)
+        await asyncio.sleep(self.demora)
+        if request.usuario == "mala":
+            return Err(
+                (CustomExceptionCode.INVALID_CREDENTIALS, status.HTTP_401_UNAUTHORIZED)
+            )
+        return Ok(f"TOKEN-{request.usuario}")
+
+    async def consultar_afiliado_fuae(
+        self,
+        autorizacion: str,
+        consulta: ConsultaAfiliadoRequest,  # noqa: ARG002
+        cola: FairQueue | None = None,  # noqa: ARG002
+    ) -> Result[AfiliadoPublico, tuple]:
+        """Simula la consulta y anota con qué token se hizo."""
+        self.consultas.append(autorizacion.removeprefix("TOKEN-"))
+        await asyncio.sleep(self.demora)
+        return Ok(AfiliadoPublico())
+
+
+class TestPoolCredenciales:
+    """Test class for PoolCredenciales."""
+
+    def test_least_loaded(self) -> None:
+        """Se elige la credencial con menos llamadas en curso."""
+        pool = _pool("a", "b")
+        pool.credenciales[0].en_curso = 2
+
+        assert all(pool.elegir().usuario == "b" for _ in range(4))  # type: ignore
+
+    def test_round_robin_on_ties(self) -> None:
+        """Con la misma carga, las credenciales se turnan."""
+        pool = _pool("a", "b", "c")
+
+        assert {pool.elegir().usuario for _ in range(3)} == {"a", "b", "c"}  # type: ignore
+
+    def test_suspended_credentials_are_skipped(self) -> None:
+        """Una credencial suspendida no se elige hasta que vence la suspensión."""
+        pool = _pool("a", "b")
+        pool.suspender(pool.credenciales[0])
+
+        assert all(pool.elegir().usuario == "b" for _ in range(4))  # type: ignore
+        assert pool.elegir(excluir={"b"}) is None
+
+        pool.credenciales[0].suspendida_hasta = 0
+        assert pool.elegir(excluir={"b"}) is pool.credenciales[0]
+
+
+class TestSISServicePool:
+    """Test class for the SISService credential pool."""
+
+    def test_token_is_cached(self) -> None:
+        """``GetSession`` se invoca una sola vez mientras el token es vigente."""
+        service = FakeSISService(_pool("a"))
+
+        tokens = [asyncio.run(service.get_service_session()) for _ in range(3)]
+
+        assert tokens == [Ok("TOKEN-a")] * 3
+        assert service.sesiones == ["a"]
+
+    def test_invalid_credential_is_benched(self) -> None:
+        """Una credencial inválida se suspende y se usa la siguiente."""
+        pool = _pool("mala", "buena")
+        service = FakeSISService(pool)
+
+        for _ in range(3):
+            assert asyncio.run(service.get_service_session()) == Ok("TOKEN-buena")
+
+        assert service.sesiones.count("mala") == 1
+        assert pool.credenciales[0].suspendida_hasta > 0
+
+    @pytest.mark.parametrize("usuarios", [("mala",), ()])
+    def test_no_credentials_available(self, usuarios: tuple[str, ...]) -> None:
+        """Sin credenciales utilizables se responde 503."""
+        service = FakeSISService(_pool(*usuarios))
+
+        assert asyncio.run(service.get_service_session()) == Err(
+            (
+                CustomExceptionCode.INVALID_CREDENTIALS,
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        )
+
+    def test_cold_burst_is_spread(self) -> None:
+        """Las consultas que esperan ``GetSession`` cuentan en la carga."""
+        pool = _pool("a", "b")
+        # b ya tiene una consulta larga en curso
+        pool.credenciales[1].en_curso = 1
+        service = FakeSISService(pool, demora=0.01)
+        consulta = ConsultaAfiliadoRequest(
+            opcion=1,
+            dni="12345678",
+            tipo_documento="1",
+            nro_documento="87654321",
+            usuario="ana",
+        )
+
+        async def rafaga() -> None:
+            await asyncio.gather(
+                *(service.consultar_afiliado(consulta) for _ in range(4))
+            )
+
+        asyncio.run(rafaga())
+
+        assert sorted(service.consultas) == ["a", "a", "b", "b"]
+        assert sorted(service.sesiones) == ["a", "b"]
+        assert [c.en_curso for c in pool.credenciales] == [0, 1]
@@ -0,0 +1,64 @@
+import asyncio
+from typing import Any
+
+from result import Ok
+
+from app.api.requests import ConsultaAfiliadoRequest, CredencialesRequest
+from app.services.sis_service import CLAVE_SESION, SISService
+
+
+class ColaEspia:
+    """Cola equitativa falsa que anota la clave de cada turno pedido."""
+
+    def __init__(self) -> None:
+        """Inicializa la lista de claves."""
+        self.claves: list[str] = []
+
+    async def acquire(self, clave: str) -> None:
+        """Anota la clave y concede el turno."""
+        self.claves.append(clave)
+
+
+class FakeSISService(SISService):
+    """SISService sin cliente SOAP: toda operación responde un token."""
+
+    def __init__(self, cola: ColaEspia) -> None:
+        """Inicializa el servicio con la cola indicada."""
+        self.rate_limiter = cola  # type: ignore
+
+    async def _invocar(self, operacion: str, **_kwargs: Any) -> Any:  # noqa: ANN401
+        """Simula la operación SOAP."""
+        return f"TOKEN-{operacion}"
+
+
+class TestColaEquitativa:
+    """Test class for the fair-queue keys used by SISService."""
+
+    def test_sesion_con_clave_propia(self) -> None:
+        """``GetSession`` no usa el nombre de la credencial como clave."""
+        cola = ColaEspia()
+        service = FakeSISService(cola)
+        # Una credencial con el mismo nombre que un usuario que consulta
+        credencial = CredencialesRequest(usuario="ana", clave="secreta")
+
+        resultado = asyncio.run(service.get_session(credencial))
+
+        assert resultado == Ok("TOKEN-GetSession")
+        assert cola.claves == [CLAVE_SESION]
+
+    def test_consulta_con_clave_del_usuario(self) -> None:
+        """Las consultas toman turno con el usuario, separado de los logins."""
+        cola = ColaEspia()
+        service = FakeSISService(cola)
+        consulta = ConsultaAfiliadoRequest(
+            opcion=1,
+            dni="12345678",
+            tipo_documento="1",
+            nro_documento="87654321",
+            usuario="ana",
+        )
+
+        asyncio.run(service.get_session(CredencialesRequest(usuario="ana", clave="x")))
+        asyncio.run(service.consultar_afiliado_fuae("TOKEN", consulta))
+
+        assert cola.claves == [CLAVE_SESION, "ana"]
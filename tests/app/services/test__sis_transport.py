@@ -0,0 +1,97 @@
+import json
+from pathlib import Path
+
+import pytest
+import requests
+from zeep import Client
+from zeep.helpers import serialize_object
+
+from app.services.sis_transport import (
+    Anonimizador,
+    RecordingTransport,
+    ReplayTransport,
+)
+from benchmarks.sis_mock import ServidorSIS
+
+
+class TestAnonimizador:
+    """Test class for the SOAP envelope anonymizer."""
+
+    def test_seudonimo(self) -> None:
+        """Es determinista, conserva el largo y los dígitos."""
+        anonimizador = Anonimizador()
+
+        seudonimo = anonimizador.seudonimo("46118717")
+
+        assert seudonimo != "46118717"
+        assert seudonimo.isdigit()
+        assert len(seudonimo) == len("46118717")
+        assert anonimizador.seudonimo("46118717") == seudonimo
+        assert Anonimizador().seudonimo("46118717") != seudonimo
+
+    def test_anonimizar(self) -> None:
+        """Reemplaza solo los elementos sensibles."""
+        xml = (
+            "<ns0:strNroDocumento>46118717</ns0:strNroDocumento>"
+            "<Estado>ACTIVO</Estado>"
+            "<GetSessionResult>USUARIO INVALIDO</GetSessionResult>"
+        )
+
+        anonimo = Anonimizador().anonimizar(xml)
+
+        assert "46118717" not in anonimo
+        assert "<Estado>ACTIVO</Estado>" in anonimo
+        assert "USUARIO INVALIDO" in anonimo
+
+
+class TestRecordReplay:
+    """Test class for the record and replay transports."""
+
+    def test_grabar_y_reproducir(self, tmp_path: Path) -> None:
+        """Lo grabado contra el SIS simulado se reproduce sin red."""
+        archivo = tmp_path / "trafico.ndjson"
+        servidor = ServidorSIS().iniciar()
+        servidor.config.latencia_ms = 0
+        try:
+            client = Client(servidor.wsdl, transport=RecordingTransport(archivo))
+            token = client.service.GetSession(strUsuario="juan", strClave="secreto")
+            client.service.ConsultarAfiliadoFuaE(
+                intOpcion=1,
+                strAutorizacion=token,
+                strDni="46118717",
+                strTipoDocumento="1",
+                strNroDocumento="41234567",
+            )
+        finally:
+            servidor.detener()
+
+        contenido = archivo.read_text()
+        registros = [json.loads(linea) for linea in contenido.splitlines()]
+        assert [r.get("operacion") for r in registros if r["tipo"] == "operacion"] == [
+            "GetSession",
+            "ConsultarAfiliadoFuaE",
+        ]
+        for dato in ("juan", "secreto", "41234567"):
+            assert dato not in contenido
+
+        client = Client(servidor.wsdl, transport=ReplayTransport(archivo, velocidad=0))
+        respuesta = client.service.ConsultarAfiliadoFuaE(
+            intOpcion=1,
+            strAutorizacion="x",
+            strDni="1",
+            strTipoDocumento="1",
+            strNroDocumento="49999999",
+        )
+
+        datos = serialize_object(respuesta)
+        assert datos["NroDocumento"] == "49999999"
+        assert datos["Estado"] == "ACTIVO"
+
+    def test_operacion_no_grabada(self, tmp_path: Path) -> None:
+        """Sin grabación para la operación falla como un error de conexión."""
+        archivo = tmp_path / "vacio.ndjson"
+        archivo.write_text("")
+        transporte = ReplayTransport(archivo, velocidad=0)
+
+        with pytest.raises(requests.ConnectionError):
+            transporte.post("http://sis", b"", {"SOAPAction": '"GetSession"'})
@@ -0,0 +1,111 @@
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, create_engine, select
+
+from app.database import DatabaseConfig, VentanaEscrituras, marcar_escritura
+from app.models.consulta import Consulta
+from tools.config import Settings
+
+
+def _motor():  # noqa: ANN202
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine, tables=[Consulta.__table__])
+    return engine
+
+
+@pytest.fixture
+def config() -> DatabaseConfig:
+    """Configuración con primario y réplica en memoria."""
+    config = DatabaseConfig()
+    config._engine = _motor()  # noqa: SLF001
+    config._replica_engine = _motor()  # noqa: SLF001
+    config.replica_url = "sqlite://"
+    config.escrituras = VentanaEscrituras(60)
+    with config.replica_engine.begin() as connection:
+        connection.execute(
+            Consulta.__table__.insert(),
+            {"numero_documento": "1", "usuario": "u", "es_local": False},
+        )
+    return config
+
+
+def _buscar(config: DatabaseConfig, **bind_arguments: str) -> Consulta | None:
+    with config.get_session() as session:
+        return session.exec(
+            select(Consulta).where(Consulta.numero_documento == "1"),
+            bind_arguments=bind_arguments or None,
+        ).first()
+
+
+class TestRoutingSession:
+    """Test class for read replica routing."""
+
+    def test_lecturas_marcadas(self, config: DatabaseConfig) -> None:
+        """Solo las lecturas con la marca ``replica`` van a la réplica."""
+        assert _buscar(config, replica="1") is not None
+        assert _buscar(config) is None
+
+    def test_read_your_writes(self, config: DatabaseConfig) -> None:
+        """Tras escribir una clave, sus lecturas vuelven al primario."""
+        with config.get_session() as session:
+            session.add(Consulta(numero_documento="2", usuario="u"))
+            marcar_escritura(session, "1")
+            assert session.get_bind(replica="1") is config.engine
+            session.commit()
+
+        assert _buscar(config, replica="1") is None
+
+    def test_sin_replica(self) -> None:
+        """Sin réplica configurada todo va al primario."""
+        config = DatabaseConfig()
+        config.replica_url = None
+
+        with config.get_session() as session:
+            assert session.get_bind(replica="1") is config.engine
+
+
+class TestVentanaEscrituras:
+    """Test class for the read-your-writes window."""
+
+    def test_vencimiento(self) -> None:
+        """Las claves dejan de ser recientes al vencer la ventana."""
+        ventana = VentanaEscrituras(0)
+        ventana.registrar(["1"])
+        assert not ventana.reciente("1")
+
+        ventana = VentanaEscrituras(60)
+        ventana.registrar(["1"])
+        assert ventana.reciente("1")
+        assert not ventana.reciente("2")
+
+
+class TestConnectArgs:
+    """Test class for the libpq connection arguments."""
+
+    def test_timeouts_y_keepalive(self) -> None:
+        """Incluye los timeouts del servidor y TCP keepalive sin pre-ping."""
+        config = DatabaseConfig(
+            Settings(
+                db_statement_timeout_ms=5000,
+                db_idle_in_transaction_timeout_ms=15000,
+                db_pool_liveness="keepalive",
+            )
+        )
+
+        connect_args = config._connect_args()  # noqa: SLF001
+
+        assert not config.pool_pre_ping
+        assert "statement_timeout=5000" in connect_args["options"]
+        assert "idle_in_transaction_session_timeout=15000" in connect_args["options"]
+        assert connect_args["keepalives"] == 1
+
+    def test_por_defecto(self) -> None:
+        """Por defecto usa pre-ping y no agrega opciones."""
+        config = DatabaseConfig(Settings(db_pool_liveness="pre_ping"))
+
+        assert config.pool_pre_ping
+        assert "options" not in config._connect_args()  # noqa: SLF001
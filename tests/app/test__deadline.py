@@ -0,0 +1,39 @@
+from app.deadline import LatenciaEWMA, plazo, restante
+
+
+class TestPlazo:
+    """Test class for plazo and restante."""
+
+    def test_sin_plazo(self) -> None:
+        """Fuera de una solicitud no hay plazo."""
+        assert restante() is None
+
+    def test_plazo_anidado_conserva_el_menor(self) -> None:
+        """Un plazo interno más largo no extiende el de la solicitud."""
+        with plazo(1):
+            with plazo(10):
+                assert 0 < restante() <= 1  # type: ignore
+            with plazo(0.5):
+                assert restante() <= 0.5  # type: ignore  # noqa: PLR2004
+            assert 0.5 < restante() <= 1  # type: ignore  # noqa: PLR2004
+        assert restante() is None
+
+
+class TestLatenciaEWMA:
+    """Test class for LatenciaEWMA."""
+
+    def test_primera_muestra_y_media(self) -> None:
+        """La primera muestra fija la media; las siguientes la suavizan."""
+        latencia = LatenciaEWMA(alpha=0.5)
+        assert latencia.alcanza(0)
+        latencia.registrar(1.0)
+        latencia.registrar(2.0)
+        assert latencia.segundos == 1.5  # noqa: PLR2004
+
+    def test_alcanza(self) -> None:
+        """Sin plazo siempre alcanza; con plazo se compara con la media."""
+        latencia = LatenciaEWMA()
+        latencia.registrar(0.2)
+        assert latencia.alcanza(None)
+        assert latencia.alcanza(0.3)
+        assert not latencia.alcanza(0.1)
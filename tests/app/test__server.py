@@ -0,0 +1,31 @@
+import os
+
+import pytest
+
+from app.server import opciones_gunicorn, post_fork, resolver_workers
+from tools.config import Settings
+
+
+class TestServer:
+    """Test class for the production server entry point."""
+
+    def test_workers_default_to_cpu_count(self) -> None:
+        """Sin WEB_WORKERS se usa un worker por núcleo."""
+        assert resolver_workers(Settings(web_workers=None)) == (os.cpu_count() or 1)
+
+    def test_workers_capped_by_budget(self) -> None:
+        """No se crean más workers que conexiones disponibles."""
+        settings = Settings(web_workers=8, db_connection_budget=3)
+
+        assert resolver_workers(settings) == 3  # noqa: PLR2004
+
+    def test_gunicorn_options(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """La app se precarga y los workers descartan conexiones heredadas."""
+        monkeypatch.setenv("WEB_PORT", "9000")
+        opciones = opciones_gunicorn(Settings(web_workers=2))
+
+        assert opciones["bind"].endswith(":9000")
+        assert opciones["workers"] == 2  # noqa: PLR2004
+        assert opciones["preload_app"] is True
+        assert opciones["worker_class"] == "uvicorn_worker.UvicornWorker"
+        assert opciones["post_fork"] is post_fork
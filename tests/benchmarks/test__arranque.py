@@ -0,0 +1,33 @@
+import subprocess
+import sys
+
+from benchmarks.arranque import (
+    MODULOS_DIFERIDOS,
+    PRESUPUESTO_MS,
+    cargados,
+    medir_importacion,
+    total_ms,
+)
+
+
+class TestArranque:
+    """Test class for the startup import budget."""
+
+    def test_import_budget(self) -> None:
+        """``app.main`` se importa dentro del presupuesto y sin módulos pesados."""
+        importaciones = medir_importacion("app.main")
+
+        assert cargados(importaciones, MODULOS_DIFERIDOS) == []
+        assert total_ms(importaciones) < PRESUPUESTO_MS
+
+    def test_no_io_at_import(self) -> None:
+        """Importar la aplicación no crea la configuración ni el motor de BD."""
+        codigo = (
+            "import app.main\n"
+            "from app.database import get_database_config\n"
+            "assert get_database_config.cache_info().currsize == 0\n"
+        )
+        proceso = subprocess.run(  # noqa: S603
+            [sys.executable, "-c", codigo], capture_output=True, text=True, check=False
+        )
+        assert proceso.returncode == 0, proceso.stderr
@@ -0,0 +1,32 @@
+from benchmarks.carga import Resultado, comparar, percentiles
+
+
+def _resultado(rps: float, p95_ms: float) -> Resultado:
+    return Resultado(
+        escenario="cache_hit",
+        solicitudes=10,
+        duracion_s=1.0,
+        rps=rps,
+        p50_ms=1.0,
+        p95_ms=p95_ms,
+        p99_ms=p95_ms,
+        codigos={"200": 10},
+        llamadas_sis={},
+    )
+
+
+class TestCarga:
+    """Test class for the load test report helpers."""
+
+    def test_percentiles(self) -> None:
+        """Calcula p50, p95 y p99."""
+        p50, p95, p99 = percentiles([float(i) for i in range(1, 101)])
+        assert (round(p50), round(p95), round(p99)) == (50, 95, 99)
+        assert percentiles([3.0]) == (3.0, 3.0, 3.0)
+
+    def test_comparar(self) -> None:
+        """Detecta regresiones de latencia y throughput según la tolerancia."""
+        baseline = {"rps": 100.0, "p95_ms": 10.0}
+
+        assert comparar(_resultado(90, 12), baseline, 0.3) == []
+        assert len(comparar(_resultado(50, 20), baseline, 0.3)) == 2  # noqa: PLR2004
@@ -0,0 +1,55 @@
+import pytest
+from zeep import Client
+from zeep.exceptions import Fault, TransportError
+from zeep.helpers import serialize_object
+
+from benchmarks.sis_mock import ServidorSIS
+
+
+@pytest.fixture
+def servidor() -> ServidorSIS:
+    """SIS simulado sin latencia."""
+    servidor = ServidorSIS().iniciar()
+    servidor.config.latencia_ms = 0
+    servidor.config.jitter_ms = 0
+    yield servidor
+    servidor.detener()
+
+
+class TestServidorSIS:
+    """Test class for the mock SIS SOAP server."""
+
+    def test_consulta(self, servidor: ServidorSIS) -> None:
+        """Zeep consume el WSDL y recibe la ficha del afiliado."""
+        client = Client(servidor.wsdl)
+
+        token = client.service.GetSession(strUsuario="bench", strClave="x")
+        respuesta = client.service.ConsultarAfiliadoFuaE(
+            intOpcion=1,
+            strAutorizacion=token,
+            strDni="46118717",
+            strTipoDocumento="1",
+            strNroDocumento="70000001",
+        )
+
+        datos = serialize_object(respuesta)
+        assert token == "TOKEN-bench"  # noqa: S105
+        assert datos["IdError"] == "0"
+        assert datos["NroDocumento"] == "70000001"
+        assert servidor.config.llamadas == {
+            "GetSession": 1,
+            "ConsultarAfiliadoFuaE": 1,
+        }
+
+    def test_errores(self, servidor: ServidorSIS) -> None:
+        """Inyecta faults y caídas."""
+        client = Client(servidor.wsdl)
+
+        servidor.config.tasa_fault = 1.0
+        with pytest.raises(Fault):
+            client.service.GetSession(strUsuario="bench", strClave="x")
+
+        servidor.config.tasa_fault = 0.0
+        servidor.config.caido = True
+        with pytest.raises(TransportError):
+            client.service.GetSession(strUsuario="bench", strClave="x")
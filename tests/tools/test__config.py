@@ -1,4 +1,5 @@
 import pytest
+from pydantic import ValidationError
 
 from tools.config import FastAPIKwArgs, Settings
 
@@ -28,3 +29,61 @@ class TestSettings:
                 openapi_prefix="",
             ).model_dump()
         )
+
+    def test_profile(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """The APP_ENV profile fills only the fields not set explicitly."""
+        monkeypatch.setenv("APP_ENV", "production")
+        monkeypatch.setenv("DB_POOL_SIZE", "4")
+
+        settings = Settings()
+
+        assert settings.db_pool_size == 4  # noqa: PLR2004
+        assert settings.db_pool_liveness == "keepalive"
+        assert settings.db_statement_timeout_ms > 0
+
+    def test_connection_budget(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """The connection budget is split between workers, over the profile."""
+        monkeypatch.setenv("APP_ENV", "production")
+        monkeypatch.setenv("DB_CONNECTION_BUDGET", "40")
+        monkeypatch.setenv("WEB_WORKERS", "4")
+
+        settings = Settings()
+
+        assert (settings.db_pool_size, settings.db_max_overflow) == (5, 5)
+
+        monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+        assert Settings().db_max_overflow == 0
+
+    def test_soap_credentials(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Parse the credential pool, falling back to SOAP_USER."""
+        monkeypatch.setenv("SOAP_USER", "unico")
+        assert list(Settings().sis_credentials) == ["unico"]
+
+        monkeypatch.setenv("SOAP_CREDENTIALS", "uno:clave:1, dos:clave2")
+        credentials = Settings().sis_credentials
+
+        assert list(credentials) == ["uno", "dos"]
+        assert credentials["uno"].get_secret_value() == "clave:1"
+
+    def test_negative_cache_ttls(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Parse CODE=seconds pairs."""
+        monkeypatch.setenv("NEGATIVE_CACHE_TTLS", "API-422=60, API-504=5")
+
+        assert Settings().negative_cache_ttls == {"API-422": 60, "API-504": 5}
+
+    def test_sis_id_errores_no_encontrado(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Parse IdError codes separated by commas."""
+        assert Settings().sis_id_errores_no_encontrado == {"14"}
+
+        monkeypatch.setenv("SIS_ID_ERRORES_NO_ENCONTRADO", "14, 21,")
+
+        assert Settings().sis_id_errores_no_encontrado == {"14", "21"}
+
+    def test_validation(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Reject invalid tuning values."""
+        monkeypatch.setenv("DB_POOL_SIZE", "0")
+
+        with pytest.raises(ValidationError):
+            Settings()
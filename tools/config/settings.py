@@ -1,9 +1,36 @@
-from typing import Any
+from functools import lru_cache
+from pathlib import Path
+from typing import Annotated, Any, Literal, Self
 
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import AliasChoices, Field, SecretStr, field_validator, model_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
 from tools.config.fastapi import FastAPIKwArgs
 
+# Valores por perfil de despliegue; se aplican solo a los campos que no se
+# configuraron explícitamente por variable de entorno o archivo .env
+PERFILES: dict[str, dict[str, Any]] = {
+    "local": {
+        "db_pool_size": 2,
+        "db_max_overflow": 3,
+        "db_pool_liveness": "pre_ping",
+    },
+    "staging": {
+        "db_pool_size": 5,
+        "db_max_overflow": 10,
+        "db_statement_timeout_ms": 15_000,
+        "db_idle_in_transaction_timeout_ms": 30_000,
+    },
+    "production": {
+        "db_pool_size": 10,
+        "db_max_overflow": 20,
+        "db_pool_timeout": 10,
+        "db_statement_timeout_ms": 5_000,
+        "db_idle_in_transaction_timeout_ms": 15_000,
+        "db_pool_liveness": "keepalive",
+    },
+}
+
 
 class Settings(BaseSettings):
     """Environment variables settings.
@@ -23,9 +50,11 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=(".env", ".env.local"),
         env_file_encoding="utf-8",
+        extra="ignore",
     )
 
     IS_LOCAL: bool = False
+    app_env: Literal["local", "staging", "production"] | None = None
 
     debug: bool = False
     title: str = "FastAPI"
@@ -39,6 +68,195 @@ class Settings(BaseSettings):
     api_prefix_v1: str = "/api/v1"
     allowed_hosts: list[str] = ["*"]
 
+    # Base de datos
+    db_host: str = Field(
+        default="localhost", validation_alias=AliasChoices("DB_HOST", "DB_SERVER")
+    )
+    db_port: int = Field(default=5432, ge=1, le=65535)
+    db_name: str = "sis_database"
+    db_user: str = "postgres"
+    db_password: SecretStr = SecretStr("")
+    db_echo: bool = False
+    db_application_name: str = "SIS_Application"
+    db_pool_size: int = Field(default=10, ge=1)
+    db_max_overflow: int = Field(default=20, ge=0)
+    db_pool_timeout: float = Field(default=30, gt=0)
+    db_pool_recycle: int = Field(default=3600, ge=-1)
+    db_connect_timeout: int = Field(default=30, ge=1)
+    db_statement_timeout_ms: int = Field(default=0, ge=0)
+    db_idle_in_transaction_timeout_ms: int = Field(default=0, ge=0)
+    # pre_ping: SELECT 1 en cada checkout; keepalive: TCP keepalive y reciclado
+    # del pool, sin ida y vuelta por checkout; none: sin verificación
+    db_pool_liveness: Literal["pre_ping", "keepalive", "none"] = "pre_ping"
+    # Conexiones totales que el servicio puede abrir contra el primario (su
+    # parte de max_connections); se reparten entre los workers
+    db_connection_budget: int | None = Field(default=None, ge=1)
+
+    # Réplica de lectura (opcional)
+    db_replica_host: str | None = None
+    db_replica_port: int | None = Field(default=None, ge=1, le=65535)
+    db_replica_name: str | None = None
+    db_replica_user: str | None = None
+    db_replica_password: SecretStr | None = None
+    # Ventana de read-your-writes tras escribir un documento; se guarda en la
+    # memoria de cada proceso, así que otros workers pueden leer la réplica
+    # atrasada dentro de la ventana
+    db_replica_ryw_seconds: float = Field(default=10, ge=0)
+
+    # Servicio SOAP del SIS
+    soap_sis: str | None = None
+    soap_user: str = "sis_user"
+    soap_password: SecretStr = SecretStr("sis_password")
+    # Pool de credenciales: "usuario:clave,..."; vacío = solo SOAP_USER
+    soap_credentials: Annotated[dict[str, SecretStr], NoDecode] = {}
+    sis_session_ttl: float = Field(default=300, gt=0)
+    sis_credential_cooldown: float = Field(default=900, gt=0)
+    sis_transport_mode: Literal["live", "record", "replay"] = "live"
+    sis_traffic_file: Path = Path("sis_traffic.ndjson")
+    sis_replay_speed: float = Field(default=1, ge=0)
+    sis_rate_limit: float = Field(default=10, gt=0)
+    sis_rate_burst: int = Field(default=20, ge=1)
+    sis_rate_limit_backend: Literal["memory", "postgres"] = "memory"
+    # Corte de cada llamada SOAP y llamadas simultáneas al SIS por proceso
+    sis_operation_timeout: float = Field(default=30, gt=0)
+    sis_max_concurrency: int = Field(default=20, ge=1)
+    # IdError con los que el SIS indica que el documento no existe o no es
+    # válido ("14,..."): se responden como API-404 y admiten caché negativa
+    sis_id_errores_no_encontrado: Annotated[set[str], NoDecode] = {"14"}
+
+    # Plazo de cada solicitud: cabecera X-Request-Timeout (segundos, acotada a
+    # REQUEST_TIMEOUT_MAX) o REQUEST_TIMEOUT; 0 = sin plazo por defecto
+    request_timeout: float = Field(default=30, ge=0)
+    request_timeout_max: float = Field(default=120, gt=0)
+
+    # Servidor de producción (python -m app.server)
+    web_host: str = "0.0.0.0"  # noqa: S104
+    web_port: int = Field(default=8000, ge=1, le=65535)
+    web_workers: int | None = Field(default=None, ge=1)
+    web_timeout: int = Field(default=60, ge=1)
+    web_graceful_timeout: int = Field(default=30, ge=1)
+    web_keepalive: int = Field(default=5, ge=1)
+    web_max_requests: int = Field(default=0, ge=0)
+    web_max_requests_jitter: int = Field(default=0, ge=0)
+
+    # Consultas asíncronas (POST /consultas/jobs); 0 workers = solo procesos
+    # externos (python -m app.jobs.consultas)
+    jobs_workers: int = Field(default=1, ge=0)
+    jobs_batch_size: int = Field(default=10, ge=1)
+    jobs_poll_interval: float = Field(default=1, gt=0)
+    jobs_lease_seconds: float = Field(default=120, gt=0)
+    jobs_max_attempts: int = Field(default=5, ge=1)
+    jobs_retry_backoff: float = Field(default=5, gt=0)
+    jobs_max_items: int = Field(default=500, ge=1)
+
+    # Notificaciones de cambios (suscripciones); 0 workers = solo procesos
+    # externos (python -m app.jobs.notificaciones)
+    webhook_workers: int = Field(default=1, ge=0)
+    webhook_batch_size: int = Field(default=100, ge=1)
+    webhook_poll_interval: float = Field(default=2, gt=0)
+    webhook_lease_seconds: float = Field(default=60, gt=0)
+    webhook_timeout: float = Field(default=10, gt=0)
+    webhook_max_attempts: int = Field(default=8, ge=1)
+    webhook_retry_backoff: float = Field(default=10, gt=0)
+    # Hosts de webhook aceptados aunque resuelvan a direcciones privadas
+    # ("hooks.interno,..."); los demás deben resolver a direcciones públicas
+    webhook_allowed_hosts: Annotated[set[str], NoDecode] = set()
+    sse_poll_interval: float = Field(default=2, gt=0)
+    sse_keepalive: float = Field(default=15, gt=0)
+
+    # Resúmenes diarios de consulta para /reportes: segundos entre
+    # actualizaciones (0 = solo python -m app.jobs.reportes), consultas por
+    # tramo y antigüedad mínima de las consultas que se resumen
+    reportes_interval: float = Field(default=300, ge=0)
+    reportes_batch_size: int = Field(default=50_000, ge=1)
+    reportes_margen: float = Field(default=60, ge=0)
+
+    # Exportaciones (GET /exportaciones, python -m app.jobs.exportar): filas
+    # leídas del cursor por vez y exportaciones simultáneas por proceso
+    exportacion_batch_size: int = Field(default=10_000, ge=1)
+    exportacion_max_concurrency: int = Field(default=2, ge=1)
+
+    # Segundos entre revisiones de cambios en los catálogos (EESS, ubigeo,
+    # tipo de seguro) cargados en memoria
+    catalogo_refresh_interval: float = Field(default=60, gt=0)
+
+    # Caché negativa: "API-404=900,..." (código de error = segundos)
+    negative_cache_ttls: Annotated[dict[str, int], NoDecode] = {"API-404": 900}
+
+    # Monitor de salud
+    health_check_interval: float = Field(default=10, gt=0)
+    health_check_timeout: float = Field(default=2, gt=0)
+
+    # Control de carga de entrada
+    inbound_client_rate: float = Field(default=20, gt=0)
+    inbound_client_burst: int = Field(default=40, ge=1)
+    inbound_global_rate: float = Field(default=200, gt=0)
+    inbound_global_burst: int = Field(default=400, ge=1)
+    inbound_max_in_flight: int = Field(default=50, ge=1)
+    inbound_max_queue_time: float = Field(default=2, ge=0)
+    inbound_trust_forwarded: bool = False
+
+    @field_validator("negative_cache_ttls", mode="before")
+    @classmethod
+    def parse_ttls(cls, value: Any) -> Any:  # noqa: ANN401
+        """Parse ``CODIGO=segundos`` pairs separated by commas."""
+        if not isinstance(value, str):
+            return value
+        ttls = {}
+        for item in value.split(","):
+            error_code, _, ttl = item.partition("=")
+            if error_code.strip() and ttl.strip():
+                ttls[error_code.strip()] = ttl.strip()
+        return ttls
+
+    @field_validator(
+        "sis_id_errores_no_encontrado", "webhook_allowed_hosts", mode="before"
+    )
+    @classmethod
+    def parse_set(cls, value: Any) -> Any:  # noqa: ANN401
+        """Parse values separated by commas."""
+        if not isinstance(value, str):
+            return value
+        return {item.strip() for item in value.split(",") if item.strip()}
+
+    @field_validator("soap_credentials", mode="before")
+    @classmethod
+    def parse_credentials(cls, value: Any) -> Any:  # noqa: ANN401
+        """Parse ``user:password`` pairs separated by commas."""
+        if not isinstance(value, str):
+            return value
+        credentials = {}
+        for item in value.split(","):
+            user, _, password = item.strip().partition(":")
+            if user and password:
+                credentials[user] = password
+        return credentials
+
+    @property
+    def sis_credentials(self) -> dict[str, SecretStr]:
+        """SIS credential pool, or ``SOAP_USER`` alone when none is set."""
+        return self.soap_credentials or {self.soap_user: self.soap_password}
+
+    @model_validator(mode="after")
+    def apply_profile(self) -> Self:
+        """Apply the ``app_env`` profile to the fields not set explicitly.
+
+        With ``db_connection_budget`` the pool of each worker is sized from
+        the budget instead (half persistent, half overflow), unless the pool
+        is set explicitly.
+        """
+        explicit = set(self.model_fields_set)
+        if self.app_env is not None:
+            for name, value in PERFILES[self.app_env].items():
+                if name not in explicit:
+                    setattr(self, name, value)
+        pool_fields = {"db_pool_size", "db_max_overflow"}
+        if self.db_connection_budget is not None and not pool_fields & explicit:
+            per_worker = max(1, self.db_connection_budget // (self.web_workers or 1))
+            self.db_pool_size = max(1, per_worker // 2)
+            self.db_max_overflow = per_worker - self.db_pool_size
+        return self
+
     @property
     def fastapi_kwargs(self) -> dict[str, Any]:
         """FastAPI kwargs."""
@@ -53,3 +271,14 @@ class Settings(BaseSettings):
             redoc_url=self.redoc_url,
             openapi_prefix=self.openapi_prefix,
         ).model_dump()
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the process-wide settings instance.
+
+    Returns:
+        Settings: Settings loaded from the environment and .env files
+
+    """
+    return Settings()